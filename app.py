@@ -1,22 +1,43 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file, session, abort
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file, session, abort, g, has_app_context
+from flask.signals import before_render_template, template_rendered
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
+from contextlib import contextmanager
 import qrcode
-from io import BytesIO
+from PIL import Image, ImageDraw, ImageFont
+from io import BytesIO, StringIO
 import base64
+import hashlib
+import csv
 import os
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 # Use timezone-aware UTC timestamps
 def utcnow():
     return datetime.now(timezone.utc)
 
 import json
+import math
 import requests
+import sqlite3
+import atexit
+import itertools
+import threading
+import time
+import zlib
+import multiprocessing
+import click
+from collections import OrderedDict, deque, namedtuple
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.sql import operators as sql_operators
+from sqlalchemy.sql.elements import UnaryExpression
 from flask import Response, stream_with_context
-from queue import Queue, Empty
+from queue import Empty
+from concurrent.futures import ProcessPoolExecutor
 
 
 
@@ -158,14 +179,357 @@ def get_current_user():
         return db.session.get(User, session['user_id'])
     return None
 
-# In-memory SSE subscribers (simple pub/sub for live updates)
-_sse_subscribers = []
+# SSE pub/sub for live updates.
+#
+# Payloads are published to a broker which fans them out to one queue per open
+# /stream/waste_locations connection. The in-process broker only reaches streams
+# held by the same process; with several gunicorn workers set SSE_BROKER=sqlite so
+# events are relayed through a shared SQLite file that every worker polls.
+SSE_KEEPALIVE_SECONDS = 15
+
+app.config['SSE_BROKER'] = os.environ.get('SSE_BROKER', 'memory')  # memory, sqlite
+app.config['SSE_BROKER_PATH'] = os.environ.get('SSE_BROKER_PATH') or os.path.join(instance_path, 'sse_events.db')
+app.config['SSE_BROKER_POLL_INTERVAL'] = float(os.environ.get('SSE_BROKER_POLL_INTERVAL', 0.5))
+# Per-stream buffer size, and how many events a stream may drop without reading before it is evicted
+app.config['SSE_QUEUE_MAXSIZE'] = int(os.environ.get('SSE_QUEUE_MAXSIZE', 200))
+app.config['SSE_EVICT_AFTER_DROPS'] = int(os.environ.get('SSE_EVICT_AFTER_DROPS', 200))
+# Number of recent events kept for Last-Event-ID replay after a reconnect
+app.config['SSE_REPLAY_BUFFER'] = int(os.environ.get('SSE_REPLAY_BUFFER', 1000))
+
+
+SSE_EVENT_TYPES = ('waste_location', 'collector_location')
+
+
+def sse_event_type(payload):
+    """Event type of an SSE payload; waste item updates carry no explicit type."""
+    return payload.get('type') or 'waste_location'
+
+
+def sse_coalesce_key(payload):
+    """Key under which a newer payload supersedes an undelivered older one.
+
+    Only the latest position matters for a collector or a waste item, so a stalled
+    stream keeps one pending event per collector/item instead of every ping.
+    """
+    if sse_event_type(payload) == 'collector_location':
+        return ('collector', payload.get('user_id'))
+    if payload.get('item_id'):
+        return ('item', payload['item_id'])
+    return None
+
+
+class SubscriberEvicted(Exception):
+    """Raised to a stream whose subscriber fell too far behind and was dropped."""
+
+
+class Subscription:
+    """An open SSE stream: its pending events and the topics it listens to.
+
+    A subscription either follows every barangay (admins/collectors) or a single
+    ``barangay_id``; ``event_types`` optionally narrows it to some of
+    SSE_EVENT_TYPES.
+
+    Pending events are bounded by ``maxsize``: a superseded event is replaced by
+    its newer version (see sse_coalesce_key), and when the buffer is full the
+    oldest event is dropped. A subscriber that drops ``evict_after_drops`` events
+    without reading any is evicted, which ends its stream so the browser
+    reconnects.
+    """
+
+    def __init__(self, barangay_id=None, all_barangays=False, event_types=None,
+                 maxsize=200, evict_after_drops=200):
+        self.barangay_id = barangay_id
+        self.all_barangays = all_barangays
+        self.event_types = frozenset(event_types) if event_types else None
+        self.maxsize = maxsize
+        self.evict_after_drops = evict_after_drops
+        self.evicted = False
+        self._pending = OrderedDict()  # coalesce key -> (event_id, payload, enqueued_at)
+        self._cond = threading.Condition()
+        self._uncoalesced = itertools.count()
+        self._drops_since_read = 0
+        # lag metrics
+        self.connected_at = time.time()
+        self.last_read_at = None
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def wants(self, payload):
+        return self.event_types is None or sse_event_type(payload) in self.event_types
+
+    def follows(self, payload):
+        """True if the payload matches this subscription's barangay and event types."""
+        if not self.all_barangays and payload.get('barangay_id') != self.barangay_id:
+            return False
+        return self.wants(payload)
+
+    def put(self, event_id, payload):
+        key = sse_coalesce_key(payload) or ('event', next(self._uncoalesced))
+        with self._cond:
+            if self.evicted:
+                return
+            if key in self._pending:
+                # Re-append rather than update in place so events stay in publish order
+                del self._pending[key]
+                self.coalesced += 1
+            elif len(self._pending) >= self.maxsize:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+                self._drops_since_read += 1
+                if self._drops_since_read >= self.evict_after_drops:
+                    self.evicted = True
+                    self._pending.clear()
+                    self._cond.notify_all()
+                    return
+            self._pending[key] = (event_id, payload, time.time())
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the oldest pending (event_id, payload), raising Empty after ``timeout`` seconds."""
+        with self._cond:
+            if not self._pending and not self.evicted:
+                self._cond.wait(timeout)
+            if self.evicted:
+                raise SubscriberEvicted()
+            if not self._pending:
+                raise Empty()
+            _, (event_id, payload, _) = self._pending.popitem(last=False)
+            self.delivered += 1
+            self._drops_since_read = 0
+            self.last_read_at = time.time()
+            return event_id, payload
+
+    def pending_count(self):
+        with self._cond:
+            return len(self._pending)
+
+    def stats(self):
+        now = time.time()
+        with self._cond:
+            oldest = next(iter(self._pending.values()), None)
+            return {
+                'barangay_id': None if self.all_barangays else self.barangay_id,
+                'event_types': sorted(self.event_types) if self.event_types else None,
+                'pending': len(self._pending),
+                'oldest_pending_seconds': round(now - oldest[2], 3) if oldest else 0,
+                'delivered': self.delivered,
+                'coalesced': self.coalesced,
+                'dropped': self.dropped,
+                'evicted': self.evicted,
+                'connected_seconds': round(now - self.connected_at, 3),
+                'seconds_since_read': round(now - self.last_read_at, 3) if self.last_read_at else None,
+            }
+
+
+class InProcessBroker:
+    """Fan out SSE payloads to the subscribers of this process.
+
+    Subscriptions are indexed by barangay, so publishing only touches the streams
+    following that barangay plus those following all barangays.
+
+    Every event gets a monotonically increasing id and the last ``replay_size``
+    events are kept in a ring buffer, so a reconnecting stream can be sent just
+    the events it missed (see replay). Ids are seeded from the clock so they keep
+    increasing across restarts.
+    """
+
+    def __init__(self, queue_maxsize=200, evict_after_drops=200, replay_size=1000):
+        self.queue_maxsize = queue_maxsize
+        self.evict_after_drops = evict_after_drops
+        self.replay_size = replay_size
+        self._all = set()
+        self._by_barangay = {}
+        self._lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+        self._event_ids = itertools.count(int(time.time() * 1000))
+        self._ring = deque(maxlen=replay_size)
+
+    def subscribe(self, barangay_id=None, all_barangays=False, event_types=None):
+        sub = Subscription(barangay_id=barangay_id, all_barangays=all_barangays, event_types=event_types,
+                           maxsize=self.queue_maxsize, evict_after_drops=self.evict_after_drops)
+        with self._lock:
+            if sub.all_barangays:
+                self._all.add(sub)
+            else:
+                self._by_barangay.setdefault(sub.barangay_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            if sub.all_barangays:
+                self._all.discard(sub)
+                return
+            subs = self._by_barangay.get(sub.barangay_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._by_barangay[sub.barangay_id]
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._all) + sum(len(subs) for subs in self._by_barangay.values())
+
+    def subscriber_stats(self):
+        with self._lock:
+            subs = list(self._all)
+            for barangay_subs in self._by_barangay.values():
+                subs.extend(barangay_subs)
+        return [sub.stats() for sub in subs]
+
+    def publish(self, payload):
+        # Serialize publishes so every subscriber sees events in id order
+        with self._publish_lock:
+            event_id = next(self._event_ids)
+            self._ring.append((event_id, payload))
+            self._deliver(event_id, payload)
+        return event_id
+
+    def replay(self, last_event_id, sub):
+        """Events after ``last_event_id`` that ``sub`` follows, oldest first.
+
+        Returns None when the missed events can no longer be replayed (they fell
+        out of the ring buffer, or the id is from another process/epoch); the
+        client then has to resync from the regular APIs.
+        """
+        with self._publish_lock:
+            events = list(self._ring)
+        if not events:
+            return None
+        first_id, latest_id = events[0][0], events[-1][0]
+        if last_event_id > latest_id or last_event_id < first_id - 1:
+            return None
+        return [(event_id, payload) for event_id, payload in events
+                if event_id > last_event_id and sub.follows(payload)]
+
+    def _deliver(self, event_id, payload):
+        with self._lock:
+            targets = list(self._all)
+            targets.extend(self._by_barangay.get(payload.get('barangay_id'), ()))
+        for sub in targets:
+            if not sub.wants(payload):
+                continue
+            try:
+                sub.put(event_id, payload)
+            except Exception:
+                # ignore failures - subscriber may have disconnected
+                pass
+
+
+class SQLiteBroker(InProcessBroker):
+    """Cross-process broker relaying payloads through a shared SQLite file.
+
+    publish() appends the payload to an ``sse_event`` table; each process runs a
+    background poller that delivers rows it has not seen yet to its own
+    subscribers, so an update handled by one worker reaches every worker's streams.
+    The table doubles as a persistent replay buffer: row ids are the event ids and
+    the newest ``replay_size`` rows are kept.
+    """
+
+    def __init__(self, path, poll_interval=0.5, **broker_options):
+        super().__init__(**broker_options)
+        self.path = path
+        self.poll_interval = poll_interval
+        self._poller_pid = None
+        self._publish_count = 0
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS sse_event ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT NOT NULL, created_at REAL NOT NULL)'
+            )
+        self._last_id = self._latest_id()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:  # commit on success, roll back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def publish(self, payload):
+        with self._connect() as conn:
+            event_id = conn.execute('INSERT INTO sse_event (payload, created_at) VALUES (?, ?)',
+                                    (json.dumps(payload), time.time())).lastrowid
+            self._publish_count += 1
+            if self._publish_count % 100 == 0:
+                conn.execute('DELETE FROM sse_event WHERE id <= (SELECT MAX(id) FROM sse_event) - ?',
+                             (self.replay_size,))
+        return event_id
+
+    def replay(self, last_event_id, sub):
+        with self._connect() as conn:
+            first_id, latest_id = conn.execute('SELECT MIN(id), MAX(id) FROM sse_event').fetchone()
+            if latest_id is None or last_event_id > latest_id or last_event_id < first_id - 1:
+                return None
+            rows = conn.execute('SELECT id, payload FROM sse_event WHERE id > ? ORDER BY id',
+                                (last_event_id,)).fetchall()
+        events = [(event_id, json.loads(payload)) for event_id, payload in rows]
+        return [(event_id, payload) for event_id, payload in events if sub.follows(payload)]
+
+    def _latest_id(self):
+        with self._connect() as conn:
+            return conn.execute('SELECT COALESCE(MAX(id), 0) FROM sse_event').fetchone()[0]
+
+    def subscribe(self, **topics):
+        sub = super().subscribe(**topics)
+        self._ensure_poller()
+        return sub
+
+    def poll_once(self):
+        """Deliver events published (by any process) since the last poll."""
+        with self._connect() as conn:
+            rows = conn.execute('SELECT id, payload FROM sse_event WHERE id > ? ORDER BY id',
+                                (self._last_id,)).fetchall()
+        for event_id, payload in rows:
+            self._last_id = event_id
+            self._deliver(event_id, json.loads(payload))
+        return len(rows)
+
+    def _ensure_poller(self):
+        # Threads do not survive fork, so track which process started the poller
+        if self._poller_pid == os.getpid():
+            return
+        with self._lock:
+            if self._poller_pid == os.getpid():
+                return
+            self._poller_pid = os.getpid()
+            # Only relay events published from now on; older ones are served by replay()
+            self._last_id = self._latest_id()
+            threading.Thread(target=self._poll_forever, name='sse-broker-poller', daemon=True).start()
+
+    def _poll_forever(self):
+        while True:
+            try:
+                self.poll_once()
+            except Exception:
+                app.logger.exception('SSE broker poll failed')
+            time.sleep(self.poll_interval)
+
+
+def create_sse_broker(config):
+    """Build the SSE broker selected by the SSE_BROKER setting."""
+    broker_options = {
+        'queue_maxsize': config['SSE_QUEUE_MAXSIZE'],
+        'evict_after_drops': config['SSE_EVICT_AFTER_DROPS'],
+        'replay_size': config['SSE_REPLAY_BUFFER'],
+    }
+    if config['SSE_BROKER'] == 'sqlite':
+        return SQLiteBroker(config['SSE_BROKER_PATH'], poll_interval=config['SSE_BROKER_POLL_INTERVAL'],
+                            **broker_options)
+    return InProcessBroker(**broker_options)
+
+
+sse_broker = create_sse_broker(app.config)
 
 def notify_waste_location(data: dict):
     """Notify all SSE subscribers with the given data payload, but only for items inside the configured coverage area."""
     try:
         barangay_id = data.get('barangay_id')
-        # If barangay_id is missing, try to derive it from item_id
+        # If barangay_id is missing, try to derive it from item_id (all routes in
+        # this module include barangay_id, so publishing normally runs no SQL)
         if barangay_id is None and data.get('item_id'):
             wi = WasteItem.query.filter_by(item_id=data.get('item_id')).first()
             barangay_id = wi.barangay_id if wi else None
@@ -176,12 +540,10 @@ def notify_waste_location(data: dict):
         # On error, avoid broadcasting unknown items
         return
 
-    for q in list(_sse_subscribers):
-        try:
-            q.put_nowait(data)
-        except Exception:
-            # ignore failures - subscriber may have disconnected
-            pass
+    # The broker routes on barangay_id, so make sure a derived one is included
+    payload = dict(data, barangay_id=barangay_id)
+    payload.setdefault('type', 'waste_location')
+    sse_broker.publish(payload)
 
 
 def notify_collector_location(data: dict):
@@ -199,34 +561,285 @@ def notify_collector_location(data: dict):
     payload = data.copy()
     payload['type'] = 'collector_location'
 
-    for q in list(_sse_subscribers):
-        try:
-            q.put_nowait(payload)
-        except Exception:
-            pass
+    sse_broker.publish(payload)
 
 @app.route('/stream/waste_locations')
 @login_required
 def stream_waste_locations():
-    """Server-Sent Events stream for real-time waste location updates (waste items and collector locations)."""
+    """Server-Sent Events stream for real-time waste location updates (waste items and collector locations).
+
+    The generator only waits on its queue and never touches the request or the
+    database, so under a gevent worker (see Procfile) each open stream costs a
+    greenlet rather than a whole worker.
+
+    Query params:
+      barangay_id (optional): admins and collectors can narrow the stream to one barangay;
+        barangay users always receive only their own barangay's events.
+      types (optional): comma-separated subset of waste_location, collector_location.
+      last_event_id (optional): same as the Last-Event-ID header EventSource sends on reconnect.
+
+    Each event carries an id; a reconnecting client is first sent the events it
+    missed, or a {"type": "resync"} message if they are no longer buffered.
+    """
+    user = get_current_user()
+    if not user:
+        return jsonify(success=False, error='Not authenticated'), 401
+
+    topics = {}
+    if user.is_admin() or user.is_collector():
+        barangay_id = request.args.get('barangay_id', type=int)
+        if barangay_id is None:
+            topics['all_barangays'] = True
+        else:
+            topics['barangay_id'] = barangay_id
+    else:
+        topics['barangay_id'] = user.barangay_id
+
+    types = [t for t in request.args.get('types', '').split(',') if t]
+    if any(t not in SSE_EVENT_TYPES for t in types):
+        return jsonify(success=False, error=f'types must be among {", ".join(SSE_EVENT_TYPES)}'), 400
+    topics['event_types'] = types or None
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
     def gen():
-        q = Queue()
-        _sse_subscribers.append(q)
+        # Subscribe before replaying so nothing published in between is lost;
+        # anything seen in both is skipped by comparing ids.
+        sub = sse_broker.subscribe(**topics)
+        sent_id = last_event_id
         try:
+            if last_event_id is not None:
+                missed = sse_broker.replay(last_event_id, sub)
+                if missed is None:
+                    yield f"data: {json.dumps({'type': 'resync'})}\n\n"
+                    sent_id = None
+                for event_id, payload in missed or ():
+                    sent_id = event_id
+                    yield f"id: {event_id}\ndata: {json.dumps(payload)}\n\n"
             while True:
                 try:
-                    payload = q.get(timeout=15)
-                    yield f"data: {json.dumps(payload)}\n\n"
+                    event_id, payload = sub.get(timeout=SSE_KEEPALIVE_SECONDS)
+                    if sent_id is not None and event_id <= sent_id:
+                        continue
+                    sent_id = event_id
+                    yield f"id: {event_id}\ndata: {json.dumps(payload)}\n\n"
                 except Empty:
                     # keep-alive
                     yield ":\n\n"
+        except SubscriberEvicted:
+            # Too slow to keep up; ending the stream makes EventSource reconnect
+            app.logger.info('Evicted slow SSE subscriber: %s', sub.stats())
         finally:
+            sse_broker.unsubscribe(sub)
+
+    return Response(gen(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+# Collector GPS ingestion.
+#
+# collection_team.html posts a ping every few seconds per collector. Rather than
+# committing a user row for each one, pings are kept in memory (which is what SSE
+# and /api_collectors read) and the latest position per collector is written back
+# in one batched UPDATE every COLLECTOR_LOCATION_FLUSH_INTERVAL seconds. That
+# interval is also the durability window: at most that much of the newest
+# position data is lost if a worker dies. 0 writes every ping through immediately.
+app.config['COLLECTOR_LOCATION_FLUSH_INTERVAL'] = float(os.environ.get('COLLECTOR_LOCATION_FLUSH_INTERVAL', 5))
+# Breadcrumb downsampling: a ping is appended to the location history only once the
+# collector has moved COLLECTOR_TRACK_MIN_DISTANCE metres or COLLECTOR_TRACK_MAX_INTERVAL
+# seconds have passed since the last stored point.
+app.config['COLLECTOR_TRACK_MIN_DISTANCE'] = float(os.environ.get('COLLECTOR_TRACK_MIN_DISTANCE', 20))
+app.config['COLLECTOR_TRACK_MAX_INTERVAL'] = float(os.environ.get('COLLECTOR_TRACK_MAX_INTERVAL', 60))
+# A silence longer than this starts a new polyline in /api/collectors/<id>/track
+app.config['COLLECTOR_TRACK_SEGMENT_GAP'] = float(os.environ.get('COLLECTOR_TRACK_SEGMENT_GAP', 600))
+
+
+def as_utc(dt):
+    """Treat naive datetimes (as SQLite returns them) as UTC so they compare with utcnow()."""
+    if dt is not None and dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+class CollectorLocationPoint(db.Model):
+    """Append-only breadcrumb of collector positions, already downsampled on write."""
+    __tablename__ = 'collector_location_point'
+    __table_args__ = (
+        db.Index('ix_collector_location_point_user_recorded_at', 'user_id', 'recorded_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    recorded_at = db.Column(db.DateTime, nullable=False)
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+
+
+EARTH_RADIUS_M = 6371008.8
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """Great-circle distance in metres between two lat/lng points."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def simplify_polyline(points, tolerance_m):
+    """Douglas-Peucker simplification of (latitude, longitude, ...) tuples.
+
+    Points are projected onto a local equirectangular plane in metres, which is
+    accurate enough at the scale of a municipality. Endpoints are always kept.
+    """
+    if len(points) < 3 or tolerance_m <= 0:
+        return list(points)
+    lat0 = math.radians(points[0][0])
+    xy = [(math.radians(p[1]) * math.cos(lat0) * EARTH_RADIUS_M, math.radians(p[0]) * EARTH_RADIUS_M)
+          for p in points]
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = xy[first], xy[last]
+        dx, dy = x2 - x1, y2 - y1
+        seg_len = math.hypot(dx, dy)
+        max_dist, index = 0.0, None
+        for i in range(first + 1, last):
+            px, py = xy[i]
+            if seg_len == 0:
+                dist = math.hypot(px - x1, py - y1)
+            else:
+                dist = abs(dy * px - dx * py + x2 * y1 - y2 * x1) / seg_len
+            if dist > max_dist:
+                max_dist, index = dist, i
+        if index is not None and max_dist > tolerance_m:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [p for p, k in zip(points, keep) if k]
+
+
+class CollectorLocationBuffer:
+    """Latest collector positions held in memory and flushed to the user table in batches.
+
+    Pings that pass the breadcrumb downsampling are queued as well and appended
+    to ``collector_location_point`` by the same flush.
+    """
+
+    def __init__(self):
+        self._latest = {}  # user_id -> (latitude, longitude, seen_at)
+        self._dirty = set()
+        self._last_kept = {}  # user_id -> (latitude, longitude, seen_at) of the last breadcrumb
+        self._track = []  # breadcrumb rows waiting for the next flush
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def record(self, user_id, latitude, longitude, seen_at):
+        with self._lock:
+            # Pings uploaded late by /api/sync must not move the collector back in time
+            latest = self._latest.get(user_id)
+            if latest is None or seen_at >= latest[2]:
+                self._latest[user_id] = (latitude, longitude, seen_at)
+                self._dirty.add(user_id)
+            # Downsampling state is per process, so with several workers a collector
+            # may get a few more breadcrumbs than the thresholds alone would allow.
+            kept = self._last_kept.get(user_id)
+            if (kept is None
+                    or (seen_at - kept[2]).total_seconds() >= app.config['COLLECTOR_TRACK_MAX_INTERVAL']
+                    or haversine_m(kept[0], kept[1], latitude, longitude) >= app.config['COLLECTOR_TRACK_MIN_DISTANCE']):
+                self._last_kept[user_id] = (latitude, longitude, seen_at)
+                self._track.append({'user_id': user_id, 'latitude': latitude,
+                                    'longitude': longitude, 'recorded_at': seen_at})
+        if app.config['COLLECTOR_LOCATION_FLUSH_INTERVAL'] <= 0:
+            self.flush()
+        else:
+            self._ensure_flusher()
+
+    def latest(self, user_id):
+        """(latitude, longitude, seen_at) of the newest ping seen by this process, or None."""
+        return self._latest.get(user_id)
+
+    def pending_track(self, user_id, start, end):
+        """Breadcrumbs of a collector recorded in [start, end] that are not flushed yet."""
+        with self._lock:
+            return [(row['latitude'], row['longitude'], row['recorded_at']) for row in self._track
+                    if row['user_id'] == user_id and start <= row['recorded_at'] <= end]
+
+    def flush(self):
+        """Write the newest position of every collector that moved, and the queued track points."""
+        with self._lock:
+            batch = [
+                {'id': user_id, 'last_latitude': lat, 'last_longitude': lng, 'last_seen': seen}
+                for user_id, (lat, lng, seen) in ((uid, self._latest[uid]) for uid in self._dirty)
+            ]
+            track, self._track = self._track, []
+            self._dirty.clear()
+        if not batch and not track:
+            return 0
+        try:
+            if batch:
+                # ORM bulk UPDATE by primary key - a single executemany
+                db.session.execute(db.update(User), batch)
+            if track:
+                db.session.execute(db.insert(CollectorLocationPoint), track)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            with self._lock:
+                self._dirty.update(row['id'] for row in batch)
+                self._track[:0] = track
+            raise
+        return len(batch)
+
+    def _ensure_flusher(self):
+        # Threads do not survive fork, so track which process started the flusher
+        if self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+            threading.Thread(target=self._flush_forever, name='collector-location-flusher', daemon=True).start()
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(max(app.config['COLLECTOR_LOCATION_FLUSH_INTERVAL'], 0.1))
+            self.flush_in_app_context()
+
+    def flush_in_app_context(self):
+        if not self._dirty:
+            return
+        with app.app_context():
             try:
-                _sse_subscribers.remove(q)
-            except ValueError:
-                pass
+                self.flush()
+            except Exception:
+                app.logger.exception('Flushing collector locations failed')
 
-    return Response(stream_with_context(gen()), mimetype='text/event-stream')
+
+collector_locations = CollectorLocationBuffer()
+atexit.register(collector_locations.flush_in_app_context)
+
+
+@app.route('/api/sse/metrics')
+@admin_required
+def sse_metrics():
+    """Per-subscriber backlog and delivery counters for this worker's SSE streams."""
+    subscribers = sse_broker.subscriber_stats()
+    return jsonify(
+        pid=os.getpid(),
+        broker=type(sse_broker).__name__,
+        subscribers=subscribers,
+        total_pending=sum(s['pending'] for s in subscribers),
+        total_dropped=sum(s['dropped'] for s in subscribers)
+    )
 
 
 @app.route('/api_collectors')
@@ -235,6 +848,9 @@ def api_collectors():
     """Return collectors and their last known locations for a barangay.
 
     Query params: barangay_id (optional). If omitted, uses the current user's barangay.
+    Every collector is returned, so the map can age the marker of one who stopped
+    pinging; the response carries an ETag over the newest position, so a poll
+    with nothing new is answered with 304.
     Access control: barangay users can only request their own barangay; admins can request any.
     """
     user = get_current_user()
@@ -250,17 +866,32 @@ def api_collectors():
 
     collectors = User.query.filter_by(role='collector', barangay_id=barangay_id).all()
     out = []
+    newest = None
     for c in collectors:
+        lat, lng, seen = c.last_latitude, c.last_longitude, as_utc(c.last_seen)
+        # Pings received by this worker may not have been flushed to the database yet
+        buffered = collector_locations.latest(c.id)
+        if buffered and (seen is None or buffered[2] > seen):
+            lat, lng, seen = buffered
+        if seen is not None and (newest is None or seen > newest):
+            newest = seen
         out.append({
             'id': c.id,
             'username': c.username,
             'full_name': c.full_name,
-            'latitude': c.last_latitude,
-            'longitude': c.last_longitude,
-            'last_seen': c.last_seen.isoformat() if c.last_seen else None
+            'latitude': lat,
+            'longitude': lng,
+            'last_seen': seen.isoformat() if seen else None
         })
 
-    return jsonify(success=True, collectors=out)
+    etag = f'{barangay_id}-{len(collectors)}-{newest.isoformat() if newest else None}'
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(success=True, collectors=out)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 
 @app.route('/collector_location', methods=['POST'])
@@ -269,7 +900,8 @@ def collector_location():
     """Endpoint for collectors to POST their current device location.
 
     Accepts JSON: { device_latitude, device_longitude }
-    Updates the current user's last_latitude, last_longitude, last_seen and broadcasts via SSE.
+    Records the current user's position in the ingestion buffer (written to last_latitude,
+    last_longitude, last_seen on the next flush) and broadcasts it via SSE.
     """
     data = request.get_json(force=True, silent=True) or {}
     device_lat = data.get('device_latitude') or data.get('latitude')
@@ -283,11 +915,8 @@ def collector_location():
     if not user:
         return jsonify(success=False, error='Not authenticated'), 401
 
-    user.last_latitude = lat_f
-    user.last_longitude = lng_f
-    user.last_seen = utcnow()
-    db.session.add(user)
-    db.session.commit()
+    seen_at = utcnow()
+    collector_locations.record(user.id, lat_f, lng_f, seen_at)
 
     # Broadcast to SSE subscribers
     try:
@@ -298,13 +927,104 @@ def collector_location():
             'barangay_id': user.barangay_id,
             'latitude': lat_f,
             'longitude': lng_f,
-            'last_seen': user.last_seen.isoformat()
+            'last_seen': seen_at.isoformat()
         })
     except Exception:
         pass
 
     return jsonify(success=True)
 
+
+def parse_utc_datetime(value):
+    """Parse an ISO 8601 timestamp; naive values are taken as UTC. Raises ValueError."""
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return as_utc(datetime.fromisoformat(value)).astimezone(timezone.utc)
+
+
+@app.route('/api/collectors/<int:user_id>/track')
+@login_required
+def collector_track(user_id):
+    """Stream a collector's route for a time window as simplified polylines.
+
+    Query params: from, to (ISO 8601, default the last 24 hours) and tolerance
+    (Douglas-Peucker tolerance in metres, default 10). The route is split into
+    segments wherever the collector went silent for longer than
+    COLLECTOR_TRACK_SEGMENT_GAP. Each segment carries its points as
+    [latitude, longitude, unix_time] and the distance travelled, measured on the
+    stored (unsimplified) breadcrumbs.
+    Access control: collectors can read their own track, barangay users the
+    tracks of collectors in their barangay, admins any track.
+    """
+    user = get_current_user()
+    if not user:
+        return jsonify(success=False, error='Not authenticated'), 401
+
+    collector = db.session.get(User, user_id)
+    if not collector:
+        return jsonify(success=False, error='Collector not found'), 404
+    if not (user.is_admin() or user.id == collector.id
+            or (user.is_barangay() and user.barangay_id is not None and user.barangay_id == collector.barangay_id)):
+        return jsonify(success=False, error='Forbidden'), 403
+
+    try:
+        end = parse_utc_datetime(request.args['to']) if request.args.get('to') else utcnow()
+        start = parse_utc_datetime(request.args['from']) if request.args.get('from') else end - timedelta(days=1)
+        tolerance = float(request.args.get('tolerance', 10))
+    except ValueError:
+        return jsonify(success=False, error='Invalid from/to/tolerance'), 400
+    if start > end:
+        return jsonify(success=False, error='from must not be after to'), 400
+
+    gap = app.config['COLLECTOR_TRACK_SEGMENT_GAP']
+    pending = collector_locations.pending_track(collector.id, start, end)
+
+    def breadcrumbs():
+        query = db.session.query(
+            CollectorLocationPoint.latitude, CollectorLocationPoint.longitude, CollectorLocationPoint.recorded_at
+        ).filter(
+            CollectorLocationPoint.user_id == collector.id,
+            CollectorLocationPoint.recorded_at >= start,
+            CollectorLocationPoint.recorded_at <= end
+        ).order_by(CollectorLocationPoint.recorded_at, CollectorLocationPoint.id)
+        last_seen = None
+        for lat, lng, recorded_at in query.yield_per(1000):
+            last_seen = as_utc(recorded_at)
+            yield lat, lng, last_seen
+        # Breadcrumbs this worker has not flushed yet are the newest ones; skip any
+        # that a concurrent flush already wrote
+        for point in pending:
+            if last_seen is None or point[2] > last_seen:
+                yield point
+
+    def segments():
+        segment = []
+        for point in breadcrumbs():
+            if segment and (point[2] - segment[-1][2]).total_seconds() > gap:
+                yield segment
+                segment = []
+            segment.append(point)
+        if segment:
+            yield segment
+
+    def gen():
+        total = 0.0
+        yield json.dumps({'success': True, 'collector_id': collector.id,
+                          'from': start.isoformat(), 'to': end.isoformat()})[:-1] + ', "segments": ['
+        for i, segment in enumerate(segments()):
+            distance = sum(haversine_m(a[0], a[1], b[0], b[1]) for a, b in zip(segment, segment[1:]))
+            total += distance
+            yield (', ' if i else '') + json.dumps({
+                'start': segment[0][2].isoformat(),
+                'end': segment[-1][2].isoformat(),
+                'distance_m': round(distance, 1),
+                'points': [[lat, lng, int(ts.timestamp())] for lat, lng, ts in simplify_polyline(segment, tolerance)]
+            })
+        yield '], "distance_m": %s}' % json.dumps(round(total, 1))
+
+    return Response(stream_with_context(gen()), mimetype='application/json')
+
+
 class CollectionRoute(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     route_name = db.Column(db.String(100), nullable=False)
@@ -317,6 +1037,18 @@ class CollectionRoute(db.Model):
     barangay = db.relationship('Barangay', backref=db.backref('collection_routes', lazy=True))
 
 class WasteItem(db.Model):
+    # Composite indexes follow the filters/orderings used by the list and dashboard views
+    # (see audit_query_plans / `flask db-index-audit`)
+    __table_args__ = (
+        db.Index('ix_waste_item_status_created_at', 'status', 'created_at'),
+        db.Index('ix_waste_item_status_confirmed_updated_at', 'status', 'client_confirmed', 'updated_at'),
+        db.Index('ix_waste_item_created_by_status', 'created_by', 'status'),
+        db.Index('ix_waste_item_barangay_created_at', 'barangay_id', 'created_at'),
+        db.Index('ix_waste_item_created_at', 'created_at'),
+        db.Index('ix_waste_item_status_updated_at', 'status', 'updated_at'),
+        db.Index('ix_waste_item_updated_at', 'updated_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     item_id = db.Column(db.String(50), unique=True, nullable=False)
     item_name = db.Column(db.String(100), nullable=False)
@@ -345,6 +1077,11 @@ class WasteItem(db.Model):
     sorter = db.relationship('User', foreign_keys=[sorted_by], backref=db.backref('sorted_waste_items', lazy=True))
 
 class WasteTracking(db.Model):
+    __table_args__ = (
+        db.Index('ix_waste_tracking_item_timestamp', 'waste_item_id', 'timestamp'),
+        db.Index('ix_waste_tracking_timestamp', 'timestamp'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     waste_item_id = db.Column(db.Integer, db.ForeignKey('waste_item.id'), nullable=False)
     status = db.Column(db.String(50), nullable=False)
@@ -358,6 +1095,158 @@ class WasteTracking(db.Model):
     waste_item = db.relationship('WasteItem', backref=db.backref('tracking_records', lazy=True))
     updater = db.relationship('User', foreign_keys=[updated_by], backref=db.backref('updates', lazy=True))
 
+class WasteItemPosition(db.Model):
+    """Latest known map position of a waste item.
+
+    This is a projection of ``waste_tracking`` kept up to date by the routes that
+    record tracking, so map polling never has to walk the tracking history.
+    """
+    __tablename__ = 'waste_item_position'
+    waste_item_id = db.Column(db.Integer, db.ForeignKey('waste_item.id'), primary_key=True)
+    status = db.Column(db.String(50), nullable=True)  # status of the latest tracking record
+    latitude = db.Column(db.Float, nullable=True)  # latest coordinates seen for the item
+    longitude = db.Column(db.Float, nullable=True)
+    timestamp = db.Column(db.DateTime, nullable=True)  # time of the latest tracking record
+    collector_name = db.Column(db.String(100), nullable=True)  # who recorded the latest coordinates
+
+
+def update_item_position(waste_item, tracking, collector_name=None):
+    """Fold a new tracking record into the item's materialized position.
+
+    Every writer of a WasteTracking row calls this (bulk imports insert the
+    position rows themselves), before committing the tracking record so both
+    rows are written in the same transaction. Coordinates (and the collector who recorded them) only
+    move when the record carries a full lat/lng pair, mirroring the fallback to
+    the latest coordinate-bearing record that the map has always used.
+    """
+    if tracking.timestamp is None:
+        tracking.timestamp = utcnow()
+
+    position = db.session.get(WasteItemPosition, waste_item.id)
+    if position is None:
+        position = WasteItemPosition(waste_item_id=waste_item.id)
+        db.session.add(position)
+    elif position.timestamp is not None and as_utc(tracking.timestamp) < as_utc(position.timestamp):
+        # Recorded before the latest known state (an offline update uploaded
+        # late by /api/sync): it only joins the history
+        return position
+
+    position.status = tracking.status
+    position.timestamp = tracking.timestamp
+    if tracking.latitude is not None and tracking.longitude is not None:
+        position.latitude = tracking.latitude
+        position.longitude = tracking.longitude
+        position.collector_name = collector_name
+    return position
+
+
+def item_update_superseded(waste_item, timestamp):
+    """True if a tracking record newer than ``timestamp`` already determines the item's state."""
+    position = db.session.get(WasteItemPosition, waste_item.id)
+    return position is not None and position.timestamp is not None and as_utc(timestamp) < as_utc(position.timestamp)
+
+
+def rebuild_item_positions():
+    """Recompute every row of ``waste_item_position`` from the tracking history."""
+    from sqlalchemy.orm import aliased
+    last = aliased(WasteTracking)
+    with_coords = aliased(WasteTracking)
+    collector = aliased(User)
+
+    latest_id = db.select(WasteTracking.id).where(
+        WasteTracking.waste_item_id == WasteItem.id
+    ).order_by(WasteTracking.timestamp.desc(), WasteTracking.id.desc()).limit(1).scalar_subquery()
+    latest_with_coords_id = db.select(WasteTracking.id).where(
+        WasteTracking.waste_item_id == WasteItem.id,
+        WasteTracking.latitude.isnot(None),
+        WasteTracking.longitude.isnot(None)
+    ).order_by(WasteTracking.timestamp.desc(), WasteTracking.id.desc()).limit(1).scalar_subquery()
+
+    source = db.select(
+        WasteItem.id, last.status, last.timestamp,
+        with_coords.latitude, with_coords.longitude, collector.full_name
+    ).select_from(WasteItem) \
+     .join(last, last.id == latest_id) \
+     .outerjoin(with_coords, with_coords.id == latest_with_coords_id) \
+     .outerjoin(collector, with_coords.updated_by == collector.id)
+
+    WasteItemPosition.query.delete()
+    # Positions were rewritten outside the change feed; dropping it makes every
+    # map client's cursor invalid so they fall back to a full reload.
+    WasteItemChange.query.delete()
+    db.session.execute(db.insert(WasteItemPosition).from_select(
+        ['waste_item_id', 'status', 'timestamp', 'latitude', 'longitude', 'collector_name'],
+        source
+    ))
+    db.session.commit()
+    return WasteItemPosition.query.count()
+
+
+class WasteItemChange(db.Model):
+    """Change feed of waste items, read by map polling with a ``?since=`` cursor.
+
+    One row is appended per item touched by a flush (see log_waste_item_changes).
+    The autoincrement id is the cursor; SQLite assigns ids under its single write
+    lock, so ids become visible in commit order. Only the newest
+    WASTE_ITEM_CHANGE_RETENTION rows are kept - clients with an older cursor get
+    a full reload.
+    """
+    __tablename__ = 'waste_item_change'
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    id = db.Column(db.Integer, primary_key=True)
+    waste_item_id = db.Column(db.Integer, nullable=False)  # no FK: rows outlive deleted items
+    item_id = db.Column(db.String(50), nullable=True)  # public id, needed to report deletions
+    barangay_id = db.Column(db.Integer, nullable=True)  # lets barangay-scoped maps skip other barangays
+    changed_at = db.Column(db.DateTime, default=utcnow)
+
+
+app.config['WASTE_ITEM_CHANGE_RETENTION'] = int(os.environ.get('WASTE_ITEM_CHANGE_RETENTION', 10000))
+_change_log_flushes = itertools.count(1)
+
+
+@db.event.listens_for(db.session, 'after_flush')
+def log_waste_item_changes(session, flush_context):
+    """Append a waste_item_change row for every item or position written by this flush."""
+    changes = {}
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, (WasteItem, WasteItemPosition)):
+            continue
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        item = obj if isinstance(obj, WasteItem) else session.identity_map.get(identity_key(WasteItem, obj.waste_item_id))
+        if item is not None:
+            # An item moved between barangays must also disappear from its old barangay's map
+            moved = isinstance(obj, WasteItem) and db.inspect(obj).attrs.barangay_id.history.deleted
+            changes[item.id] = (item.item_id, None if moved else item.barangay_id)
+        else:
+            changes.setdefault(obj.waste_item_id, (None, None))
+    if changes:
+        append_waste_item_changes(session.connection(), changes)
+
+
+def append_waste_item_changes(conn, changes):
+    """Insert change feed rows for ``{waste_item_id: (item_id, barangay_id)}``.
+
+    Writes that bypass the session (bulk inserts) call this directly.
+    """
+    conn.execute(db.insert(WasteItemChange), [
+        {'waste_item_id': waste_item_id, 'item_id': item_id, 'barangay_id': barangay_id}
+        for waste_item_id, (item_id, barangay_id) in changes.items()
+    ])
+    if next(_change_log_flushes) % 100 == 0:
+        conn.execute(db.delete(WasteItemChange).where(
+            WasteItemChange.id <= db.select(db.func.max(WasteItemChange.id)).scalar_subquery()
+            - app.config['WASTE_ITEM_CHANGE_RETENTION']
+        ))
+
+
+@app.cli.command('rebuild-positions')
+def rebuild_positions_command():
+    """Rebuild the waste_item_position projection from waste_tracking."""
+    count = rebuild_item_positions()
+    print(f"Rebuilt positions for {count} waste items")
+
 
 # Coverage helper functions - restrict tracking/notifications to a specific municipality/province
 COVERAGE_MUNICIPALITY = 'Nabua'
@@ -368,15 +1257,63 @@ COVERAGE_PROVINCE = 'Camarines Sur'
 NABUA_BOUNDS = [[13.15, 122.95], [13.55, 123.45]]
 NABUA_CENTER = [13.35, 123.2]  # conservative center point for Nabua maps
 
+BarangayInfo = namedtuple('BarangayInfo', ['in_coverage', 'municipality', 'name'])
+
+
+class BarangayCoverageCache:
+    """In-process cache of barangay id -> BarangayInfo.
+
+    The SSE publish path checks coverage for every event (including each collector
+    GPS ping), so this keeps that check free of SQL. The whole barangay table is
+    small and is loaded in one query. Routes that change barangays call
+    invalidate(); the TTL bounds staleness in other worker processes.
+    """
+
+    def __init__(self, ttl=300, miss_reload_interval=5):
+        self.ttl = ttl
+        self.miss_reload_interval = miss_reload_interval
+        self._entries = None
+        self._loaded_at = 0
+        self._lock = threading.Lock()
+
+    def get(self, barangay_id):
+        entries = self._entries
+        age = time.time() - self._loaded_at
+        if entries is None or age > self.ttl or (barangay_id not in entries and age > self.miss_reload_interval):
+            entries = self._load()
+        return entries.get(barangay_id)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries = None
+
+    def _load(self):
+        rows = db.session.query(Barangay.id, Barangay.name, Barangay.municipality, Barangay.province).all()
+        entries = {
+            r.id: BarangayInfo(
+                in_coverage=(r.municipality == COVERAGE_MUNICIPALITY and r.province == COVERAGE_PROVINCE),
+                municipality=r.municipality,
+                name=r.name
+            ) for r in rows
+        }
+        with self._lock:
+            self._entries = entries
+            self._loaded_at = time.time()
+        return entries
+
+
+app.config['BARANGAY_CACHE_TTL'] = int(os.environ.get('BARANGAY_CACHE_TTL', 300))
+barangay_cache = BarangayCoverageCache(ttl=app.config['BARANGAY_CACHE_TTL'])
+
+
 def is_barangay_in_coverage(barangay_id: int = None, barangay: 'Barangay' = None):
     """Return True if the given barangay (or barangay_id) is within the configured coverage area."""
     try:
         if barangay is None and barangay_id is None:
             return False
         if barangay is None:
-            barangay = db.session.get(Barangay, barangay_id)
-        if not barangay:
-            return False
+            info = barangay_cache.get(barangay_id)
+            return bool(info and info.in_coverage)
         return (barangay.municipality == COVERAGE_MUNICIPALITY and barangay.province == COVERAGE_PROVINCE)
     except Exception:
         return False
@@ -598,33 +1535,380 @@ def settings():
     
     return render_template('settings.html', user=user)
 
+WASTE_STATUSES = ('pending_collection', 'collected', 'in_transit', 'processed', 'disposed', 'not_collected')
+
+
+class WasteStatsRollup(db.Model):
+    """Number of waste items per (barangay, creator, waste type, status).
+
+    Kept in step with waste_item by apply_waste_stats_deltas inside the same
+    flush, so dashboards read a table whose size does not grow with the number
+    of items. Items without a creator are counted under created_by = 0, because
+    NULL never matches in the primary key upsert. ``flask rebuild-stats``
+    recomputes it from scratch.
+    """
+    __tablename__ = 'waste_stats'
+    barangay_id = db.Column(db.Integer, primary_key=True)
+    created_by = db.Column(db.Integer, primary_key=True)
+    waste_type = db.Column(db.String(50), primary_key=True)
+    status = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+# Load the previous value of the rollup key columns even when an expired item is
+# modified, so the flush knows which waste_stats row to decrement
+for _attr in (WasteItem.barangay_id, WasteItem.created_by, WasteItem.waste_type, WasteItem.status):
+    db.event.listen(_attr, 'set', lambda *args: None, active_history=True)
+
+
+def _waste_stats_key(item, committed):
+    """Rollup key of an item, either as last flushed (committed=True) or as it is now."""
+    state = db.inspect(item)
+    values = []
+    for name in ('barangay_id', 'created_by', 'waste_type', 'status'):
+        attr = state.attrs[name]
+        history = attr.history
+        if committed and history.deleted:
+            value = history.deleted[0]
+        elif committed and history.added and not history.unchanged:
+            value = None  # attribute was first set in this flush
+        else:
+            value = attr.value
+        values.append(value)
+    values[1] = values[1] or 0
+    return tuple(values)
+
+
+@db.event.listens_for(db.session, 'after_flush')
+def apply_waste_stats_deltas(session, flush_context):
+    """Move waste_stats counts for every waste item inserted, deleted or re-keyed by this flush."""
+    deltas = {}
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, WasteItem):
+            continue
+        if obj in session.new:
+            keys = [(None, _waste_stats_key(obj, committed=False))]
+        elif obj in session.deleted:
+            keys = [(_waste_stats_key(obj, committed=True), None)]
+        else:
+            keys = [(_waste_stats_key(obj, committed=True), _waste_stats_key(obj, committed=False))]
+        for old, new in keys:
+            if old == new:
+                continue
+            if old is not None:
+                deltas[old] = deltas.get(old, 0) - 1
+            if new is not None:
+                deltas[new] = deltas.get(new, 0) + 1
+    upsert_waste_stats(session.connection(), deltas)
+
+
+def upsert_waste_stats(conn, deltas):
+    """Add ``{(barangay_id, created_by, waste_type, status): delta}`` to the waste_stats counts.
+
+    Shared by the after_flush hook and bulk imports, which insert with Core.
+    """
+    rows = [
+        {'barangay_id': key[0], 'created_by': key[1], 'waste_type': key[2], 'status': key[3], 'count': delta}
+        for key, delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+    upsert = sqlite_insert(WasteStatsRollup)
+    conn.execute(
+        upsert.on_conflict_do_update(
+            index_elements=['barangay_id', 'created_by', 'waste_type', 'status'],
+            set_={'count': WasteStatsRollup.count + upsert.excluded['count']}
+        ),
+        rows
+    )
+
+
+def rebuild_waste_stats():
+    """Recompute every row of ``waste_stats`` from waste_item."""
+    WasteStatsRollup.query.delete()
+    db.session.execute(db.insert(WasteStatsRollup).from_select(
+        ['barangay_id', 'created_by', 'waste_type', 'status', 'count'],
+        db.select(
+            WasteItem.barangay_id, db.func.coalesce(WasteItem.created_by, 0), WasteItem.waste_type,
+            WasteItem.status, db.func.count(WasteItem.id)
+        ).group_by(WasteItem.barangay_id, db.func.coalesce(WasteItem.created_by, 0), WasteItem.waste_type, WasteItem.status)
+    ))
+    db.session.commit()
+    return db.session.query(db.func.coalesce(db.func.sum(WasteStatsRollup.count), 0)).scalar()
+
+
+@app.cli.command('rebuild-stats')
+def rebuild_stats_command():
+    """Rebuild the waste_stats rollup from waste_item."""
+    count = rebuild_waste_stats()
+    print(f"Rebuilt statistics for {count} waste items")
+
+
+# Fail any relationship lazy load that a template triggers (an N+1 in a list view).
+# List views load what their templates use with joinedload/selectinload up front;
+# tests turn this on so a template that starts touching a new relationship fails
+# instead of quietly issuing one query per row.
+app.config['RAISE_ON_LAZY_LOAD'] = os.environ.get('RAISE_ON_LAZY_LOAD', '').lower() in ('1', 'true', 'yes')
+
+
+class LazyLoadInTemplate(Exception):
+    """Raised when a template lazy-loads a relationship while RAISE_ON_LAZY_LOAD is on."""
+
+
+@before_render_template.connect_via(app)
+def _enter_template_render(sender, template, context, **extra):
+    g.rendering_templates = g.get('rendering_templates', 0) + 1
+
+
+@template_rendered.connect_via(app)
+def _leave_template_render(sender, template, context, **extra):
+    g.rendering_templates = max(g.get('rendering_templates', 0) - 1, 0)
+
+
+@db.event.listens_for(db.session, 'do_orm_execute')
+def raise_on_template_lazy_load(orm_execute_state):
+    if (orm_execute_state.is_relationship_load and app.config['RAISE_ON_LAZY_LOAD']
+            and has_app_context() and g.get('rendering_templates')):
+        raise LazyLoadInTemplate(
+            f"{orm_execute_state.statement} was lazy-loaded while rendering a template; "
+            "load the relationship in the view with joinedload/selectinload"
+        )
+
+
+WasteTypeCount = namedtuple('WasteTypeCount', ['waste_type', 'count'])
+BarangayCounts = namedtuple('BarangayCounts', ['name', 'total_items', 'pending_items', 'pending', 'collected', 'processed'])
+WasteStats = namedtuple('WasteStats', ['total', 'by_status', 'by_waste_type', 'by_barangay'])
+
+
+def waste_item_stats_query(created_by=None):
+    """waste_stats counts grouped by (barangay, waste_type, status), see waste_item_stats()."""
+    query = db.session.query(
+        Barangay.id, Barangay.name, WasteStatsRollup.waste_type, WasteStatsRollup.status,
+        db.func.coalesce(db.func.sum(WasteStatsRollup.count), 0)
+    )
+    if created_by is None:
+        query = query.select_from(Barangay).outerjoin(WasteStatsRollup, WasteStatsRollup.barangay_id == Barangay.id)
+    else:
+        query = query.select_from(WasteStatsRollup).join(Barangay, WasteStatsRollup.barangay_id == Barangay.id) \
+                     .filter(WasteStatsRollup.created_by == created_by)
+    return query.group_by(Barangay.id, Barangay.name, WasteStatsRollup.waste_type, WasteStatsRollup.status) \
+                .order_by(Barangay.id)
+
+
+def waste_item_stats(created_by=None):
+    """Every counter shown by index, dashboard and collection_status in one query.
+
+    The grouped waste_stats rows from waste_item_stats_query() are folded into
+    the totals and breakdowns here. With ``created_by`` only that user's items
+    are counted and barangays without any are left out; otherwise every barangay
+    is listed, including empty ones. by_barangay is in barangay id order.
+    """
+    rows = waste_item_stats_query(created_by).all()
+
+    by_status = dict.fromkeys(WASTE_STATUSES, 0)
+    by_waste_type = {}
+    barangays = OrderedDict()
+    total = 0
+    for barangay_id, name, waste_type, status, count in rows:
+        counts = barangays.setdefault(barangay_id, {'name': name, 'total_items': 0, 'pending': 0,
+                                                    'collected': 0, 'processed': 0})
+        if not count:
+            continue
+        total += count
+        by_status[status] = by_status.get(status, 0) + count
+        by_waste_type[waste_type] = by_waste_type.get(waste_type, 0) + count
+        counts['total_items'] += count
+        if status == 'pending_collection':
+            counts['pending'] += count
+        elif status in ('collected', 'processed'):
+            counts[status] += count
+
+    return WasteStats(
+        total=total,
+        by_status=by_status,
+        by_waste_type=[WasteTypeCount(t, c) for t, c in sorted(by_waste_type.items()) if c],
+        by_barangay=[BarangayCounts(name=c['name'], total_items=c['total_items'], pending_items=c['pending'],
+                                    pending=c['pending'], collected=c['collected'], processed=c['processed'])
+                     for c in barangays.values()]
+    )
+
+
+def collected_today_query():
+    """Items marked collected since midnight UTC (ix_waste_item_status_updated_at range)."""
+    midnight = utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    return WasteItem.query.filter(WasteItem.status == 'collected', WasteItem.updated_at >= midnight)
+
+
 @app.route('/')
 @login_required
 def index():
-    # Get statistics for dashboard
-    total_waste_items = WasteItem.query.count()
-    pending_collection = WasteItem.query.filter_by(status='pending_collection').count()
-    collected_today = WasteItem.query.filter(
-        WasteItem.status == 'collected',
-        db.func.date(WasteItem.updated_at) == db.func.date('now')
-    ).count()
-    
+    stats = waste_item_stats()
+
     # Get recent waste items
-    recent_items = WasteItem.query.join(Barangay).order_by(WasteItem.created_at.desc()).limit(10).all()
-    
-    # Get barangay statistics
-    barangay_stats = db.session.query(
-        Barangay.name,
-        db.func.count(WasteItem.id).label('total_items'),
-        db.func.count(db.case((WasteItem.status == 'pending_collection', 1), else_=None)).label('pending_items')
-    ).outerjoin(WasteItem).group_by(Barangay.id, Barangay.name).all()
-    
+    recent_items = WasteItem.query.join(Barangay).options(db.contains_eager(WasteItem.barangay)).order_by(WasteItem.created_at.desc()).limit(10).all()
+
     return render_template('index.html', 
                          waste_items=recent_items,
-                         total_waste_items=total_waste_items,
-                         pending_collection=pending_collection,
-                         collected_today=collected_today,
-                         barangay_stats=barangay_stats)
+                         total_waste_items=stats.total,
+                         pending_collection=stats.by_status['pending_collection'],
+                         collected_today=collected_today_query().count(),
+                         barangay_stats=stats.by_barangay)
+
+class ItemIdSequence(db.Model):
+    """Next unallocated number of a named counter (see ItemIdAllocator)."""
+    __tablename__ = 'item_id_sequence'
+    name = db.Column(db.String(50), primary_key=True)
+    next_value = db.Column(db.Integer, nullable=False)
+
+
+app.config['ITEM_ID_BLOCK_SIZE'] = int(os.environ.get('ITEM_ID_BLOCK_SIZE', 100))
+
+
+class ItemIdAllocator:
+    """Hands out unique waste item ids, ``WM<yyyymmdd>-<sequence>``.
+
+    Sequence numbers come from the ``item_id_sequence`` row, reserved a block of
+    ITEM_ID_BLOCK_SIZE at a time with one atomic UPDATE on a connection of its
+    own, so ids are unique across workers and hosts sharing the database and
+    most ids cost no database round trip. Numbers left in a block when a worker
+    exits are skipped, which only leaves gaps. The date prefix is for people
+    reading the labels; uniqueness comes from the sequence alone, and the dash
+    keeps these ids apart from the older ``WM<yyyymmddHHMMSS>`` ones.
+    """
+
+    def __init__(self, name='waste_item'):
+        self.name = name
+        self._next = 0
+        self._end = 0  # first number past the reserved block
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def allocate(self, count=1):
+        """Return ``count`` unused sequence numbers, in increasing order."""
+        with self._lock:
+            if self._pid != os.getpid():
+                # A forked worker must not reuse the block it inherited from its parent
+                self._next = self._end = 0
+                self._pid = os.getpid()
+            numbers = []
+            while len(numbers) < count:
+                if self._next >= self._end:
+                    size = max(count - len(numbers), app.config['ITEM_ID_BLOCK_SIZE'])
+                    self._end = self._reserve(size)
+                    self._next = self._end - size
+                take = min(count - len(numbers), self._end - self._next)
+                numbers.extend(range(self._next, self._next + take))
+                self._next += take
+            return numbers
+
+    def _reserve(self, size):
+        """Reserve ``size`` numbers in the database and return the end of the block."""
+        table = ItemIdSequence.__table__
+        with db.engine.begin() as conn:
+            # The UPDATE takes the write lock, so the SELECT reads this block's end
+            conn.execute(sqlite_insert(table).values(name=self.name, next_value=1).on_conflict_do_nothing())
+            conn.execute(table.update().where(table.c.name == self.name).values(next_value=table.c.next_value + size))
+            return conn.execute(db.select(table.c.next_value).where(table.c.name == self.name)).scalar_one()
+
+
+item_id_allocator = ItemIdAllocator()
+
+
+def new_item_ids(count=1):
+    """``count`` fresh waste item ids."""
+    day = utcnow().strftime('%Y%m%d')
+    return [f"WM{day}-{number:06d}" for number in item_id_allocator.allocate(count)]
+
+
+WASTE_TYPE_NAMES = {
+    'recyclable': 'Recyclable Waste',
+    'hazardous': 'Hazardous Waste',
+    'organic': 'Organic Waste',
+    'electronic': 'Electronic Waste',
+    'medical': 'Medical Waste',
+    'other': 'Other Waste'
+}
+
+
+QR_PAYLOAD_VERSION = '1'
+QR_CHECK_ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def qr_check_char(item_id):
+    return QR_CHECK_ALPHABET[zlib.crc32(item_id.encode('utf-8')) % len(QR_CHECK_ALPHABET)]
+
+
+def waste_item_qr_data(item_id):
+    """Compact QR payload of an item: ``<item_id>:<version><check character>``.
+
+    For ids from new_item_ids() (e.g. ``WM20261017-000042:1K``) it is 20
+    characters of the QR alphanumeric set, which fits the smallest QR version
+    and decodes quickly on low-end phones. The check character lets scan_qr
+    reject codes that are truncated or not ours instead of looking them up.
+    """
+    return f'{item_id}:{QR_PAYLOAD_VERSION}{qr_check_char(item_id)}'
+
+
+def parse_qr_payload(text):
+    """item_id encoded in a scanned QR payload.
+
+    Accepts compact payloads, the JSON payloads of older labels
+    (``{"item_id": ...}``) and bare item ids. Raises ValueError when a compact
+    payload fails its check.
+    """
+    text = text.strip()
+    if text.startswith(('{', '"')):
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            data = None
+        if isinstance(data, dict) and data.get('item_id'):
+            return str(data['item_id']).strip()
+        if isinstance(data, str):
+            return data.strip()
+    item_id, sep, suffix = text.rpartition(':')
+    if sep and len(suffix) == 2 and suffix[0] == QR_PAYLOAD_VERSION:
+        if suffix[1].upper() != qr_check_char(item_id):
+            raise ValueError('QR code failed its check character')
+        return item_id
+    return text
+
+
+def regenerate_qr_payloads(batch_size=1000):
+    """Rewrite qr_code_data of every item that does not have the current compact payload."""
+    updated, last_id = 0, 0
+    while True:
+        rows = db.session.query(WasteItem.id, WasteItem.item_id, WasteItem.qr_code_data, WasteItem.updated_at).filter(
+            WasteItem.id > last_id
+        ).order_by(WasteItem.id).limit(batch_size).all()
+        if not rows:
+            return updated
+        last_id = rows[-1].id
+        # Passing updated_at through keeps its onupdate from stamping every item
+        # with the time of the migration
+        changes = [{'id': row.id, 'qr_code_data': waste_item_qr_data(row.item_id), 'updated_at': row.updated_at}
+                   for row in rows if row.qr_code_data != waste_item_qr_data(row.item_id)]
+        if changes:
+            db.session.execute(db.update(WasteItem), changes)
+            db.session.commit()
+            updated += len(changes)
+
+
+@app.cli.command('regenerate-qr-payloads')
+@click.option('--batch-size', type=int, default=1000, show_default=True)
+def regenerate_qr_payloads_command(batch_size):
+    """Switch existing items to the compact QR payload format."""
+    count = regenerate_qr_payloads(batch_size)
+    print(f"Regenerated QR payloads for {count} waste items")
+
+
+def initial_tracking_notes(is_sorted):
+    """Notes of the tracking record created when an item is registered."""
+    notes = 'Waste item registered for collection'
+    if not is_sorted:
+        notes += '. Status set to "Not Collected" - Reason: Unsorted Waste. Collection team must sort waste before collection.'
+    return notes
+
 
 @app.route('/add_waste', methods=['GET', 'POST'])
 @barangay_required
@@ -657,21 +1941,13 @@ def add_waste():
         is_sorted = is_sorted_str.lower() == 'true'
         
         # Generate unique item ID
-        item_id = f"WM{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        item_id = new_item_ids()[0]
         
         # Get current time for timestamps
         current_time = utcnow()
         
         # Generate item name based on waste type
-        waste_type_names = {
-            'recyclable': 'Recyclable Waste',
-            'hazardous': 'Hazardous Waste',
-            'organic': 'Organic Waste',
-            'electronic': 'Electronic Waste',
-            'medical': 'Medical Waste',
-            'other': 'Other Waste'
-        }
-        item_name = waste_type_names.get(waste_type, 'Waste Item')
+        item_name = WASTE_TYPE_NAMES.get(waste_type, 'Waste Item')
         
         # Determine initial status based on sorting
         # If not sorted, status should be 'not_collected', otherwise 'pending_collection'
@@ -698,31 +1974,20 @@ def add_waste():
         )
         
         # Generate QR code data
-        barangay = db.session.get(Barangay, barangay_id)
-        qr_data = {
-            'item_id': item_id,
-            'item_name': item_name,
-            'waste_type': waste_type,
-            'barangay': barangay.name if barangay else 'N/A',
-            'created_at': current_time.isoformat()
-        }
-        waste_item.qr_code_data = json.dumps(qr_data)
+        waste_item.qr_code_data = waste_item_qr_data(item_id)
         
         db.session.add(waste_item)
         db.session.commit()
         
         # Add initial tracking record
-        tracking_notes = 'Waste item registered for collection'
-        if not is_sorted:
-            tracking_notes += '. Status set to "Not Collected" - Reason: Unsorted Waste. Collection team must sort waste before collection.'
-        
         tracking = WasteTracking(
             waste_item_id=waste_item.id,
             status=initial_status,
             location=address,
-            notes=tracking_notes
+            notes=initial_tracking_notes(is_sorted)
         )
         db.session.add(tracking)
+        update_item_position(waste_item, tracking)
         db.session.commit()
         
         if is_sorted:
@@ -734,6 +1999,184 @@ def add_waste():
     barangays = Barangay.query.filter_by(is_active=True).all()
     return render_template('add_waste.html', barangays=barangays, user_barangay_id=user_barangay_id)
 
+app.config['WASTE_IMPORT_MAX_ROWS'] = int(os.environ.get('WASTE_IMPORT_MAX_ROWS', 5000))
+WASTE_IMPORT_COLUMNS = ['waste_type', 'barangay', 'weight', 'description', 'address',
+                        'contact_person', 'contact_number', 'is_sorted']
+
+# imported: item_ids of the new items; errors: (line_number, message) pairs
+ImportResult = namedtuple('ImportResult', ['imported', 'errors'])
+
+
+def parse_import_flag(value):
+    value = (value or '').strip().lower()
+    if value in ('', '0', 'false', 'no', 'n'):
+        return False
+    if value in ('1', 'true', 'yes', 'y'):
+        return True
+    raise ValueError(f'is_sorted must be yes or no, got "{value}"')
+
+
+def import_waste_items(lines, user):
+    """Register waste items from CSV ``lines`` (columns: WASTE_IMPORT_COLUMNS) on behalf of ``user``.
+
+    Every row is validated first; if any row is invalid nothing is imported, so a
+    corrected file can be uploaded again without creating duplicates. Barangays
+    are matched by code or (case-insensitive) name in one query; users assigned
+    to a barangay always register into it, as in add_waste. Valid files are
+    inserted with executemany - items, their initial tracking records, the
+    waste_stats counts and the change feed - in a single transaction.
+    """
+    reader = csv.DictReader(lines)
+    fieldnames = [name.strip() for name in reader.fieldnames or []]
+    reader.fieldnames = fieldnames
+    required = {'waste_type'} if user.barangay_id else {'waste_type', 'barangay'}
+    missing = sorted(required - set(fieldnames))
+    if missing:
+        return ImportResult([], [(1, f"Missing column(s): {', '.join(missing)}")])
+
+    rows = []
+    for row in reader:
+        if len(rows) == app.config['WASTE_IMPORT_MAX_ROWS']:
+            return ImportResult([], [(reader.line_num, f"Too many rows (at most {app.config['WASTE_IMPORT_MAX_ROWS']})")])
+        if any((value or '').strip() for value in row.values() if isinstance(value, str)):
+            rows.append((reader.line_num, row))
+
+    barangays = {}
+    if user.barangay_id:
+        user_barangay = db.session.get(Barangay, user.barangay_id)
+    else:
+        refs = {(row.get('barangay') or '').strip() for _, row in rows} - {''}
+        if refs:
+            matches = Barangay.query.filter(db.or_(
+                Barangay.code.in_(refs), db.func.lower(Barangay.name).in_({ref.lower() for ref in refs})
+            )).all()
+            barangays = {barangay.name.lower(): barangay for barangay in matches}
+            barangays.update({barangay.code: barangay for barangay in matches})
+
+    errors, valid = [], []
+    for line, row in rows:
+        try:
+            waste_type = (row.get('waste_type') or '').strip().lower()
+            if waste_type not in WASTE_TYPE_NAMES:
+                raise ValueError(f'Unknown waste_type "{waste_type}"' if waste_type else 'waste_type is required')
+            if user.barangay_id:
+                barangay = user_barangay
+            else:
+                ref = (row.get('barangay') or '').strip()
+                barangay = barangays.get(ref) or barangays.get(ref.lower())
+                if barangay is None:
+                    raise ValueError(f'Unknown barangay "{ref}"' if ref else 'barangay is required')
+            weight = (row.get('weight') or '').strip()
+            try:
+                weight = float(weight) if weight else None
+            except ValueError:
+                raise ValueError(f'weight must be a number, got "{weight}"')
+            if weight is not None and weight < 0:
+                raise ValueError('weight must not be negative')
+            is_sorted = parse_import_flag(row.get('is_sorted'))
+        except ValueError as e:
+            errors.append((line, str(e)))
+            continue
+        valid.append((row, waste_type, barangay, weight, is_sorted))
+    if errors or not valid:
+        return ImportResult([], errors or [(1, 'No rows to import')])
+
+    now = utcnow()
+    item_rows, deltas = [], {}
+    for item_id, (row, waste_type, barangay, weight, is_sorted) in zip(new_item_ids(len(valid)), valid):
+        item_name = WASTE_TYPE_NAMES[waste_type]
+        status = 'pending_collection' if is_sorted else 'not_collected'
+        item_rows.append({
+            'item_id': item_id,
+            'item_name': item_name,
+            'waste_type': waste_type,
+            'weight': weight,
+            'description': (row.get('description') or '').strip(),
+            'barangay_id': barangay.id,
+            'created_by': user.id,
+            'address': (row.get('address') or '').strip(),
+            'contact_person': (row.get('contact_person') or '').strip(),
+            'contact_number': (row.get('contact_number') or '').strip(),
+            'status': status,
+            'is_sorted': is_sorted,
+            'sorted_at': now if is_sorted else None,
+            'sorted_by': user.id if is_sorted else None,
+            'created_at': now,
+            'updated_at': now,
+            'qr_code_data': waste_item_qr_data(item_id),
+        })
+        key = (barangay.id, user.id, waste_type, status)
+        deltas[key] = deltas.get(key, 0) + 1
+
+    try:
+        ids = db.session.scalars(
+            db.insert(WasteItem).returning(WasteItem.id, sort_by_parameter_order=True), item_rows
+        ).all()
+        conn = db.session.connection()
+        conn.execute(db.insert(WasteTracking), [
+            {'waste_item_id': waste_item_id, 'status': item['status'], 'location': item['address'],
+             'notes': initial_tracking_notes(item['is_sorted']), 'timestamp': now}
+            for waste_item_id, item in zip(ids, item_rows)
+        ])
+        conn.execute(db.insert(WasteItemPosition), [
+            {'waste_item_id': waste_item_id, 'status': item['status'], 'timestamp': now}
+            for waste_item_id, item in zip(ids, item_rows)
+        ])
+        upsert_waste_stats(conn, deltas)
+        append_waste_item_changes(conn, {
+            waste_item_id: (item['item_id'], item['barangay_id']) for waste_item_id, item in zip(ids, item_rows)
+        })
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return ImportResult([item['item_id'] for item in item_rows], [])
+
+
+@app.route('/import_waste', methods=['GET', 'POST'])
+@barangay_required
+def import_waste():
+    """Register many waste items at once from an uploaded CSV file."""
+    result = None
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Please choose a CSV file to import.', 'error')
+            return redirect(url_for('import_waste'))
+        try:
+            text = upload.read().decode('utf-8-sig')
+        except UnicodeDecodeError:
+            flash('The file must be a UTF-8 encoded CSV.', 'error')
+            return redirect(url_for('import_waste'))
+        try:
+            result = import_waste_items(StringIO(text, newline=''), get_current_user())
+        except Exception as e:
+            flash(f'Error importing waste items: {str(e)}', 'error')
+            return redirect(url_for('import_waste'))
+        if result.imported:
+            flash(f'Imported {len(result.imported)} waste item(s).', 'success')
+        else:
+            flash('Nothing was imported. Fix the rows listed below and upload the file again.', 'error')
+    return render_template('import_waste.html', result=result, columns=WASTE_IMPORT_COLUMNS,
+                           waste_types=list(WASTE_TYPE_NAMES))
+
+
+@app.cli.command('import-waste')
+@click.argument('csv_file', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--user', 'username', required=True, help='Username the items are registered by.')
+def import_waste_command(csv_file, username):
+    """Register waste items from a CSV file."""
+    user = User.query.filter_by(username=username).first()
+    if not user:
+        raise click.BadParameter(f'No user named {username}', param_hint='--user')
+    result = import_waste_items(csv_file, user)
+    for line, message in result.errors:
+        print(f"line {line}: {message}")
+    if result.errors:
+        raise SystemExit(1)
+    print(f"Imported {len(result.imported)} waste items")
+
+
 @app.route('/edit_waste/<item_id>', methods=['GET', 'POST'])
 @login_required
 def edit_waste(item_id):
@@ -807,27 +2250,9 @@ def edit_waste(item_id):
             if not waste_item.sorted_by:
                 waste_item.sorted_by = current_user_id
         
-        # Update QR code data
-        barangay = db.session.get(Barangay, barangay_id)
-        waste_type_names = {
-            'recyclable': 'Recyclable Waste',
-            'hazardous': 'Hazardous Waste',
-            'organic': 'Organic Waste',
-            'electronic': 'Electronic Waste',
-            'medical': 'Medical Waste',
-            'other': 'Other Waste'
-        }
-        item_name = waste_type_names.get(waste_type, 'Waste Item')
-        waste_item.item_name = item_name
-        
-        qr_data = {
-            'item_id': waste_item.item_id,
-            'item_name': item_name,
-            'waste_type': waste_type,
-            'barangay': barangay.name if barangay else 'N/A',
-            'created_at': waste_item.created_at.isoformat()
-        }
-        waste_item.qr_code_data = json.dumps(qr_data)
+        # Update item name and QR code data
+        waste_item.item_name = WASTE_TYPE_NAMES.get(waste_type, 'Waste Item')
+        waste_item.qr_code_data = waste_item_qr_data(waste_item.item_id)
         
         # Add tracking record for the edit
         tracking_notes = f'Waste item updated by {get_current_user().full_name if get_current_user() else "user"}'
@@ -844,6 +2269,7 @@ def edit_waste(item_id):
         )
         
         db.session.add(tracking)
+        update_item_position(waste_item, tracking)
         db.session.commit()
         
         flash('Waste item updated successfully!', 'success')
@@ -854,29 +2280,442 @@ def edit_waste(item_id):
 
 @app.route('/item/<item_id>')
 def view_item(item_id):
-    waste_item = WasteItem.query.filter_by(item_id=item_id).first_or_404()
-    tracking_records = WasteTracking.query.filter_by(waste_item_id=waste_item.id).order_by(WasteTracking.timestamp.desc()).all()
+    waste_item = WasteItem.query.options(
+        db.joinedload(WasteItem.barangay), db.joinedload(WasteItem.creator), db.joinedload(WasteItem.sorter)
+    ).filter_by(item_id=item_id).first_or_404()
+    tracking_records = WasteTracking.query.options(db.joinedload(WasteTracking.updater)).filter_by(
+        waste_item_id=waste_item.id
+    ).order_by(WasteTracking.timestamp.desc()).all()
     return render_template('view_item.html', waste_item=waste_item, tracking_records=tracking_records)
 
-@app.route('/generate_qr/<item_id>')
-@not_collector_required
-def generate_qr(item_id):
-    waste_item = WasteItem.query.filter_by(item_id=item_id).first_or_404()
-    
-    # Generate QR code
+app.config['QR_CACHE_DIR'] = os.environ.get('QR_CACHE_DIR') or os.path.join(instance_path, 'qr_cache')
+app.config['QR_CACHE_SIZE'] = int(os.environ.get('QR_CACHE_SIZE', 512))
+QR_RENDER_VERSION = 1  # bump when render_qr_png output changes, so cached images are not reused
+
+
+def render_qr_png(payload):
+    """PNG bytes of a QR code encoding ``payload``."""
     qr = qrcode.QRCode(version=1, box_size=10, border=5)
-    qr.add_data(waste_item.qr_code_data)
+    qr.add_data(payload)
     qr.make(fit=True)
-    
     img = qr.make_image(fill_color="black", back_color="white")
-    
-    # Convert to base64 for web display
     buffer = BytesIO()
     img.save(buffer, format='PNG')
-    buffer.seek(0)
-    img_str = base64.b64encode(buffer.getvalue()).decode()
-    
-    return render_template('qr_code.html', waste_item=waste_item, qr_code=img_str)
+    return buffer.getvalue()
+
+
+app.config['QR_RENDER_WORKERS'] = int(os.environ.get('QR_RENDER_WORKERS', os.cpu_count() or 1))
+QR_PARALLEL_MIN = 16  # fewer images than this render faster inline than via a process pool
+
+
+def render_qr_pngs(payloads, parallel=False):
+    """render_qr_png over ``payloads``; with ``parallel``, large batches use a process pool.
+
+    The pool forks the current process, so only the ``qr-sheet`` command asks
+    for it: forking a web worker would copy the locks held by its background
+    threads (SSE poller, collector location flusher). It is also only used
+    where fork is available; elsewhere (Windows) images are rendered one after
+    another.
+    """
+    workers = min(app.config['QR_RENDER_WORKERS'], len(payloads))
+    if (not parallel or workers < 2 or len(payloads) < QR_PARALLEL_MIN
+            or 'fork' not in multiprocessing.get_all_start_methods()):
+        return [render_qr_png(payload) for payload in payloads]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+        return list(pool.map(render_qr_png, payloads, chunksize=max(1, len(payloads) // (workers * 4))))
+
+
+def qr_cache_key(payload):
+    """Content address of the QR image of ``payload``."""
+    return hashlib.sha256(f'{QR_RENDER_VERSION}:{payload}'.encode('utf-8')).hexdigest()
+
+
+class QRImageCache:
+    """QR PNGs by content address: an in-memory LRU in front of files under QR_CACHE_DIR.
+
+    Images depend only on the payload, so an entry never goes stale; when an
+    item's payload changes it simply gets a new key. Files are written to a
+    temporary name and renamed, so workers sharing the directory never read a
+    partial image.
+    """
+
+    def __init__(self):
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(app.config['QR_CACHE_DIR'], key[:2], f'{key}.png')
+
+    def lookup(self, payload):
+        """Cached PNG bytes for ``payload``, or None."""
+        key = qr_cache_key(payload)
+        with self._lock:
+            png = self._images.get(key)
+            if png is not None:
+                self._images.move_to_end(key)
+                return png
+        try:
+            with open(self._path(key), 'rb') as f:
+                png = f.read()
+        except OSError:
+            return None
+        self._remember(key, png)
+        return png
+
+    def store(self, payload, png):
+        key = qr_cache_key(payload)
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(png)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            app.logger.warning("Could not write QR cache file %s: %s", path, e)
+        self._remember(key, png)
+
+    def _remember(self, key, png):
+        with self._lock:
+            self._images[key] = png
+            self._images.move_to_end(key)
+            while len(self._images) > app.config['QR_CACHE_SIZE']:
+                self._images.popitem(last=False)
+
+    def get(self, payload):
+        """PNG bytes for ``payload``, rendering it only on a miss in both tiers."""
+        png = self.lookup(payload)
+        if png is None:
+            png = render_qr_png(payload)
+            self.store(payload, png)
+        return png
+
+    def get_many(self, payloads, parallel=False):
+        """PNG bytes for each of ``payloads``; misses are rendered by render_qr_pngs."""
+        images = {payload: self.lookup(payload) for payload in dict.fromkeys(payloads)}
+        missing = [payload for payload, png in images.items() if png is None]
+        for payload, png in zip(missing, render_qr_pngs(missing, parallel=parallel)):
+            self.store(payload, png)
+            images[payload] = png
+        return [images[payload] for payload in payloads]
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+
+
+qr_image_cache = QRImageCache()
+
+
+def qr_item_query(user):
+    """WasteItem query limited to the items ``user`` may see QR codes of: barangay users see their own barangay's."""
+    query = WasteItem.query
+    if user.is_barangay():
+        query = query.filter(WasteItem.barangay_id == user.barangay_id)
+    return query
+
+
+def qr_payload(item):
+    """Text encoded in an item's QR code; items without stored QR data encode their item_id.
+
+    ``item`` is a WasteItem or any row with item_id and qr_code_data.
+    """
+    return item.qr_code_data or item.item_id
+
+
+@app.route('/qr/<item_id>.png')
+@not_collector_required
+def qr_image(item_id):
+    """QR code image of an item.
+
+    URLs carrying ``v`` (the image's content address, as linked by the pages)
+    are cached by browsers for a year; without it the image is revalidated
+    with its ETag.
+    """
+    row = qr_item_query(get_current_user()).with_entities(
+        WasteItem.item_id, WasteItem.qr_code_data
+    ).filter_by(item_id=item_id).first_or_404()
+    key = qr_cache_key(qr_payload(row))
+    if request.if_none_match.contains(key):
+        response = Response(status=304)
+    else:
+        response = Response(qr_image_cache.get(qr_payload(row)), mimetype='image/png')
+    response.set_etag(key)
+    if request.args.get('v') == key[:16]:
+        response.headers['Cache-Control'] = 'private, max-age=31536000, immutable'
+    else:
+        response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def qr_image_url(waste_item):
+    return url_for('qr_image', item_id=waste_item.item_id, v=qr_cache_key(qr_payload(waste_item))[:16])
+
+
+@app.route('/generate_qr/<item_id>')
+@not_collector_required
+def generate_qr(item_id):
+    waste_item = qr_item_query(get_current_user()).options(
+        db.joinedload(WasteItem.barangay)
+    ).filter_by(item_id=item_id).first_or_404()
+    return render_template('qr_code.html', waste_item=waste_item, qr_image_url=qr_image_url(waste_item))
+
+app.config['QR_SHEET_MAX_LABELS'] = int(os.environ.get('QR_SHEET_MAX_LABELS', 1000))
+QR_SHEET_PAGE_SIZE = (1240, 1754)  # A4 at 150 dpi
+QR_SHEET_DPI = 150
+QR_SHEET_MARGIN = 60
+QR_SHEET_FORMATS = ('pdf', 'png')
+
+QRLabel = namedtuple('QRLabel', ['item_id', 'item_name', 'waste_type', 'barangay', 'qr_code_data'])
+
+
+def qr_label_query(item_ids=None, barangay_id=None, date_from=None, date_to=None):
+    """Labels of the given items, or of the items registered in a barangay/date range.
+
+    ``date_from``/``date_to`` are inclusive days (YYYY-MM-DD). Raises ValueError
+    for a malformed date.
+    """
+    query = db.session.query(
+        WasteItem.item_id, WasteItem.item_name, WasteItem.waste_type, Barangay.name, WasteItem.qr_code_data
+    ).join(Barangay, WasteItem.barangay_id == Barangay.id)
+    if item_ids:
+        query = query.filter(WasteItem.item_id.in_(item_ids))
+    if barangay_id is not None:
+        query = query.filter(WasteItem.barangay_id == barangay_id)
+    if date_from:
+        query = query.filter(WasteItem.created_at >= datetime.strptime(date_from, '%Y-%m-%d'))
+    if date_to:
+        query = query.filter(WasteItem.created_at < datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1))
+    return query.order_by(WasteItem.created_at, WasteItem.id)
+
+
+def label_font(size):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()  # Pillow < 10.1 only has the small bitmap font
+
+
+def fit_text(draw, text, font, width):
+    """``text`` shortened with '...' until it fits in ``width`` pixels."""
+    if draw.textlength(text, font=font) <= width:
+        return text
+    while text and draw.textlength(text + '...', font=font) > width:
+        text = text[:-1]
+    return text + '...'
+
+
+def render_label_sheets(labels, columns=3, rows=4, parallel=False):
+    """A4 pages with a grid of ``columns`` x ``rows`` QR labels each.
+
+    QR images come from qr_image_cache, which renders the missing ones
+    (``parallel`` is passed on to render_qr_pngs). Pages are 1-bit images, so
+    even long runs stay small in memory.
+    """
+    labels = [QRLabel(*label) for label in labels]
+    images = qr_image_cache.get_many([qr_payload(label) for label in labels], parallel=parallel)
+    width, height = QR_SHEET_PAGE_SIZE
+    cell_w = (width - 2 * QR_SHEET_MARGIN) // columns
+    cell_h = (height - 2 * QR_SHEET_MARGIN) // rows
+    title_font, detail_font = label_font(22), label_font(18)
+    text_h = 64
+    side = max(min(cell_w - 20, cell_h - text_h - 20), 1)
+    per_page = columns * rows
+    pages = []
+    for start in range(0, len(labels), per_page):
+        page = Image.new('1', QR_SHEET_PAGE_SIZE, 1)
+        draw = ImageDraw.Draw(page)
+        for i, (label, png) in enumerate(zip(labels[start:start + per_page], images[start:start + per_page])):
+            x = QR_SHEET_MARGIN + (i % columns) * cell_w
+            y = QR_SHEET_MARGIN + (i // columns) * cell_h
+            draw.rectangle([x + 2, y + 2, x + cell_w - 2, y + cell_h - 2], outline=0)  # cutting guide
+            qr = Image.open(BytesIO(png)).convert('1').resize((side, side), Image.NEAREST)
+            page.paste(qr, (x + (cell_w - side) // 2, y + 10))
+            text_y = y + 10 + side + 4
+            for text, font in ((label.item_id, title_font),
+                               (f'{label.waste_type.title()} - {label.barangay}', detail_font)):
+                text = fit_text(draw, text, font, cell_w - 16)
+                draw.text((x + (cell_w - draw.textlength(text, font=font)) / 2, text_y), text, fill=0, font=font)
+                text_y += 30
+        pages.append(page)
+    return pages
+
+
+def encode_label_sheets(pages, fmt):
+    """Bytes of ``pages`` as one PDF, or of the first page as a PNG."""
+    buffer = BytesIO()
+    if fmt == 'pdf':
+        pages[0].save(buffer, format='PDF', save_all=True, append_images=pages[1:], resolution=QR_SHEET_DPI)
+    else:
+        pages[0].save(buffer, format='PNG', dpi=(QR_SHEET_DPI, QR_SHEET_DPI))
+    return buffer.getvalue()
+
+
+@app.route('/qr/sheet')
+@not_collector_required
+def qr_sheet():
+    """Printable sheet of QR labels.
+
+    Query params: item_id (repeatable) or barangay_id/from/to filters, columns
+    and rows of the label grid (default 3 x 4), and format: pdf (every page) or
+    png (the page given by ``page``; X-Page-Count tells how many there are).
+    Barangay users only get labels of their own barangay's items.
+    """
+    fmt = request.args.get('format', 'pdf')
+    if fmt not in QR_SHEET_FORMATS:
+        return jsonify(success=False, error=f'Unknown format: {fmt}'), 400
+    try:
+        barangay_id = int(request.args['barangay_id']) if request.args.get('barangay_id') else None
+        columns = min(max(int(request.args.get('columns', 3)), 1), 6)
+        rows = min(max(int(request.args.get('rows', 4)), 1), 10)
+        page = max(int(request.args.get('page', 1)), 1)
+        query = qr_label_query(request.args.getlist('item_id'), barangay_id,
+                               request.args.get('from'), request.args.get('to'))
+    except ValueError:
+        return jsonify(success=False, error='Invalid barangay_id/from/to/columns/rows/page'), 400
+    user = get_current_user()
+    if user.is_barangay():
+        if barangay_id is not None and barangay_id != user.barangay_id:
+            return jsonify(success=False, error='Forbidden'), 403
+        query = query.filter(WasteItem.barangay_id == user.barangay_id)
+
+    max_labels = app.config['QR_SHEET_MAX_LABELS']
+    labels = query.limit(max_labels + 1).all()
+    if not labels:
+        return jsonify(success=False, error='No items match'), 404
+    if len(labels) > max_labels:
+        return jsonify(success=False, error=f'Too many labels (at most {max_labels}); narrow the filters'), 400
+
+    per_page = columns * rows
+    page_count = -(-len(labels) // per_page)
+    if fmt == 'png':
+        if page > page_count:
+            return jsonify(success=False, error=f'Page {page} of {page_count} requested'), 404
+        labels = labels[(page - 1) * per_page:page * per_page]
+    data = encode_label_sheets(render_label_sheets(labels, columns, rows), fmt)
+    response = Response(data, mimetype='application/pdf' if fmt == 'pdf' else 'image/png')
+    response.headers['X-Page-Count'] = str(page_count)
+    response.headers['Content-Disposition'] = f'inline; filename="qr_labels.{fmt}"'
+    return response
+
+
+@app.cli.command('qr-sheet')
+@click.option('--item-id', 'item_ids', multiple=True, help='Item to include (repeatable).')
+@click.option('--barangay-id', type=int)
+@click.option('--from', 'date_from', help='First registration day to include (YYYY-MM-DD).')
+@click.option('--to', 'date_to', help='Last registration day to include (YYYY-MM-DD).')
+@click.option('--columns', type=click.IntRange(1, 6), default=3, show_default=True)
+@click.option('--rows', type=click.IntRange(1, 10), default=4, show_default=True)
+@click.option('--output', '-o', required=True, help='PDF file to write.')
+def qr_sheet_command(item_ids, barangay_id, date_from, date_to, columns, rows, output):
+    """Render a PDF sheet of QR labels for printing."""
+    try:
+        labels = qr_label_query(list(item_ids), barangay_id, date_from, date_to).all()
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    if not labels:
+        raise click.ClickException('No items match')
+    with open(output, 'wb') as f:
+        f.write(encode_label_sheets(render_label_sheets(labels, columns, rows, parallel=True), 'pdf'))
+    print(f"Wrote {len(labels)} labels to {output}")
+
+
+ScanItemSummary = namedtuple('ScanItemSummary', ['item_id', 'item_name', 'waste_type', 'status', 'address', 'barangay'])
+
+
+class ScanItemCache:
+    """In-process LRU of item_id -> ScanItemSummary for resolving scanned QR codes.
+
+    A collection run scans items one after another, often the same ones twice
+    (scan, then update status), so most scans are answered without SQL. Items
+    written through the session are dropped from the cache once their
+    transaction commits (see invalidate_scan_cache); entries expire after
+    ``ttl`` seconds so changes made by other worker processes show up too.
+    """
+
+    def __init__(self, ttl=30, maxsize=1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # item_id -> (summary, loaded_at)
+        self._lock = threading.Lock()
+
+    def get_many(self, item_ids):
+        """{item_id: ScanItemSummary} for those of ``item_ids`` that exist, loading misses in one query."""
+        found, missing = {}, []
+        now = time.time()
+        with self._lock:
+            for item_id in dict.fromkeys(item_ids):
+                entry = self._entries.get(item_id)
+                if entry is not None and now - entry[1] <= self.ttl:
+                    self._entries.move_to_end(item_id)
+                    found[item_id] = entry[0]
+                else:
+                    missing.append(item_id)
+        if missing:
+            rows = db.session.query(
+                WasteItem.item_id, WasteItem.item_name, WasteItem.waste_type, WasteItem.status,
+                WasteItem.address, db.func.coalesce(Barangay.name, 'N/A')
+            ).outerjoin(Barangay, WasteItem.barangay_id == Barangay.id).filter(WasteItem.item_id.in_(missing)).all()
+            loaded = {row[0]: ScanItemSummary(*row) for row in rows}
+            with self._lock:
+                for item_id, summary in loaded.items():
+                    self._entries[item_id] = (summary, now)
+                    self._entries.move_to_end(item_id)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            found.update(loaded)
+        return found
+
+    def invalidate(self, item_ids):
+        with self._lock:
+            for item_id in item_ids:
+                self._entries.pop(item_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+app.config['SCAN_CACHE_TTL'] = int(os.environ.get('SCAN_CACHE_TTL', 30))
+app.config['SCAN_CACHE_SIZE'] = int(os.environ.get('SCAN_CACHE_SIZE', 1024))
+scan_item_cache = ScanItemCache(ttl=app.config['SCAN_CACHE_TTL'], maxsize=app.config['SCAN_CACHE_SIZE'])
+SCAN_BATCH_MAX_CODES = 200
+
+
+@db.event.listens_for(db.session, 'after_flush')
+def collect_scan_cache_invalidations(session, flush_context):
+    """Remember the item_ids written by this flush; they are invalidated on commit."""
+    stale = session.info.setdefault('scan_cache_stale', set())
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, WasteItem):
+            stale.add(obj.item_id)
+
+
+@db.event.listens_for(db.session, 'after_commit')
+def invalidate_scan_cache(session):
+    # Invalidating only after commit keeps a concurrent scan from re-caching the
+    # pre-commit row
+    stale = session.info.pop('scan_cache_stale', None)
+    if stale:
+        scan_item_cache.invalidate(stale)
+
+
+@db.event.listens_for(db.session, 'after_rollback')
+def discard_scan_cache_invalidations(session):
+    session.info.pop('scan_cache_stale', None)
+
+
+def scan_item_json(summary):
+    return {
+        'item_id': summary.item_id,
+        'item_name': summary.item_name,
+        'waste_type': summary.waste_type,
+        'status': summary.status,
+        'address': summary.address,
+        'barangay': summary.barangay,
+        'location': summary.address  # Add location field for display
+    }
+
 
 @app.route('/scan_qr', methods=['GET', 'POST'])
 @collector_required
@@ -885,42 +2724,16 @@ def scan_qr():
         # Handle QR code scanning (this would typically be done via JavaScript with camera)
         scanned_data = request.json.get('qr_data')
         if scanned_data:
-            item_id = None
-            scanned_data = scanned_data.strip()
-            
-            # Try to parse as JSON first (for QR codes with full JSON data)
             try:
-                qr_data = json.loads(scanned_data)
-                # If it's a dict, get item_id from it
-                if isinstance(qr_data, dict):
-                    item_id = qr_data.get('item_id')
-                # If it's a string after parsing (shouldn't happen but handle it)
-                elif isinstance(qr_data, str):
-                    item_id = qr_data.strip()
-            except (json.JSONDecodeError, TypeError):
-                # If not JSON, treat the entire string as item_id (e.g., "WM20241201120000")
-                item_id = scanned_data
-            
-            # Ensure we have an item_id (fallback to raw data if needed)
-            if not item_id:
-                item_id = scanned_data
+                item_id = parse_qr_payload(scanned_data)
+            except ValueError:
+                return jsonify({'success': False, 'error': 'QR code could not be verified. Please scan it again.'})
             
             # Look up the waste item by item_id
             if item_id:
-                waste_item = WasteItem.query.filter_by(item_id=item_id).first()
-                if waste_item:
-                    return jsonify({
-                        'success': True,
-                        'item': {
-                            'item_id': waste_item.item_id,
-                            'item_name': waste_item.item_name,
-                            'waste_type': waste_item.waste_type,
-                            'status': waste_item.status,
-                            'address': waste_item.address,
-                            'barangay': waste_item.barangay.name if waste_item.barangay else 'N/A',
-                            'location': waste_item.address  # Add location field for display
-                        }
-                    })
+                summary = scan_item_cache.get_many([item_id]).get(item_id)
+                if summary:
+                    return jsonify({'success': True, 'item': scan_item_json(summary)})
                 else:
                     return jsonify({'success': False, 'error': f'Item with ID "{item_id}" not found'})
             else:
@@ -930,8 +2743,177 @@ def scan_qr():
     
     return render_template('scan_qr.html', qr_scanning_available=QR_SCANNING_AVAILABLE)
 
+@app.route('/scan_qr/batch', methods=['POST'])
+@collector_required
+def scan_qr_batch():
+    """Resolve many scanned QR codes at once, e.g. the scans a phone queued while offline.
+
+    Body: ``{"codes": [<scanned text>, ...]}`` (at most SCAN_BATCH_MAX_CODES).
+    Returns one result per code, in order, shaped like the scan_qr response.
+    """
+    codes = (request.get_json(silent=True) or {}).get('codes')
+    if not isinstance(codes, list) or not all(isinstance(code, str) for code in codes):
+        return jsonify({'success': False, 'error': 'codes must be a list of scanned QR texts'}), 400
+    if len(codes) > SCAN_BATCH_MAX_CODES:
+        return jsonify({'success': False, 'error': f'At most {SCAN_BATCH_MAX_CODES} codes per request'}), 400
+
+    item_ids = []
+    for code in codes:
+        try:
+            item_ids.append(parse_qr_payload(code) or None)
+        except ValueError:
+            item_ids.append(None)
+    summaries = scan_item_cache.get_many([item_id for item_id in item_ids if item_id])
+
+    results = []
+    for code, item_id in zip(codes, item_ids):
+        if not item_id:
+            results.append({'qr_data': code, 'success': False,
+                            'error': 'QR code could not be verified. Please scan it again.'})
+        elif item_id in summaries:
+            results.append({'qr_data': code, 'success': True, 'item': scan_item_json(summaries[item_id])})
+        else:
+            results.append({'qr_data': code, 'success': False, 'error': f'Item with ID "{item_id}" not found'})
+    return jsonify({'success': True, 'results': results})
+
+
+class IdempotencyKey(db.Model):
+    """Stored response of a request sent with an ``Idempotency-Key`` (see the idempotent decorator)."""
+    __tablename__ = 'idempotency_key'
+    __table_args__ = (
+        db.Index('ix_idempotency_key_created_at', 'created_at'),
+    )
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    key = db.Column(db.String(255), primary_key=True)
+    request_hash = db.Column(db.String(64), nullable=False)  # endpoint, path and body the key was first used with
+    status_code = db.Column(db.Integer, nullable=True)  # NULL while the response is not stored yet
+    mimetype = db.Column(db.String(100), nullable=True)
+    location = db.Column(db.String(500), nullable=True)  # redirect target of form posts
+    body = db.Column(db.LargeBinary, nullable=True)
+    created_at = db.Column(db.DateTime, default=utcnow)
+
+
+app.config['IDEMPOTENCY_KEY_TTL'] = int(os.environ.get('IDEMPOTENCY_KEY_TTL', 86400))
+_idempotency_key_stores = itertools.count(1)
+
+
+# A retry takes a fresh GPS fix, so coordinates are not part of what a key must match
+IDEMPOTENCY_IGNORED_FIELDS = {'latitude', 'longitude', 'device_latitude', 'device_longitude', 'idempotency_key'}
+
+
+def idempotency_request_hash():
+    form = sorted((k, v) for k, v in request.form.items(multi=True) if k not in IDEMPOTENCY_IGNORED_FIELDS)
+    body = request.get_json(silent=True) if request.is_json else None
+    if isinstance(body, dict):
+        body = {k: v for k, v in body.items() if k not in IDEMPOTENCY_IGNORED_FIELDS}
+    fingerprint = json.dumps([request.endpoint, request.path, form, body], sort_keys=True, default=str)
+    return hashlib.sha256(fingerprint.encode()).hexdigest()
+
+
+def wants_json_response():
+    return request.headers.get('X-Requested-With') == 'XMLHttpRequest' or request.is_json
+
+
+def idempotency_error(message, status):
+    """Reject a request's Idempotency-Key the way the views report errors: JSON, or flash and redirect for forms."""
+    if wants_json_response():
+        return jsonify({'success': False, 'error': message}), status
+    flash(message, 'error')
+    return redirect(request.referrer or url_for('index'))
+
+
+def idempotency_applied_response():
+    """Reply to a retry whose original request committed its writes but has no stored response.
+
+    That happens while the original request is finishing, or when its worker
+    died (or its last commit failed) after the writes were committed.
+    """
+    message = 'This update was already recorded.'
+    if wants_json_response():
+        response = jsonify({'success': True, 'status': 'ok', 'message': message})
+    else:
+        flash(message, 'info')
+        response = redirect(request.referrer or url_for('index'))
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(f):
+    """Replay the original response when a request is retried with the same ``Idempotency-Key``.
+
+    Mobile networks often drop the response of a status update that did go
+    through, and the retry would record the change a second time. Clients send
+    an ``Idempotency-Key`` header (plain HTML forms may use an
+    ``idempotency_key`` field instead). The key is reserved in the same
+    transaction as the view's own writes, and the response is stored against
+    it afterwards. A reservation that is visible to a retry therefore always
+    means the writes are in place: the retry gets the stored response, or a
+    generic "already recorded" reply if the response was never stored. Keys
+    are scoped to the user and expire after IDEMPOTENCY_KEY_TTL seconds.
+    Requests without a key are not affected. Apply it below the access
+    decorator.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key') or request.form.get('idempotency_key')
+        if not key:
+            return f(*args, **kwargs)
+        if len(key) > 255:
+            return idempotency_error('Idempotency-Key is too long', 400)
+
+        user_id = session['user_id']
+        request_hash = idempotency_request_hash()
+        stored = db.session.get(IdempotencyKey, (user_id, key))
+        if stored is not None and as_utc(stored.created_at) < utcnow() - timedelta(seconds=app.config['IDEMPOTENCY_KEY_TTL']):
+            db.session.delete(stored)
+            db.session.commit()
+            stored = None
+        if stored is not None:
+            if stored.request_hash != request_hash:
+                return idempotency_error('Idempotency-Key was already used for a different request', 422)
+            if stored.status_code is None:
+                return idempotency_applied_response()
+            response = Response(stored.body, status=stored.status_code, mimetype=stored.mimetype)
+            if stored.location:
+                response.headers['Location'] = stored.location
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+
+        record = IdempotencyKey(user_id=user_id, key=key, request_hash=request_hash)
+        db.session.add(record)
+        try:
+            response = app.make_response(f(*args, **kwargs))
+        except IntegrityError:
+            db.session.rollback()
+            if db.session.get(IdempotencyKey, (user_id, key)) is not None:
+                # A concurrent retry with the same key committed its writes first
+                return idempotency_applied_response()
+            raise
+        except Exception:
+            # Unless the view already committed (and with it the reservation),
+            # this drops the reservation so a retry is processed normally
+            db.session.rollback()
+            raise
+        if response.status_code >= 500:
+            db.session.rollback()
+            return response
+
+        record.status_code = response.status_code
+        record.mimetype = response.mimetype
+        record.location = response.headers.get('Location')
+        record.body = response.get_data()
+        if next(_idempotency_key_stores) % 100 == 0:
+            cutoff = utcnow() - timedelta(seconds=app.config['IDEMPOTENCY_KEY_TTL'])
+            db.session.execute(db.delete(IdempotencyKey).where(IdempotencyKey.created_at < cutoff))
+        db.session.commit()
+        return response
+    return decorated_function
+
+
 @app.route('/update_status/<item_id>', methods=['POST'])
 @collector_required
+@idempotent
 def update_status(item_id):
     waste_item = WasteItem.query.filter_by(item_id=item_id).first_or_404()
     
@@ -981,17 +2963,19 @@ def update_status(item_id):
     if coord_issue:
         note_msg = f"{note_msg} [COORD_ISSUE: {coord_issue}]"
 
+    current_user = get_current_user()
     tracking = WasteTracking(
         waste_item_id=waste_item.id,
         status=new_status,
         location=location,
         latitude=lat_f,
         longitude=lng_f,
-        updated_by=get_current_user().id if get_current_user() else None,
+        updated_by=current_user.id if current_user else None,
         notes=note_msg
     )
     
     db.session.add(tracking)
+    update_item_position(waste_item, tracking, current_user.full_name if current_user else None)
     db.session.commit()
     
     # Notify SSE subscribers for any status updates with coordinates
@@ -1003,7 +2987,7 @@ def update_status(item_id):
             'latitude': tracking.latitude,
             'longitude': tracking.longitude,
             'timestamp': tracking.timestamp.isoformat(),
-            'collector_name': tracking.updater.full_name if tracking.updater else None,
+            'collector_name': current_user.full_name if current_user else None,
             'barangay_id': waste_item.barangay_id
         }
         notify_waste_location(payload)
@@ -1042,6 +3026,7 @@ def update_status(item_id):
 # API for collectors to update waste item tracking with precise coordinates
 @app.route('/api/waste/track', methods=['POST'])
 @collector_required
+@idempotent
 def api_waste_track():
     data = request.get_json() or {}
     item_id = data.get('item_id')
@@ -1077,17 +3062,19 @@ def api_waste_track():
     if coord_issue:
         note_msg = f"{note_msg} [COORD_ISSUE: {coord_issue}]"
 
+    current_user = get_current_user()
     tracking = WasteTracking(
         waste_item_id=waste_item.id,
         status=status,
         location=data.get('location'),
         latitude=lat_f,
         longitude=lng_f,
-        updated_by=get_current_user().id if get_current_user() else None,
+        updated_by=current_user.id if current_user else None,
         notes=note_msg
     )
 
     db.session.add(tracking)
+    update_item_position(waste_item, tracking, current_user.full_name if current_user else None)
     db.session.commit()
 
     # Notify SSE subscribers
@@ -1099,7 +3086,7 @@ def api_waste_track():
             'latitude': tracking.latitude,
             'longitude': tracking.longitude,
             'timestamp': tracking.timestamp.isoformat(),
-            'collector_name': tracking.updater.full_name if tracking.updater else None,
+            'collector_name': current_user.full_name if current_user else None,
             'barangay_id': waste_item.barangay_id
         }
         notify_waste_location(payload)
@@ -1115,81 +3102,405 @@ def api_waste_track():
         resp['warning'] = 'Partial device coordinates were provided; only one axis was recorded.'
     return jsonify(resp)
 
+class SyncOperation(db.Model):
+    """Outcome of an operation uploaded through /api/sync, keyed by its client-generated id.
+
+    Collectors queue updates on the phone while offline and may upload the same
+    batch again if the connection drops before the response arrives; a replayed
+    op_id returns the stored result instead of writing the update twice. Rows
+    older than SYNC_OPERATION_RETENTION_DAYS are pruned.
+    """
+    __tablename__ = 'sync_operation'
+    __table_args__ = (
+        db.Index('ix_sync_operation_created_at', 'created_at'),
+    )
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    op_id = db.Column(db.String(64), primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # status, sort, collect, location
+    status = db.Column(db.String(20), nullable=False)  # applied, rejected
+    result = db.Column(db.Text, nullable=True)  # JSON of the per-op result returned to the client
+    created_at = db.Column(db.DateTime, default=utcnow)
+
+
+app.config['SYNC_MAX_OPERATIONS'] = int(os.environ.get('SYNC_MAX_OPERATIONS', 500))
+app.config['SYNC_OPERATION_RETENTION_DAYS'] = int(os.environ.get('SYNC_OPERATION_RETENTION_DAYS', 30))
+_sync_batches = itertools.count(1)
+
+
+class SyncRejected(Exception):
+    """An uploaded operation that cannot be applied; the message is returned to the client.
+
+    The sync handlers raise it before changing anything, so a rejected
+    operation needs no rollback.
+    """
+
+
+def sync_op_time(op):
+    """When the collector performed ``op`` on the phone; missing or future times become now."""
+    now = utcnow()
+    try:
+        recorded_at = parse_utc_datetime(op['recorded_at']) if op.get('recorded_at') else now
+    except (TypeError, ValueError):
+        raise SyncRejected('Invalid recorded_at')
+    return min(recorded_at, now)
+
+
+def sync_waste_item(op):
+    item_id = op.get('item_id')
+    if not item_id:
+        raise SyncRejected('item_id is required')
+    waste_item = WasteItem.query.filter_by(item_id=item_id).first()
+    if waste_item is None:
+        raise SyncRejected(f'Item with ID "{item_id}" not found')
+    return waste_item
+
+
+def sync_status(op, user, recorded_at):
+    """Offline counterpart of update_status."""
+    waste_item = sync_waste_item(op)
+    if not waste_item.is_sorted:
+        raise SyncRejected('Cannot update status. Waste must be sorted before status can be updated.')
+    new_status = op.get('status')
+    if not new_status:
+        raise SyncRejected('Status is required')
+
+    lat_f, lng_f, coord_issue = normalize_coords(op.get('latitude'), op.get('longitude'))
+    location = op.get('location') or waste_item.address or ''
+    if lat_f is not None and lng_f is not None and not op.get('location'):
+        location = f"Lat: {lat_f:.5f}, Lng: {lng_f:.5f}"
+
+    stale = item_update_superseded(waste_item, recorded_at)
+    if not stale:
+        waste_item.status = new_status
+        waste_item.updated_at = utcnow()
+        if location and location != waste_item.address:
+            waste_item.address = location
+
+    note_msg = op.get('notes') or f'Status updated to {new_status.replace("_", " ").title()}'
+    if coord_issue:
+        note_msg = f"{note_msg} [COORD_ISSUE: {coord_issue}]"
+    tracking = WasteTracking(waste_item_id=waste_item.id, status=new_status, location=location,
+                             latitude=lat_f, longitude=lng_f, updated_by=user.id, notes=note_msg,
+                             timestamp=recorded_at)
+    db.session.add(tracking)
+    update_item_position(waste_item, tracking, user.full_name)
+    return waste_item, tracking, coord_issue, stale
+
+
+def sync_collect(op, user, recorded_at):
+    """Offline counterpart of mark_collected."""
+    waste_item = sync_waste_item(op)
+    if not waste_item.is_sorted:
+        raise SyncRejected('Cannot collect waste that is not sorted. Please mark the waste as sorted first.')
+    if waste_item.status != 'pending_collection':
+        raise SyncRejected('This waste item cannot be collected in its current status.')
+
+    lat_f, lng_f, coord_issue = normalize_coords(op.get('latitude'), op.get('longitude'))
+    stale = item_update_superseded(waste_item, recorded_at)
+    if not stale:
+        waste_item.status = 'collected'
+        waste_item.client_confirmed = False
+        waste_item.updated_at = utcnow()
+
+    notes = f'Collected by collection team ({user.full_name}) at {recorded_at.strftime("%Y-%m-%d %H:%M")}. Waiting for client confirmation.'
+    if coord_issue:
+        notes = f"{notes} [COORD_ISSUE: {coord_issue}]"
+    tracking = WasteTracking(waste_item_id=waste_item.id, status='collected', location=waste_item.address,
+                             latitude=lat_f, longitude=lng_f, updated_by=user.id, notes=notes,
+                             timestamp=recorded_at)
+    db.session.add(tracking)
+    update_item_position(waste_item, tracking, user.full_name)
+    return waste_item, tracking, coord_issue, stale
+
+
+def sync_sort(op, user, recorded_at):
+    """Offline counterpart of mark_sorted."""
+    waste_item = sync_waste_item(op)
+    if waste_item.status not in ['pending_collection', 'not_collected']:
+        raise SyncRejected('Waste can only be marked as sorted when it is pending collection or not collected.')
+    if waste_item.is_sorted:
+        raise SyncRejected('This waste item is already marked as sorted.')
+
+    stale = item_update_superseded(waste_item, recorded_at)
+    if not stale:
+        waste_item.is_sorted = True
+        waste_item.sorted_at = recorded_at
+        waste_item.sorted_by = user.id
+        waste_item.updated_at = utcnow()
+        if waste_item.status == 'not_collected':
+            waste_item.status = 'pending_collection'
+    tracking = WasteTracking(waste_item_id=waste_item.id, status='pending_collection', location=waste_item.address,
+                             notes=f'Waste marked as sorted by collection team ({user.full_name}) at {recorded_at.strftime("%Y-%m-%d %H:%M")}. Status updated to pending_collection.',
+                             timestamp=recorded_at)
+    db.session.add(tracking)
+    update_item_position(waste_item, tracking)
+    return waste_item, tracking, None, stale
+
+
+SYNC_ITEM_HANDLERS = {'status': sync_status, 'collect': sync_collect, 'sort': sync_sort}
+SYNC_OP_TYPES = tuple(SYNC_ITEM_HANDLERS) + ('location',)
+
+COORD_ISSUE_WARNINGS = {
+    'swapped': 'Device coordinates looked swapped and were corrected.',
+    'dropped': 'Device coordinates were invalid and were not saved.',
+    'partial': 'Partial device coordinates were provided; only one axis was recorded.',
+}
+
+
+def apply_sync_operation(op, user, pings, events):
+    """Apply one uploaded operation inside the caller's transaction and return its result.
+
+    GPS pings and SSE payloads are collected in ``pings`` and ``events`` so the
+    caller can publish them once the batch has committed.
+    """
+    kind = op.get('type')
+    if kind not in SYNC_OP_TYPES:
+        raise SyncRejected(f'Unknown operation type "{kind}"')
+    recorded_at = sync_op_time(op)
+
+    if kind == 'location':
+        lat_f, lng_f, _ = normalize_coords(op.get('latitude'), op.get('longitude'))
+        if lat_f is None or lng_f is None:
+            raise SyncRejected('Invalid coordinates')
+        pings.append((lat_f, lng_f, recorded_at))
+        return {}
+
+    waste_item, tracking, coord_issue, stale = SYNC_ITEM_HANDLERS[kind](op, user, recorded_at)
+    result = {'item': {'item_id': waste_item.item_id, 'status': waste_item.status}}
+    if stale:
+        # A newer update reached the server first; this one is kept as history only
+        result['superseded'] = True
+        result['warning'] = 'A newer update of this item was already recorded; this one was only added to its history.'
+        return result
+    events.append({
+        'item_id': waste_item.item_id,
+        'item_name': waste_item.item_name,
+        'status': tracking.status,
+        'latitude': tracking.latitude,
+        'longitude': tracking.longitude,
+        'timestamp': tracking.timestamp.isoformat(),
+        'collector_name': user.full_name,
+        'barangay_id': waste_item.barangay_id
+    })
+    if coord_issue in COORD_ISSUE_WARNINGS:
+        result['warning'] = COORD_ISSUE_WARNINGS[coord_issue]
+    return result
+
+
+def keyed_request_sync_result(op_id, stored):
+    """/api/sync result of an operation that already reached the server as a request with Idempotency-Key ``op_id``.
+
+    The scanner queues an update under the key of the request that failed to
+    come back, since that request may have been applied after all.
+    """
+    result = {'op_id': op_id, 'success': stored.status_code is None or stored.status_code < 400, 'replayed': True}
+    try:
+        body = json.loads(stored.body) if stored.body else {}
+    except ValueError:
+        body = {}
+    if isinstance(body, dict):
+        result.update((k, body[k]) for k in ('error', 'warning', 'item') if k in body)
+    return result
+
+
+@app.route('/api/sync', methods=['POST'])
+@collector_required
+def api_sync():
+    """Apply the operations a collector's phone queued while offline.
+
+    Body: ``{"operations": [{"op_id": ..., "type": ..., ...}, ...]}`` in the
+    order they were performed (at most SYNC_MAX_OPERATIONS). ``type`` is one of
+
+    - ``status``: item_id, status, optional location, notes, latitude, longitude
+    - ``sort`` / ``collect``: item_id, optional latitude, longitude
+    - ``location``: latitude, longitude (a GPS ping)
+
+    and every operation may carry ``recorded_at`` (ISO 8601), the time it was
+    performed on the device. Operations are validated before they write
+    anything, so a rejected one leaves no trace and does not undo the others;
+    the whole batch is committed once, and an unexpected error rolls all of it
+    back. The response has one result per operation, in order:
+    ``{"op_id", "success", "error"?, "warning"?, "item"?, "superseded"?, "replayed"?}``.
+    An item operation recorded before the item's latest known update is
+    ``superseded``: its tracking record is kept, but the item is not changed.
+    Operations whose op_id was already applied (or rejected) for this user,
+    through /api/sync or as the Idempotency-Key of a request, are not applied
+    again; their stored result is returned with ``replayed: true``.
+    """
+    operations = (request.get_json(silent=True) or {}).get('operations')
+    if not isinstance(operations, list) or not all(isinstance(op, dict) for op in operations):
+        return jsonify({'success': False, 'error': 'operations must be a list of objects'}), 400
+    if len(operations) > app.config['SYNC_MAX_OPERATIONS']:
+        return jsonify({'success': False, 'error': f'At most {app.config["SYNC_MAX_OPERATIONS"]} operations per request'}), 400
+    op_ids = [op.get('op_id') for op in operations]
+    if not all(isinstance(op_id, str) and 0 < len(op_id) <= 64 for op_id in op_ids):
+        return jsonify({'success': False, 'error': 'Every operation needs an op_id of at most 64 characters'}), 400
+
+    user = get_current_user()
+    done = {
+        row.op_id: row for row in SyncOperation.query.filter(
+            SyncOperation.user_id == user.id, SyncOperation.op_id.in_(set(op_ids))
+        )
+    }
+    keyed = {
+        row.key: row for row in IdempotencyKey.query.filter(
+            IdempotencyKey.user_id == user.id, IdempotencyKey.key.in_(set(op_ids))
+        )
+    }
+
+    results, pings, events = [], [], []
+    for op in operations:
+        op_id = op['op_id']
+        if op_id in done:
+            result = json.loads(done[op_id].result)
+            result['replayed'] = True
+            results.append(result)
+            continue
+        if op_id in keyed:
+            results.append(keyed_request_sync_result(op_id, keyed[op_id]))
+            continue
+        try:
+            result = {'op_id': op_id, 'success': True}
+            result.update(apply_sync_operation(op, user, pings, events))
+        except SyncRejected as e:
+            result = {'op_id': op_id, 'success': False, 'error': str(e)}
+        record = SyncOperation(user_id=user.id, op_id=op_id, kind=str(op.get('type'))[:20],
+                               status='applied' if result['success'] else 'rejected', result=json.dumps(result))
+        db.session.add(record)
+        done[op_id] = record
+        results.append(result)
+
+    if next(_sync_batches) % 100 == 0:
+        cutoff = utcnow() - timedelta(days=app.config['SYNC_OPERATION_RETENTION_DAYS'])
+        db.session.execute(db.delete(SyncOperation).where(SyncOperation.created_at < cutoff))
+    db.session.commit()
+
+    for lat_f, lng_f, seen_at in pings:
+        collector_locations.record(user.id, lat_f, lng_f, seen_at)
+    if pings:
+        lat_f, lng_f, seen_at = max(pings, key=lambda ping: ping[2])
+        events.append({
+            'user_id': user.id,
+            'username': user.username,
+            'full_name': user.full_name,
+            'barangay_id': user.barangay_id,
+            'latitude': lat_f,
+            'longitude': lng_f,
+            'last_seen': seen_at.isoformat()
+        })
+    for payload in events:
+        try:
+            if 'user_id' in payload:
+                notify_collector_location(payload)
+            else:
+                notify_waste_location(payload)
+        except Exception:
+            pass
+
+    return jsonify({'success': True, 'results': results})
+
 # API to fetch latest waste item locations (collected / in_transit)
 @app.route('/api/waste/locations')
 @login_required
 def api_waste_locations():
-    items = []
+    """Items to draw on the tracking maps.
+
+    Returns {items, removed, cursor, full}. Without ``since`` (or with a cursor
+    that is too old) every visible item is returned and full is true. With
+    ``since=<cursor>`` only items changed after that cursor are returned, and
+    ``removed`` lists the item_ids that changed and are no longer visible. The
+    response carries an ETag so an unchanged poll is answered with 304 after a
+    single lookup of the change feed head.
+    """
     # Include pending/not_collected so barangay users can see items even before pickup,
     # while still showing collected/in_transit for live tracking.
     statuses = ['collected', 'in_transit', 'pending_collection', 'not_collected']
     user = get_current_user()
-
-    # Determine which items to return based on role
-    if user and (user.is_collector() or user.is_admin()):
-        # Limit to barangays within the configured coverage area (e.g., Nabua, Camarines Sur)
-        waste_items = WasteItem.query.join(Barangay).filter(
+    if not user or not (user.is_collector() or user.is_admin() or user.is_barangay()):
+        return jsonify({'items': [], 'removed': [], 'cursor': 0, 'full': True})
+
+    since = request.args.get('since', type=int)
+    head, oldest = db.session.query(db.func.max(WasteItemChange.id), db.func.min(WasteItemChange.id)).one()
+    cursor = head or 0
+    # A cursor from the future (e.g. after the feed was reset) or one whose
+    # successors were pruned cannot be served incrementally
+    full = since is None or since > cursor or (oldest is not None and since < oldest - 1)
+
+    scope = 'all' if (user.is_collector() or user.is_admin()) else f'barangay-{user.barangay_id}'
+    etag = f'{scope}-{cursor}-' + ('full' if full else str(since))
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    items, removed = [], []
+    if full or since < cursor:
+        # Positions come from the materialized waste_item_position projection, so this
+        # is a single query regardless of how long each item's tracking history is.
+        # Items that have never been seen with coordinates are not shown on the map.
+        query = db.session.query(
+            WasteItem.id,
+            WasteItem.item_id,
+            WasteItem.item_name,
+            WasteItem.status,
+            WasteItem.updated_at,
+            WasteItemPosition.latitude,
+            WasteItemPosition.longitude,
+            WasteItemPosition.timestamp,
+            WasteItemPosition.collector_name
+        ).join(WasteItemPosition, WasteItemPosition.waste_item_id == WasteItem.id).filter(
             WasteItem.status.in_(statuses),
-            Barangay.municipality == COVERAGE_MUNICIPALITY,
-            Barangay.province == COVERAGE_PROVINCE
-        ).all()
-    elif user and user.is_barangay():
-        # Only items from this user's barangay
-        waste_items = WasteItem.query.filter(WasteItem.status.in_(statuses), WasteItem.barangay_id == user.barangay_id).all()
-    else:
-        return jsonify({'items': []})
-
-    for it in waste_items:
-        # Get the most recent tracking record for this item
-        last = WasteTracking.query.filter_by(waste_item_id=it.id).order_by(WasteTracking.timestamp.desc()).first()
-
-        lat = None
-        lng = None
-        ts = None
-        last_with_coords = None
-
-        if last:
-            ts = last.timestamp
-            lat = last.latitude
-            lng = last.longitude
-
-        # If the latest record has no coordinates (e.g., only a status/note update),
-        # fall back to the latest record that DOES have coordinates so the item
-        # still appears on the map.
-        if (lat is None or lng is None):
-            last_with_coords = WasteTracking.query.filter(
-                WasteTracking.waste_item_id == it.id,
-                WasteTracking.latitude.isnot(None),
-                WasteTracking.longitude.isnot(None)
-            ).order_by(WasteTracking.timestamp.desc()).first()
-            if last_with_coords:
-                lat = last_with_coords.latitude
-                lng = last_with_coords.longitude
-                # Prefer the timestamp of the coordinate-bearing record if we
-                # didn't already have a newer timestamp.
-                if ts is None or last_with_coords.timestamp > ts:
-                    ts = last_with_coords.timestamp
-
-        # If we still don't have valid coordinates, skip this item
-        if lat is None or lng is None:
-            continue
+            WasteItemPosition.latitude.isnot(None),
+            WasteItemPosition.longitude.isnot(None)
+        )
 
-        # Determine collector name from the most relevant tracking record
-        source_record = last if (last and last.latitude is not None and last.longitude is not None) else last_with_coords
-        collector_name = None
-        if source_record and source_record.updater:
-            collector_name = source_record.updater.full_name
+        # Determine which items to return based on role
+        if scope == 'all':
+            # Limit to barangays within the configured coverage area (e.g., Nabua, Camarines Sur)
+            query = query.join(Barangay, WasteItem.barangay_id == Barangay.id).filter(
+                Barangay.municipality == COVERAGE_MUNICIPALITY,
+                Barangay.province == COVERAGE_PROVINCE
+            )
+        else:
+            # Only items from this user's barangay
+            query = query.filter(WasteItem.barangay_id == user.barangay_id)
 
-        items.append({
-            'item_id': it.item_id,
-            'item_name': it.item_name,
-            'status': it.status,
-            'latitude': lat,
-            'longitude': lng,
-            'timestamp': (ts or it.updated_at).isoformat(),
-            'collector_name': collector_name
-        })
-    return jsonify({'items': items})
+        changed = {}
+        if not full:
+            feed = db.session.query(WasteItemChange.waste_item_id, WasteItemChange.item_id).filter(
+                WasteItemChange.id > since, WasteItemChange.id <= cursor
+            )
+            if scope != 'all':
+                feed = feed.filter(db.or_(WasteItemChange.barangay_id == user.barangay_id,
+                                          WasteItemChange.barangay_id.is_(None)))
+            for waste_item_id, item_id in feed:
+                changed[waste_item_id] = changed.get(waste_item_id) or item_id
+            query = query.filter(WasteItem.id.in_(list(changed)))
+
+        for it in query.all():
+            changed.pop(it.id, None)
+            items.append({
+                'item_id': it.item_id,
+                'item_name': it.item_name,
+                'status': it.status,
+                'latitude': it.latitude,
+                'longitude': it.longitude,
+                'timestamp': (it.timestamp or it.updated_at).isoformat(),
+                'collector_name': it.collector_name
+            })
+
+        # Whatever changed but is no longer visible has to come off the map
+        unknown = [waste_item_id for waste_item_id, item_id in changed.items() if item_id is None]
+        if unknown:
+            changed.update(db.session.query(WasteItem.id, WasteItem.item_id).filter(WasteItem.id.in_(unknown)).all())
+        removed = sorted(item_id for item_id in changed.values() if item_id)
+
+    response = jsonify({'items': items, 'removed': removed, 'cursor': cursor, 'full': full})
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 @app.route('/tracking')
 @collector_required
@@ -1256,6 +3567,7 @@ def add_barangay():
             
             db.session.add(barangay)
             db.session.commit()
+            barangay_cache.invalidate()
             
             flash(f'Barangay "{name}" added successfully!', 'success')
             return redirect(url_for('barangays'))
@@ -1314,6 +3626,7 @@ def edit_barangay(barangay_id):
             barangay.is_active = is_active
             
             db.session.commit()
+            barangay_cache.invalidate()
             
             flash(f'Barangay "{name}" updated successfully!', 'success')
             return redirect(url_for('barangays'))
@@ -1342,11 +3655,13 @@ def delete_barangay(barangay_id):
             # Instead of deleting, deactivate it
             barangay.is_active = False
             db.session.commit()
+            barangay_cache.invalidate()
             flash(f'Barangay "{barangay.name}" has been deactivated (cannot delete due to associated records).', 'warning')
         else:
             # Safe to delete
             db.session.delete(barangay)
             db.session.commit()
+            barangay_cache.invalidate()
             flash(f'Barangay "{barangay.name}" has been deleted successfully!', 'success')
             
     except Exception as e:
@@ -1367,6 +3682,7 @@ def toggle_barangay_status(barangay_id):
     try:
         barangay.is_active = not barangay.is_active
         db.session.commit()
+        barangay_cache.invalidate()
         status = 'activated' if barangay.is_active else 'deactivated'
         flash(f'Barangay "{barangay.name}" has been {status} successfully!', 'success')
     except Exception as e:
@@ -1383,13 +3699,7 @@ def collection_routes():
 @app.route('/collection_status')
 def collection_status():
     # Get collection status by barangay
-    barangay_collections = db.session.query(
-        Barangay.name,
-        db.func.count(WasteItem.id).label('total_items'),
-        db.func.count(db.case((WasteItem.status == 'pending_collection', 1), else_=None)).label('pending'),
-        db.func.count(db.case((WasteItem.status == 'collected', 1), else_=None)).label('collected'),
-        db.func.count(db.case((WasteItem.status == 'processed', 1), else_=None)).label('processed')
-    ).outerjoin(WasteItem).group_by(Barangay.id, Barangay.name).all()
+    barangay_collections = waste_item_stats().by_barangay
     
     return render_template('collection_status.html', barangay_collections=barangay_collections)
 
@@ -1403,87 +3713,137 @@ def dashboard():
     # For barangay users, filter by items they created
     # For admins/collectors, show all items
     if user_role == 'barangay' and user_id:
-        # Barangay users see only their own items
-        base_query = WasteItem.query.filter_by(created_by=user_id)
-        
-        # Get barangay-specific statistics
-        total_waste_items = base_query.count()
-        pending_collection = base_query.filter_by(status='pending_collection').count()
-        collected = base_query.filter_by(status='collected').count()
-        in_transit = base_query.filter_by(status='in_transit').count()
-        processed = base_query.filter_by(status='processed').count()
-        disposed = base_query.filter_by(status='disposed').count()
-        not_collected = base_query.filter_by(status='not_collected').count()
-        
-        # Get waste type statistics for user's items
-        waste_type_stats = db.session.query(
-            WasteItem.waste_type,
-            db.func.count(WasteItem.id).label('count')
-        ).filter_by(created_by=user_id).group_by(WasteItem.waste_type).all()
-        
-        # Get barangay statistics - show only user's barangay
-        # Use the same format as admin view for consistency
-        barangay_stats = db.session.query(
-            Barangay.name,
-            db.func.count(WasteItem.id).label('total_items'),
-            db.func.count(db.case((WasteItem.status == 'pending_collection', 1), else_=None)).label('pending_items')
-        ).join(WasteItem).filter(WasteItem.created_by == user_id).group_by(Barangay.id, Barangay.name).order_by(db.func.count(WasteItem.id).desc()).all()
+        # Barangay users see only their own items (and only their barangay appears)
+        stats = waste_item_stats(created_by=user_id)
         
         # Get recent waste items for this user
-        recent_items = base_query.order_by(WasteItem.created_at.desc()).limit(10).all()
+        recent_items = WasteItem.query.options(db.joinedload(WasteItem.barangay)).filter_by(created_by=user_id).order_by(WasteItem.created_at.desc()).limit(10).all()
         
         # Collection team statistics not relevant for barangay users
         total_routes = 0
         active_routes = 0
     else:
         # Admins and collectors see all items
-        total_waste_items = WasteItem.query.count()
-        pending_collection = WasteItem.query.filter_by(status='pending_collection').count()
-        collected = WasteItem.query.filter_by(status='collected').count()
-        in_transit = WasteItem.query.filter_by(status='in_transit').count()
-        processed = WasteItem.query.filter_by(status='processed').count()
-        disposed = WasteItem.query.filter_by(status='disposed').count()
-        not_collected = WasteItem.query.filter_by(status='not_collected').count()
-        
-        # Get waste type statistics
-        waste_type_stats = db.session.query(
-            WasteItem.waste_type,
-            db.func.count(WasteItem.id).label('count')
-        ).group_by(WasteItem.waste_type).all()
-        
-        # Get barangay statistics
-        barangay_stats = db.session.query(
-            Barangay.name,
-            db.func.count(WasteItem.id).label('total_items'),
-            db.func.count(db.case((WasteItem.status == 'pending_collection', 1), else_=None)).label('pending_items')
-        ).outerjoin(WasteItem).group_by(Barangay.id, Barangay.name).order_by(db.func.count(WasteItem.id).desc()).all()
+        stats = waste_item_stats()
         
         # Get recent waste items
-        recent_items = WasteItem.query.order_by(WasteItem.created_at.desc()).limit(10).all()
+        recent_items = WasteItem.query.options(db.joinedload(WasteItem.barangay)).order_by(WasteItem.created_at.desc()).limit(10).all()
         
         # Get collection team statistics
         total_routes = CollectionRoute.query.count()
         active_routes = CollectionRoute.query.filter_by(is_active=True).count() if hasattr(CollectionRoute, 'is_active') else total_routes
     
     return render_template('dashboard.html',
-                         total_waste_items=total_waste_items,
-                         pending_collection=pending_collection,
-                         collected=collected,
-                         in_transit=in_transit,
-                         processed=processed,
-                         disposed=disposed,
-                         not_collected=not_collected,
-                         waste_type_stats=waste_type_stats,
-                         barangay_stats=barangay_stats,
+                         total_waste_items=stats.total,
+                         pending_collection=stats.by_status['pending_collection'],
+                         collected=stats.by_status['collected'],
+                         in_transit=stats.by_status['in_transit'],
+                         processed=stats.by_status['processed'],
+                         disposed=stats.by_status['disposed'],
+                         not_collected=stats.by_status['not_collected'],
+                         waste_type_stats=stats.by_waste_type,
+                         barangay_stats=sorted(stats.by_barangay, key=lambda b: b.total_items, reverse=True),
                          recent_items=recent_items,
                          total_routes=total_routes,
                          active_routes=active_routes,
                          user_role=user_role)
 
+app.config['REGISTERED_ITEMS_PAGE_SIZE'] = int(os.environ.get('REGISTERED_ITEMS_PAGE_SIZE', 50))
+REGISTERED_ITEMS_MAX_PAGE_SIZE = 200
+
+REGISTERED_ITEM_STATUS_OPTIONS = [
+    ('pending_collection', 'Pending Collection'),
+    ('collected', 'Collected'),
+    ('in_transit', 'In Transit'),
+    ('processed', 'Processed'),
+    ('disposed', 'Disposed'),
+    ('not_collected', 'Not Collected')
+]
+
+
+def encode_keyset_cursor(values):
+    """Opaque cursor holding the sort key of the last row of a page."""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that was not produced by encode_keyset_cursor."""
+
+
+def decode_keyset_cursor(cursor, columns):
+    """Inverse of encode_keyset_cursor for a key over ``columns``. Raises InvalidCursor."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode())
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError('wrong number of values')
+        return [datetime.fromisoformat(v) if isinstance(c.type, db.DateTime) else v for c, v in zip(columns, values)]
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f'Invalid cursor: {cursor}') from e
+
+
+def unindexed(column):
+    """``+column``: SQLite will not use an index on a column behind unary plus.
+
+    Used to steer the planner to an index that serves the ORDER BY when a
+    filter on another indexed column would otherwise win and force a sort.
+    """
+    return UnaryExpression(column, operator=sql_operators.custom_op('+'), type_=column.type)
+
+
+def keyset_page(query, columns, key, cursor=None, limit=50, descending=True):
+    """One page of ``query`` ordered by ``columns``, plus the cursor of the next page.
+
+    ``key(row)`` returns the values of ``columns`` for a result row. Pages seek
+    past the cursor with a row-value comparison instead of an OFFSET, so an index
+    on ``columns`` serves every page at the same cost.
+    """
+    if cursor:
+        values = decode_keyset_cursor(cursor, columns)
+        position = db.tuple_(*columns)
+        query = query.filter(position < tuple(values) if descending else position > tuple(values))
+    query = query.order_by(*[c.desc() if descending else c.asc() for c in columns])
+    rows = query.limit(limit + 1).all()
+    next_cursor = encode_keyset_cursor(key(rows[limit - 1])) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def registered_items_page(filter_date='', filter_barangay='', filter_status='', cursor=None, limit=None):
+    """One page of registered items, newest first, plus the cursor of the next page.
+
+    Pages are keyset-paginated on (created_at, id), so each page is a range scan
+    of ix_waste_item_created_at (or the barangay/status composite index) no
+    matter how deep into the list it is. The date filter is a created_at range
+    for the same reason. Raises ValueError for a malformed date or cursor.
+    """
+    limit = max(1, min(limit or app.config['REGISTERED_ITEMS_PAGE_SIZE'], REGISTERED_ITEMS_MAX_PAGE_SIZE))
+    query = WasteItem.query.options(db.joinedload(WasteItem.barangay), db.joinedload(WasteItem.creator))
+
+    if filter_date:
+        day_start = datetime.strptime(filter_date, '%Y-%m-%d')
+        query = query.filter(WasteItem.created_at >= day_start, WasteItem.created_at < day_start + timedelta(days=1))
+
+    if filter_barangay:
+        try:
+            query = query.filter(WasteItem.barangay_id == int(filter_barangay))
+        except ValueError:
+            pass
+
+    if filter_status:
+        query = query.filter(WasteItem.status == filter_status)
+
+    return keyset_page(query, [WasteItem.created_at, WasteItem.id], lambda item: (item.created_at, item.id),
+                       cursor=cursor, limit=limit)
+
+
 @app.route('/registered_items')
 @login_required
 def registered_items():
-    """View all registered waste items with date filter (collection team and admin only)"""
+    """View registered waste items with date filter (collection team and admin only)
+
+    Renders the first page; the rest is loaded by infinite scroll from
+    api_registered_items (or by following the ``cursor`` link without JS).
+    """
     # Check if user is collector or admin
     if session.get('role') not in ['collector', 'admin']:
         flash('You do not have permission to access this page.', 'error')
@@ -1494,87 +3854,194 @@ def registered_items():
     filter_barangay = request.args.get('barangay', '')
     filter_status = request.args.get('status', '')
     
-    # Build query - join with Barangay and User (outer join for user in case created_by is None)
-    query = WasteItem.query.join(Barangay)
-    query = query.outerjoin(User, WasteItem.created_by == User.id)
-    
-    # Apply date filter
-    if filter_date:
-        try:
-            filter_date_obj = datetime.strptime(filter_date, '%Y-%m-%d')
-            query = query.filter(db.func.date(WasteItem.created_at) == filter_date_obj.date())
-        except ValueError:
-            flash('Invalid date format.', 'error')
-    
-    # Apply barangay filter
-    if filter_barangay:
-        try:
-            query = query.filter(WasteItem.barangay_id == int(filter_barangay))
-        except ValueError:
-            pass
-    
-    # Apply status filter
-    if filter_status:
-        query = query.filter(WasteItem.status == filter_status)
-    
-    # Order by creation date (newest first)
-    waste_items = query.order_by(WasteItem.created_at.desc()).all()
+    try:
+        waste_items, next_cursor = registered_items_page(filter_date, filter_barangay, filter_status,
+                                                         cursor=request.args.get('cursor'))
+    except InvalidCursor:
+        flash('Invalid page link; showing the first page instead.', 'warning')
+        waste_items, next_cursor = registered_items_page(filter_date, filter_barangay, filter_status)
+    except ValueError:
+        flash('Invalid date format.', 'error')
+        filter_date = ''
+        waste_items, next_cursor = registered_items_page('', filter_barangay, filter_status)
     
     # Get all barangays for filter dropdown
     barangays = Barangay.query.filter_by(is_active=True).order_by(Barangay.name).all()
     
-    # Get status options
-    status_options = [
-        ('pending_collection', 'Pending Collection'),
-        ('collected', 'Collected'),
-        ('in_transit', 'In Transit'),
-        ('processed', 'Processed'),
-        ('disposed', 'Disposed'),
-        ('not_collected', 'Not Collected')
-    ]
-    
     return render_template('registered_items.html', 
                          waste_items=waste_items,
+                         next_cursor=next_cursor,
                          barangays=barangays,
-                         status_options=status_options,
+                         status_options=REGISTERED_ITEM_STATUS_OPTIONS,
                          filter_date=filter_date,
                          filter_barangay=filter_barangay,
                          filter_status=filter_status)
 
+
+@app.route('/api/registered_items')
+@login_required
+def api_registered_items():
+    """JSON page of registered items for infinite scroll.
+
+    Accepts the same filters as registered_items plus ``cursor`` and ``limit``.
+    Returns {items, html, next_cursor}; ``html`` holds the rendered table rows.
+    """
+    if session.get('role') not in ['collector', 'admin']:
+        return jsonify(success=False, error='Forbidden'), 403
+
+    try:
+        waste_items, next_cursor = registered_items_page(
+            request.args.get('date', ''), request.args.get('barangay', ''), request.args.get('status', ''),
+            cursor=request.args.get('cursor'), limit=request.args.get('limit', type=int)
+        )
+    except ValueError as e:
+        return jsonify(success=False, error=str(e)), 400
+
+    return jsonify(
+        success=True,
+        items=[{
+            'item_id': item.item_id,
+            'item_name': item.item_name,
+            'waste_type': item.waste_type,
+            'barangay': item.barangay.name,
+            'status': item.status,
+            'client_confirmed': item.client_confirmed,
+            'is_sorted': item.is_sorted,
+            'created_at': item.created_at.isoformat() if item.created_at else None
+        } for item in waste_items],
+        html=render_template('_registered_item_rows.html', waste_items=waste_items),
+        next_cursor=next_cursor
+    )
+
+app.config['COLLECTION_TEAM_PAGE_SIZE'] = int(os.environ.get('COLLECTION_TEAM_PAGE_SIZE', 25))
+# Collection team can update status to: collected, in_transit, processed, disposed
+COLLECTOR_STATUSES = ['collected', 'in_transit', 'processed', 'disposed']
+
+CollectionTeamCounts = namedtuple('CollectionTeamCounts', [
+    'pending', 'pending_barangays', 'hazardous_pending', 'awaiting', 'confirmed',
+    'collected', 'in_transit', 'processed', 'disposed', 'status_updates'
+])
+
+
+def collection_team_counts_query():
+    """Every panel and summary-card count of collection_team as one query.
+
+    Status counts come from the waste_stats rollup; only the awaiting/confirmed
+    split needs waste_item, and that is an index-only count of the unconfirmed
+    collected items.
+    """
+    status, count = WasteStatsRollup.status, WasteStatsRollup.count
+
+    def total(*conditions):
+        return db.func.coalesce(db.func.sum(db.case((db.and_(*conditions), count), else_=0)), 0)
+
+    awaiting = db.select(db.func.count(WasteItem.id)).where(
+        WasteItem.status == 'collected', WasteItem.client_confirmed == False
+    ).scalar_subquery()
+    return db.session.query(
+        total(status == 'pending_collection'),
+        db.func.count(db.distinct(db.case(
+            (db.and_(status == 'pending_collection', count > 0), WasteStatsRollup.barangay_id), else_=None
+        ))),
+        total(status == 'pending_collection', WasteStatsRollup.waste_type == 'hazardous'),
+        *[total(status == s) for s in COLLECTOR_STATUSES],
+        awaiting
+    )
+
+
+def collection_team_counts():
+    """CollectionTeamCounts from collection_team_counts_query()."""
+    pending, pending_barangays, hazardous_pending, collected, in_transit, processed, disposed, awaiting = \
+        collection_team_counts_query().one()
+    return CollectionTeamCounts(
+        pending=pending, pending_barangays=pending_barangays, hazardous_pending=hazardous_pending,
+        awaiting=awaiting, confirmed=collected - awaiting,
+        collected=collected, in_transit=in_transit, processed=processed, disposed=disposed,
+        status_updates=collected + in_transit + processed + disposed
+    )
+
+
+def collection_team_panel_query(panel):
+    """(query, sort columns, key function, descending) of a collection_team panel.
+
+    Raises KeyError for an unknown panel.
+    """
+    query = WasteItem.query.join(Barangay).options(db.contains_eager(WasteItem.barangay))
+    by_update = [WasteItem.updated_at, WasteItem.id]
+
+    def update_key(item):
+        return item.updated_at, item.id
+
+    if panel == 'pending':
+        # Pending collections by barangay; this sorts the pending items, which
+        # is the current workload rather than the whole history
+        return (query.filter(WasteItem.status == 'pending_collection'),
+                [Barangay.name, WasteItem.created_at, WasteItem.id],
+                lambda item: (item.barangay.name, item.created_at, item.id), False)
+    if panel in ('awaiting', 'confirmed'):
+        # Collected items waiting for / already given client confirmation
+        return (query.filter(WasteItem.status == 'collected', WasteItem.client_confirmed == (panel == 'confirmed')),
+                by_update, update_key, True)
+    if panel == 'status_updates':
+        # Walk updated_at newest first and stop after one page, rather than
+        # sorting every item that ever reached a collector status
+        return (query.filter(unindexed(WasteItem.status).in_(COLLECTOR_STATUSES)),
+                by_update, update_key, True)
+    raise KeyError(panel)
+
+
+def collection_team_page(panel, cursor=None, limit=None):
+    """One page of a collection_team panel and the cursor of the next page.
+
+    Raises KeyError for an unknown panel and ValueError for a malformed cursor.
+    """
+    limit = max(1, min(limit or app.config['COLLECTION_TEAM_PAGE_SIZE'], REGISTERED_ITEMS_MAX_PAGE_SIZE))
+    query, columns, key, descending = collection_team_panel_query(panel)
+    return keyset_page(query, columns, key, cursor=cursor, limit=limit, descending=descending)
+
+
 @app.route('/collection_team')
 @collector_required
 def collection_team():
-    # Get pending collections by barangay for collection team
-    pending_collections = WasteItem.query.join(Barangay).filter(
-        WasteItem.status == 'pending_collection'
-    ).order_by(Barangay.name, WasteItem.created_at).all()
-    
-    # Get collected items waiting for client confirmation
-    awaiting_confirmation = WasteItem.query.join(Barangay).filter(
-        WasteItem.status == 'collected',
-        WasteItem.client_confirmed == False
-    ).order_by(WasteItem.updated_at.desc()).all()
-
-    # Get items already confirmed by barangay representatives (clients)
-    confirmed_collections = WasteItem.query.join(Barangay).filter(
-        WasteItem.status == 'collected',
-        WasteItem.client_confirmed == True
-    ).order_by(WasteItem.updated_at.desc()).all()
-    
-    # Get all items with status updates made by collection team
-    # Collection team can update status to: collected, in_transit, processed, disposed
-    status_updates = WasteItem.query.join(Barangay).filter(
-        WasteItem.status.in_(['collected', 'in_transit', 'processed', 'disposed'])
-    ).order_by(WasteItem.updated_at.desc()).all()
-    
-    return render_template('collection_team.html', 
-                         pending_collections=pending_collections,
-                         awaiting_confirmation=awaiting_confirmation,
-                         confirmed_collections=confirmed_collections,
-                         status_updates=status_updates)
+    # Panel rows are loaded page by page from api_collection_team; the page
+    # itself only needs the counts
+    return render_template('collection_team.html', counts=collection_team_counts())
+
+
+@app.route('/api/collection_team/<panel>')
+@collector_required
+def api_collection_team(panel):
+    """JSON page of one collection_team panel: {items, html, next_cursor}.
+
+    Panels: pending, awaiting, confirmed, status_updates. Query params: cursor, limit.
+    ``html`` holds the rendered table rows for the panel.
+    """
+    try:
+        items, next_cursor = collection_team_page(panel, cursor=request.args.get('cursor'),
+                                                  limit=request.args.get('limit', type=int))
+    except KeyError:
+        return jsonify(success=False, error='Unknown panel'), 404
+    except ValueError as e:
+        return jsonify(success=False, error=str(e)), 400
+
+    return jsonify(
+        success=True,
+        items=[{
+            'item_id': item.item_id,
+            'item_name': item.item_name,
+            'barangay': item.barangay.name,
+            'waste_type': item.waste_type,
+            'status': item.status,
+            'is_sorted': item.is_sorted,
+            'updated_at': item.updated_at.isoformat() if item.updated_at else None
+        } for item in items],
+        html=render_template('_collection_team_rows.html', panel=panel, items=items),
+        next_cursor=next_cursor
+    )
 
 @app.route('/mark_collected/<item_id>', methods=['POST'])
 @collector_required
+@idempotent
 def mark_collected(item_id):
     waste_item = WasteItem.query.filter_by(item_id=item_id).first_or_404()
     current_user = get_current_user()
@@ -1616,6 +4083,7 @@ def mark_collected(item_id):
     )
 
     db.session.add(tracking)
+    update_item_position(waste_item, tracking, current_user.full_name if current_user else None)
     db.session.commit()
 
     # Surface user-visible notification when applicable
@@ -1625,9 +4093,6 @@ def mark_collected(item_id):
         flash('Device coordinates were invalid and were not saved.', 'warning')
     elif coord_issue == 'partial':
         flash('Partial device coordinates were provided; only one axis was recorded.', 'warning')
-    
-    db.session.add(tracking)
-    db.session.commit()
 
     # Notify SSE subscribers about this collection (real-time updates)
     try:
@@ -1683,6 +4148,7 @@ def mark_sorted(item_id):
     )
     
     db.session.add(tracking)
+    update_item_position(waste_item, tracking)
     db.session.commit()
     
     flash('Waste marked as sorted successfully! It is now ready for collection.', 'success')
@@ -1718,6 +4184,7 @@ def mark_unsorted(item_id):
     )
     
     db.session.add(tracking)
+    update_item_position(waste_item, tracking)
     db.session.commit()
     
     flash('Waste marked as unsorted. Status automatically updated to "Not Collected" with reason: Unsorted Waste.', 'warning')
@@ -1758,6 +4225,7 @@ def confirm_collection(item_id):
     )
     
     db.session.add(tracking)
+    update_item_position(waste_item, tracking)
     db.session.commit()
     
     flash('Collection confirmed successfully! Thank you for confirming.', 'success')
@@ -1783,6 +4251,7 @@ def sync_barangays_api():
     """Sync barangays for Nabua only"""
     try:
         success = sync_barangays()
+        barangay_cache.invalidate()
         if success:
             return jsonify({'success': True, 'message': 'Nabua barangays synced successfully'})
         else:
@@ -1800,6 +4269,7 @@ def force_sync_barangays_api():
         
         from add_nabua_barangays import add_nabua_barangays
         add_nabua_barangays()
+        barangay_cache.invalidate()
         
         count = Barangay.query.count()
         return jsonify({'success': True, 'message': f'Force sync completed: {count} barangays loaded'})
@@ -1878,24 +4348,241 @@ def add_user():
     return render_template('add_user.html', barangays=barangays)
 
 
-@app.route('/api/items')
-def api_items():
-    # Return items only for the configured coverage area
-    items = WasteItem.query.join(Barangay).filter(
+# Fields /api/items can return, in output order: name -> (column, serializer)
+API_ITEM_FIELDS = OrderedDict([
+    ('id', (WasteItem.id, None)),
+    ('item_id', (WasteItem.item_id, None)),
+    ('item_name', (WasteItem.item_name, None)),
+    ('waste_type', (WasteItem.waste_type, None)),
+    ('status', (WasteItem.status, None)),
+    ('barangay', (Barangay.name, None)),
+    ('municipality', (Barangay.municipality, None)),
+    ('address', (WasteItem.address, None)),
+    ('created_at', (WasteItem.created_at, lambda value: value.isoformat())),
+])
+API_ITEMS_MAX_PAGE_SIZE = 1000
+
+
+def api_items_query(fields, status=None, barangay_id=None, after_id=None):
+    """Column projection of in-coverage waste items in id order for /api/items.
+
+    Selects the item id (the pagination key) followed by ``fields``; no ORM
+    objects are built, so rows can be streamed with yield_per.
+    """
+    query = db.session.query(WasteItem.id, *[API_ITEM_FIELDS[name][0] for name in fields]).join(
+        Barangay, WasteItem.barangay_id == Barangay.id
+    ).filter(
         Barangay.municipality == COVERAGE_MUNICIPALITY,
         Barangay.province == COVERAGE_PROVINCE
-    ).all()
-    return jsonify([{
-        'id': item.id,
-        'item_id': item.item_id,
-        'item_name': item.item_name,
-        'waste_type': item.waste_type,
-        'status': item.status,
-        'barangay': item.barangay.name,
-        'municipality': item.barangay.municipality,
-        'address': item.address,
-        'created_at': item.created_at.isoformat()
-    } for item in items])
+    )
+    if status:
+        query = query.filter(WasteItem.status == status)
+    if barangay_id is not None:
+        query = query.filter(WasteItem.barangay_id == barangay_id)
+    if after_id is not None:
+        query = query.filter(WasteItem.id > after_id)
+    return query.order_by(WasteItem.id)
+
+
+@app.route('/api/items')
+def api_items():
+    """Stream in-coverage waste items as JSON.
+
+    Query params: fields (comma-separated subset of API_ITEM_FIELDS, default all),
+    status, barangay_id, limit and cursor. Without ``limit`` the response is the
+    JSON array of every matching item; with it, the response is
+    ``{"items": [...], "next_cursor": ...}`` and the next page is requested with
+    ``cursor=<next_cursor>``. Rows are read with yield_per and written as they
+    arrive, so memory stays flat however many items match.
+    """
+    fields = [name.strip() for name in request.args.get('fields', '').split(',') if name.strip()] or list(API_ITEM_FIELDS)
+    unknown = [name for name in fields if name not in API_ITEM_FIELDS]
+    if unknown:
+        return jsonify(success=False, error=f"Unknown fields: {', '.join(unknown)}"), 400
+    try:
+        barangay_id = int(request.args['barangay_id']) if request.args.get('barangay_id') else None
+        limit = int(request.args['limit']) if request.args.get('limit') else None
+        if limit is not None and limit < 1:
+            raise ValueError('limit')
+        cursor = request.args.get('cursor')
+        after_id = decode_keyset_cursor(cursor, [WasteItem.id])[0] if cursor else None
+        if after_id is not None and not isinstance(after_id, int):
+            raise ValueError('cursor')
+    except ValueError:
+        return jsonify(success=False, error='Invalid barangay_id/limit/cursor'), 400
+    paginated = limit is not None or cursor is not None
+    if paginated:
+        limit = min(limit or API_ITEMS_MAX_PAGE_SIZE, API_ITEMS_MAX_PAGE_SIZE)
+
+    query = api_items_query(fields, status=request.args.get('status'), barangay_id=barangay_id, after_id=after_id)
+    if paginated:
+        query = query.limit(limit + 1)
+    serializers = [(name, API_ITEM_FIELDS[name][1]) for name in fields]
+
+    def gen():
+        yield '{"items": [' if paginated else '['
+        next_cursor = None
+        for i, row in enumerate(query.yield_per(1000)):
+            if paginated and i == limit:
+                next_cursor = encode_keyset_cursor([last_id])
+                break
+            last_id = row[0]
+            yield (', ' if i else '') + json.dumps({
+                name: serialize(value) if serialize and value is not None else value
+                for (name, serialize), value in zip(serializers, row[1:])
+            })
+        yield '], "next_cursor": %s}' % json.dumps(next_cursor) if paginated else ']'
+
+    return Response(stream_with_context(gen()), mimetype='application/json')
+
+# Columns of the bulk exports, in output order: header -> column
+WASTE_ITEM_EXPORT_COLUMNS = [
+    ('item_id', WasteItem.item_id),
+    ('item_name', WasteItem.item_name),
+    ('waste_type', WasteItem.waste_type),
+    ('weight', WasteItem.weight),
+    ('status', WasteItem.status),
+    ('is_sorted', WasteItem.is_sorted),
+    ('client_confirmed', WasteItem.client_confirmed),
+    ('barangay', Barangay.name),
+    ('address', WasteItem.address),
+    ('created_by', User.username),
+    ('created_at', WasteItem.created_at),
+    ('updated_at', WasteItem.updated_at),
+]
+TRACKING_EXPORT_COLUMNS = [
+    ('item_id', WasteItem.item_id),
+    ('barangay', Barangay.name),
+    ('status', WasteTracking.status),
+    ('location', WasteTracking.location),
+    ('latitude', WasteTracking.latitude),
+    ('longitude', WasteTracking.longitude),
+    ('notes', WasteTracking.notes),
+    ('updated_by', User.username),
+    ('timestamp', WasteTracking.timestamp),
+]
+EXPORT_KINDS = ('waste_items', 'tracking')
+EXPORT_FORMATS = ('csv', 'ndjson')
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def export_query(kind, date_from=None, date_to=None, barangay_id=None, status=None):
+    """(headers, query) of an export: waste items by created_at or tracking records by timestamp.
+
+    ``date_from``/``date_to`` are inclusive days (YYYY-MM-DD); ``status`` is the
+    item status for waste_items and the recorded status for tracking. Raises
+    ValueError for a malformed date.
+    """
+    if kind == 'waste_items':
+        columns, time_column = WASTE_ITEM_EXPORT_COLUMNS, WasteItem.created_at
+        query = db.session.query(*[c for _, c in columns]).select_from(WasteItem).join(
+            Barangay, WasteItem.barangay_id == Barangay.id
+        ).outerjoin(User, WasteItem.created_by == User.id)
+        status_column, order = WasteItem.status, [WasteItem.created_at, WasteItem.id]
+    elif kind == 'tracking':
+        columns, time_column = TRACKING_EXPORT_COLUMNS, WasteTracking.timestamp
+        query = db.session.query(*[c for _, c in columns]).select_from(WasteTracking).join(
+            WasteItem, WasteTracking.waste_item_id == WasteItem.id
+        ).join(Barangay, WasteItem.barangay_id == Barangay.id).outerjoin(User, WasteTracking.updated_by == User.id)
+        status_column, order = WasteTracking.status, [WasteTracking.timestamp, WasteTracking.id]
+    else:
+        raise ValueError(f'Unknown export: {kind}')
+
+    if date_from:
+        query = query.filter(time_column >= datetime.strptime(date_from, '%Y-%m-%d'))
+    if date_to:
+        query = query.filter(time_column < datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1))
+    if barangay_id is not None:
+        query = query.filter(WasteItem.barangay_id == barangay_id)
+    if status:
+        query = query.filter(status_column == status)
+    return [name for name, _ in columns], query.order_by(*order)
+
+
+def export_chunks(headers, query, fmt):
+    """Encode the rows of ``query`` as CSV or NDJSON text, about EXPORT_CHUNK_SIZE at a time.
+
+    Rows come from a server-side cursor (yield_per), so only one batch of rows
+    and one chunk of text are held in memory.
+    """
+    buffer = StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(headers)
+    for row in query.yield_per(1000):
+        values = [v.isoformat() if isinstance(v, datetime) else v for v in row]
+        if writer:
+            writer.writerow(values)
+        else:
+            buffer.write(json.dumps(dict(zip(headers, values))) + '\n')
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gzip_chunks(chunks):
+    """Gzip a stream of text chunks on the fly."""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@app.route('/export/<kind>')
+@collector_required
+def export_data(kind):
+    """Download waste items (/export/waste_items) or tracking history (/export/tracking).
+
+    Query params: format (csv or ndjson), from and to (inclusive YYYY-MM-DD),
+    barangay_id, status and gzip=1 for a .gz download. The file is streamed as
+    it is read from the database.
+    """
+    if kind not in EXPORT_KINDS:
+        abort(404)
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify(success=False, error=f'Unknown format: {fmt}'), 400
+    try:
+        barangay_id = int(request.args['barangay_id']) if request.args.get('barangay_id') else None
+        headers, query = export_query(kind, request.args.get('from'), request.args.get('to'),
+                                      barangay_id=barangay_id, status=request.args.get('status'))
+    except ValueError:
+        return jsonify(success=False, error='Invalid from/to/barangay_id'), 400
+
+    filename = f"{kind}_{utcnow().strftime('%Y%m%d')}.{fmt}"
+    chunks = export_chunks(headers, query, fmt)
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    if request.args.get('gzip') in ('1', 'true'):
+        chunks, mimetype, filename = gzip_chunks(chunks), 'application/gzip', filename + '.gz'
+    return Response(stream_with_context(chunks), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+
+@app.cli.command('export')
+@click.argument('kind', type=click.Choice(EXPORT_KINDS))
+@click.option('--format', 'fmt', type=click.Choice(EXPORT_FORMATS), default='csv', show_default=True)
+@click.option('--from', 'date_from', help='First day to include (YYYY-MM-DD).')
+@click.option('--to', 'date_to', help='Last day to include (YYYY-MM-DD).')
+@click.option('--barangay-id', type=int)
+@click.option('--status')
+@click.option('--gzip', 'compress', is_flag=True, help='Gzip the output.')
+@click.option('--output', '-o', default='-', help='Output file (default stdout).')
+def export_command(kind, fmt, date_from, date_to, barangay_id, status, compress, output):
+    """Export waste items or tracking history as CSV or NDJSON."""
+    try:
+        headers, query = export_query(kind, date_from, date_to, barangay_id=barangay_id, status=status)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    chunks = export_chunks(headers, query, fmt)
+    chunks = gzip_chunks(chunks) if compress else (chunk.encode('utf-8') for chunk in chunks)
+    with click.open_file(output, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
 
 @app.route('/delete_user/<int:user_id>', methods=['POST'])
 @admin_required
@@ -1921,6 +4608,7 @@ def delete_user(user_id):
         for item in waste_items:
             # Delete associated tracking records
             WasteTracking.query.filter_by(waste_item_id=item.id).delete()
+            WasteItemPosition.query.filter_by(waste_item_id=item.id).delete()
             db.session.delete(item)
         
         # Delete the user
@@ -1949,6 +4637,7 @@ def delete_waste_item(item_id):
     try:
         # Delete associated tracking records
         WasteTracking.query.filter_by(waste_item_id=item.id).delete()
+        WasteItemPosition.query.filter_by(waste_item_id=item.id).delete()
         
         # Delete the waste item
         db.session.delete(item)
@@ -2037,6 +4726,102 @@ def edit_user(user_id):
     
     return render_template('edit_user.html', user=user, barangays=barangays)
 
+def canonical_queries():
+    """Representative queries of the hot views, used by the index audit.
+
+    Each entry is (name, query, tables_allowed_to_scan). Sample filter values are
+    arbitrary - only the plan shape matters.
+    """
+    day_start = datetime(2026, 1, 1)
+    day_end = datetime(2026, 1, 2)
+
+    def collection_team_panel_page(panel):
+        query, columns, _, descending = collection_team_panel_query(panel)
+        return query.order_by(*[c.desc() if descending else c for c in columns]).limit(26)
+
+    return [
+        # waste_item_stats() reads the waste_stats rollup, never waste_item
+        ('dashboard: aggregate counters', waste_item_stats_query(), ('barangay',)),
+        ('dashboard: barangay user aggregate counters', waste_item_stats_query(created_by=1), ()),
+        ('index: collected today', collected_today_query(), ()),
+        ('dashboard: recent items', WasteItem.query.order_by(WasteItem.created_at.desc()).limit(10), ()),
+        ('dashboard: barangay user recent items',
+         WasteItem.query.filter_by(created_by=1).order_by(WasteItem.created_at.desc()).limit(10), ()),
+        ('collection_team: counts', collection_team_counts_query(), ('waste_stats',)),
+        ('collection_team: pending', collection_team_panel_page('pending'), ()),
+        ('collection_team: awaiting confirmation', collection_team_panel_page('awaiting'), ()),
+        ('collection_team: status updates', collection_team_panel_page('status_updates'), ()),
+        ('registered_items: date filter',
+         WasteItem.query.filter(WasteItem.created_at >= day_start, WasteItem.created_at < day_end)
+         .order_by(WasteItem.created_at.desc(), WasteItem.id.desc()).limit(51), ()),
+        ('registered_items: barangay filter',
+         WasteItem.query.filter(WasteItem.barangay_id == 1)
+         .order_by(WasteItem.created_at.desc(), WasteItem.id.desc()).limit(51), ()),
+        ('registered_items: status filter',
+         WasteItem.query.filter(WasteItem.status == 'collected')
+         .order_by(WasteItem.created_at.desc(), WasteItem.id.desc()).limit(51), ()),
+        ('registered_items: next page',
+         WasteItem.query.filter(db.tuple_(WasteItem.created_at, WasteItem.id) < (day_end, 100))
+         .order_by(WasteItem.created_at.desc(), WasteItem.id.desc()).limit(51), ()),
+        ('view_item: tracking history',
+         WasteTracking.query.filter_by(waste_item_id=1).order_by(WasteTracking.timestamp.desc()), ()),
+        ('api_waste_locations: positions',
+         db.session.query(WasteItem.item_id, WasteItemPosition.latitude)
+         .join(WasteItemPosition, WasteItemPosition.waste_item_id == WasteItem.id)
+         .filter(WasteItem.status.in_(['collected', 'in_transit']), WasteItem.barangay_id == 1), ()),
+        ('api_waste_locations: change feed',
+         WasteItemChange.query.filter(WasteItemChange.id > 100, WasteItemChange.id <= 200), ()),
+        ('collector_track: time window',
+         CollectorLocationPoint.query.filter(CollectorLocationPoint.user_id == 1,
+                                             CollectorLocationPoint.recorded_at >= day_start,
+                                             CollectorLocationPoint.recorded_at <= day_end)
+         .order_by(CollectorLocationPoint.recorded_at, CollectorLocationPoint.id), ()),
+        ('export: waste items for a month',
+         export_query('waste_items', '2026-01-01', '2026-01-31')[1], ()),
+        ('export: tracking for a month',
+         export_query('tracking', '2026-01-01', '2026-01-31')[1], ()),
+        ('scan_qr: item lookup',
+         db.session.query(WasteItem.item_id, Barangay.name).outerjoin(Barangay, WasteItem.barangay_id == Barangay.id)
+         .filter(WasteItem.item_id.in_(['WM20260101-000001', 'WM20260101-000002'])), ()),
+        ('api_items: next page', api_items_query(list(API_ITEM_FIELDS), after_id=100).limit(1001), ('barangay',)),
+    ]
+
+
+def audit_query_plans():
+    """Run EXPLAIN QUERY PLAN over canonical_queries().
+
+    Returns a list of (name, plan_details, full_scans) where full_scans lists the
+    plan steps that scan a whole table without using an index.
+    """
+    results = []
+    with db.engine.connect() as conn:
+        for name, query, allowed in canonical_queries():
+            statement = getattr(query, 'statement', query)
+            sql = str(statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+            plan = [row[3] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+            full_scans = [
+                step for step in plan
+                if step.startswith('SCAN ') and ' USING ' not in step and step.split()[1] not in allowed
+            ]
+            results.append((name, plan, full_scans))
+    return results
+
+
+@app.cli.command('db-index-audit')
+def db_index_audit_command():
+    """Check that the app's hot queries are served by indexes."""
+    flagged = 0
+    for name, plan, full_scans in audit_query_plans():
+        print(f"{'FULL SCAN' if full_scans else 'OK':<10} {name}")
+        for step in plan:
+            print(f"           {step}")
+        flagged += bool(full_scans)
+    if flagged:
+        print(f"{flagged} queries perform full table scans")
+        raise SystemExit(1)
+    print("All audited queries use indexes")
+
+
 def backup_user_data():
     """Create a backup of user data for safety"""
     try:
@@ -2096,7 +4881,9 @@ def initialize_database():
         from sqlalchemy import inspect
         inspector = inspect(db.engine)
         existing_tables = inspector.get_table_names()
-        required_tables = ['user', 'barangay', 'waste_item', 'waste_tracking', 'collection_route']
+        required_tables = ['user', 'barangay', 'waste_item', 'waste_tracking', 'collection_route',
+                           'waste_item_position', 'collector_location_point', 'waste_item_change',
+                           'waste_stats', 'item_id_sequence', 'idempotency_key', 'sync_operation']
         
         # Check if database file exists (handle both relative and absolute paths)
         db_uri = app.config['SQLALCHEMY_DATABASE_URI']
@@ -2111,6 +4898,13 @@ def initialize_database():
             print("Creating missing database tables...")
             db.create_all()
             print("Database tables created successfully")
+            # Backfill the position projection for databases that predate it
+            if 'waste_tracking' in existing_tables and 'waste_item_position' not in existing_tables:
+                count = rebuild_item_positions()
+                print(f"Backfilled positions for {count} waste items")
+            if 'waste_item' in existing_tables and 'waste_stats' not in existing_tables:
+                count = rebuild_waste_stats()
+                print(f"Backfilled statistics for {count} waste items")
             return True
         else:
             print("Database tables already exist - preserving all data")
@@ -0,0 +1,28 @@
+"""Add item_id_sequence for allocating waste item ids
+
+Revision ID: a0b1c2d3e456
+Revises: f9a0b1c2d345
+Create Date: 2026-10-17 17:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a0b1c2d3e456'
+down_revision = 'f9a0b1c2d345'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'item_id_sequence',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('next_value', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('item_id_sequence')
@@ -0,0 +1,39 @@
+"""Add composite indexes for waste_item / waste_tracking hot queries
+
+Revision ID: a3b4c5d6e7f8
+Revises: f1a2b3c4d5e6
+Create Date: 2026-10-17 10:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3b4c5d6e7f8'
+down_revision = 'f1a2b3c4d5e6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('waste_item', schema=None) as batch_op:
+        batch_op.create_index('ix_waste_item_status_created_at', ['status', 'created_at'], unique=False)
+        batch_op.create_index('ix_waste_item_status_confirmed_updated_at', ['status', 'client_confirmed', 'updated_at'], unique=False)
+        batch_op.create_index('ix_waste_item_created_by_status', ['created_by', 'status'], unique=False)
+        batch_op.create_index('ix_waste_item_barangay_created_at', ['barangay_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_waste_item_created_at', ['created_at'], unique=False)
+
+    with op.batch_alter_table('waste_tracking', schema=None) as batch_op:
+        batch_op.create_index('ix_waste_tracking_item_timestamp', ['waste_item_id', 'timestamp'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('waste_tracking', schema=None) as batch_op:
+        batch_op.drop_index('ix_waste_tracking_item_timestamp')
+
+    with op.batch_alter_table('waste_item', schema=None) as batch_op:
+        batch_op.drop_index('ix_waste_item_created_at')
+        batch_op.drop_index('ix_waste_item_barangay_created_at')
+        batch_op.drop_index('ix_waste_item_created_by_status')
+        batch_op.drop_index('ix_waste_item_status_confirmed_updated_at')
+        batch_op.drop_index('ix_waste_item_status_created_at')
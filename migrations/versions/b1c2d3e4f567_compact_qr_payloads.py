@@ -0,0 +1,56 @@
+"""Regenerate waste item QR payloads in the compact format
+
+Revision ID: b1c2d3e4f567
+Revises: a0b1c2d3e456
+Create Date: 2026-10-17 18:00:00.000000
+"""
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b1c2d3e4f567'
+down_revision = 'a0b1c2d3e456'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+CHECK_ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+waste_item = sa.table(
+    'waste_item',
+    sa.column('id', sa.Integer),
+    sa.column('item_id', sa.String),
+    sa.column('qr_code_data', sa.Text),
+)
+
+
+def compact_payload(item_id):
+    # Same format as app.waste_item_qr_data (version 1)
+    return f'{item_id}:1{CHECK_ALPHABET[zlib.crc32(item_id.encode("utf-8")) % len(CHECK_ALPHABET)]}'
+
+
+def upgrade():
+    # Old labels keep scanning: scan_qr still accepts the JSON payloads
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(waste_item.c.id, waste_item.c.item_id)
+            .where(waste_item.c.id > last_id).order_by(waste_item.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        bind.execute(
+            waste_item.update().where(waste_item.c.id == sa.bindparam('b_id'))
+            .values(qr_code_data=sa.bindparam('b_qr_code_data')),
+            [{'b_id': row.id, 'b_qr_code_data': compact_payload(row.item_id)} for row in rows]
+        )
+
+
+def downgrade():
+    # The JSON payloads are not restored; scan_qr reads both formats
+    pass
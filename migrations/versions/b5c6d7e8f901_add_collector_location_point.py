@@ -0,0 +1,37 @@
+"""Add collector_location_point breadcrumb table
+
+Revision ID: b5c6d7e8f901
+Revises: a3b4c5d6e7f8
+Create Date: 2026-10-17 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5c6d7e8f901'
+down_revision = 'a3b4c5d6e7f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'collector_location_point',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('recorded_at', sa.DateTime(), nullable=False),
+        sa.Column('latitude', sa.Float(), nullable=False),
+        sa.Column('longitude', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('collector_location_point', schema=None) as batch_op:
+        batch_op.create_index('ix_collector_location_point_user_recorded_at', ['user_id', 'recorded_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('collector_location_point', schema=None) as batch_op:
+        batch_op.drop_index('ix_collector_location_point_user_recorded_at')
+
+    op.drop_table('collector_location_point')
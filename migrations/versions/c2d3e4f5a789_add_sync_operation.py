@@ -0,0 +1,38 @@
+"""Add sync_operation for idempotent offline uploads
+
+Revision ID: c2d3e4f5a789
+Revises: b1c2d3e4f567
+Create Date: 2026-10-17 20:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d3e4f5a789'
+down_revision = 'b1c2d3e4f567'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'sync_operation',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('op_id', sa.String(length=64), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('result', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+        sa.PrimaryKeyConstraint('user_id', 'op_id')
+    )
+    with op.batch_alter_table('sync_operation', schema=None) as batch_op:
+        batch_op.create_index('ix_sync_operation_created_at', ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('sync_operation', schema=None) as batch_op:
+        batch_op.drop_index('ix_sync_operation_created_at')
+
+    op.drop_table('sync_operation')
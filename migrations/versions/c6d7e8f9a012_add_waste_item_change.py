@@ -0,0 +1,32 @@
+"""Add waste_item_change feed for incremental map polling
+
+Revision ID: c6d7e8f9a012
+Revises: b5c6d7e8f901
+Create Date: 2026-10-17 13:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6d7e8f9a012'
+down_revision = 'b5c6d7e8f901'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'waste_item_change',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('waste_item_id', sa.Integer(), nullable=False),
+        sa.Column('item_id', sa.String(length=50), nullable=True),
+        sa.Column('barangay_id', sa.Integer(), nullable=True),
+        sa.Column('changed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sqlite_autoincrement=True
+    )
+
+
+def downgrade():
+    op.drop_table('waste_item_change')
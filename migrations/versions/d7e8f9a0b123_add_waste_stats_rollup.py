@@ -0,0 +1,43 @@
+"""Add waste_stats rollup and status/updated_at index
+
+Revision ID: d7e8f9a0b123
+Revises: c6d7e8f9a012
+Create Date: 2026-10-17 14:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7e8f9a0b123'
+down_revision = 'c6d7e8f9a012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'waste_stats',
+        sa.Column('barangay_id', sa.Integer(), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=False),
+        sa.Column('waste_type', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('barangay_id', 'created_by', 'waste_type', 'status')
+    )
+    op.execute("""
+        INSERT INTO waste_stats (barangay_id, created_by, waste_type, status, count)
+        SELECT barangay_id, COALESCE(created_by, 0), waste_type, status, COUNT(id)
+        FROM waste_item
+        GROUP BY barangay_id, COALESCE(created_by, 0), waste_type, status
+    """)
+
+    with op.batch_alter_table('waste_item', schema=None) as batch_op:
+        batch_op.create_index('ix_waste_item_status_updated_at', ['status', 'updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('waste_item', schema=None) as batch_op:
+        batch_op.drop_index('ix_waste_item_status_updated_at')
+
+    op.drop_table('waste_stats')
@@ -0,0 +1,25 @@
+"""Add waste_item updated_at index for the collection_team status updates panel
+
+Revision ID: e8f9a0b1c234
+Revises: d7e8f9a0b123
+Create Date: 2026-10-17 15:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8f9a0b1c234'
+down_revision = 'd7e8f9a0b123'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('waste_item', schema=None) as batch_op:
+        batch_op.create_index('ix_waste_item_updated_at', ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('waste_item', schema=None) as batch_op:
+        batch_op.drop_index('ix_waste_item_updated_at')
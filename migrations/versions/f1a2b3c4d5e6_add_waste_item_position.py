@@ -0,0 +1,52 @@
+"""Add waste_item_position projection table
+
+Revision ID: f1a2b3c4d5e6
+Revises: e7a8b9c0d123
+Create Date: 2026-10-17 09:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1a2b3c4d5e6'
+down_revision = 'e7a8b9c0d123'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'waste_item_position',
+        sa.Column('waste_item_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=True),
+        sa.Column('latitude', sa.Float(), nullable=True),
+        sa.Column('longitude', sa.Float(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=True),
+        sa.Column('collector_name', sa.String(length=100), nullable=True),
+        sa.ForeignKeyConstraint(['waste_item_id'], ['waste_item.id']),
+        sa.PrimaryKeyConstraint('waste_item_id')
+    )
+
+    # Backfill from the existing tracking history: status/timestamp from the latest
+    # record, coordinates and collector from the latest record that has coordinates.
+    op.execute("""
+        INSERT INTO waste_item_position (waste_item_id, status, timestamp, latitude, longitude, collector_name)
+        SELECT wi.id, last.status, last.timestamp, wc.latitude, wc.longitude, u.full_name
+        FROM waste_item wi
+        JOIN waste_tracking last ON last.id = (
+            SELECT t.id FROM waste_tracking t
+            WHERE t.waste_item_id = wi.id
+            ORDER BY t.timestamp DESC, t.id DESC LIMIT 1
+        )
+        LEFT JOIN waste_tracking wc ON wc.id = (
+            SELECT t.id FROM waste_tracking t
+            WHERE t.waste_item_id = wi.id AND t.latitude IS NOT NULL AND t.longitude IS NOT NULL
+            ORDER BY t.timestamp DESC, t.id DESC LIMIT 1
+        )
+        LEFT JOIN user u ON u.id = wc.updated_by
+    """)
+
+
+def downgrade():
+    op.drop_table('waste_item_position')
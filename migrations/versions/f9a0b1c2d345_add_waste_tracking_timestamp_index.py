@@ -0,0 +1,25 @@
+"""Add waste_tracking timestamp index for tracking history exports
+
+Revision ID: f9a0b1c2d345
+Revises: e8f9a0b1c234
+Create Date: 2026-10-17 16:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f9a0b1c2d345'
+down_revision = 'e8f9a0b1c234'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('waste_tracking', schema=None) as batch_op:
+        batch_op.create_index('ix_waste_tracking_timestamp', ['timestamp'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('waste_tracking', schema=None) as batch_op:
+        batch_op.drop_index('ix_waste_tracking_timestamp')
@@ -0,0 +1,70 @@
+// Ids generated on the device: op_ids for the offline outbox and Idempotency-Keys
+function newClientId() {
+    return (window.crypto && crypto.randomUUID)
+        ? crypto.randomUUID()
+        : Date.now().toString(36) + '-' + Math.random().toString(36).slice(2);
+}
+
+// Offline outbox: status updates, collections, sorting and location pings that
+// could not reach the server are kept in localStorage and uploaded in one
+// /api/sync request when the connection returns. Each operation carries a
+// client-generated op_id, so re-uploading a batch whose response was lost does
+// not apply it twice. Pages show the queue length in a #sync-outbox-status badge.
+const syncOutbox = (function() {
+    const KEY = 'wm-sync-outbox';
+    const BATCH = 200;
+    let flushing = false;
+
+    const load = () => {
+        try { return JSON.parse(localStorage.getItem(KEY)) || []; } catch (e) { return []; }
+    };
+    const save = (ops) => {
+        localStorage.setItem(KEY, JSON.stringify(ops));
+        showCount(ops.length);
+    };
+    const showCount = (n) => {
+        const badge = document.getElementById('sync-outbox-status');
+        if (!badge) return;
+        badge.style.display = n ? 'inline-block' : 'none';
+        badge.textContent = `${n} update(s) waiting to sync`;
+    };
+    function add(op) {
+        op.op_id = op.op_id || newClientId();
+        op.recorded_at = new Date().toISOString();
+        const ops = load();
+        ops.push(op);
+        save(ops);
+    }
+
+    async function flush() {
+        if (flushing || !navigator.onLine) return;
+        flushing = true;
+        try {
+            let ops = load();
+            while (ops.length) {
+                const batch = ops.slice(0, BATCH);
+                const resp = await fetch('/api/sync', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json', 'X-Requested-With': 'XMLHttpRequest' },
+                    body: JSON.stringify({ operations: batch })
+                });
+                if (!resp.ok) break;
+                const data = await resp.json();
+                data.results.filter(r => !r.success).forEach(r => console.warn('Queued update rejected:', r.op_id, r.error));
+                // Operations queued while this request was in flight stay in the outbox
+                const sent = new Set(batch.map(op => op.op_id));
+                ops = load().filter(op => !sent.has(op.op_id));
+                save(ops);
+            }
+        } catch (err) {
+            console.warn('Sync failed; will retry when back online.', err);
+        } finally {
+            flushing = false;
+        }
+    }
+
+    window.addEventListener('online', flush);
+    document.addEventListener('DOMContentLoaded', () => { showCount(load().length); flush(); });
+    setInterval(flush, 30000);
+    return { add: add, flush: flush };
+})();
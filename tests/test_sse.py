@@ -0,0 +1,151 @@
+import pytest
+from app import app, InProcessBroker, SQLiteBroker, Subscription, SubscriberEvicted
+
+
+def test_in_process_broker_fans_out_to_all_subscribers():
+    broker = InProcessBroker()
+    s1 = broker.subscribe(all_barangays=True)
+    s2 = broker.subscribe(all_barangays=True)
+    broker.publish({'item_id': 'WM1', 'barangay_id': 1})
+    assert s1.get(timeout=0)[1] == {'item_id': 'WM1', 'barangay_id': 1}
+    assert s2.get(timeout=0)[1] == {'item_id': 'WM1', 'barangay_id': 1}
+
+    broker.unsubscribe(s1)
+    assert broker.subscriber_count() == 1
+
+
+def test_sqlite_broker_relays_between_brokers(tmp_path):
+    """Two brokers on the same file behave like two gunicorn workers."""
+    path = str(tmp_path / 'events.db')
+    worker_a = SQLiteBroker(path)
+    worker_b = SQLiteBroker(path)
+
+    # Subscribe without starting the background poller so the test controls delivery
+    sub = InProcessBroker.subscribe(worker_b, all_barangays=True)
+    worker_a.publish({'item_id': 'WM2', 'status': 'collected', 'barangay_id': 1})
+
+    assert worker_b.poll_once() == 1
+    assert sub.get(timeout=0)[1] == {'item_id': 'WM2', 'status': 'collected', 'barangay_id': 1}
+    # Already-delivered events are not repeated
+    assert worker_b.poll_once() == 0
+
+
+def test_sqlite_broker_poller_starts_at_latest_event(tmp_path):
+    """A first subscriber arriving long after startup only gets events published from then on."""
+    path = str(tmp_path / 'events.db')
+    worker = SQLiteBroker(path, poll_interval=0.01, queue_maxsize=2, evict_after_drops=2)
+    for i in range(10):
+        worker.publish({'item_id': f'WM3{i}', 'barangay_id': 1})
+
+    sub = worker.subscribe(all_barangays=True)
+    latest = worker.publish({'item_id': 'WM40', 'barangay_id': 1})
+    assert sub.get(timeout=2) == (latest, {'item_id': 'WM40', 'barangay_id': 1})
+    assert not sub.evicted
+
+
+def test_broker_routes_by_barangay_and_event_type():
+    broker = InProcessBroker()
+    everything = broker.subscribe(all_barangays=True)
+    brgy_1 = broker.subscribe(barangay_id=1)
+    brgy_2 = broker.subscribe(barangay_id=2)
+    items_only = broker.subscribe(all_barangays=True, event_types=['waste_location'])
+
+    broker.publish({'item_id': 'WM3', 'barangay_id': 1})
+    broker.publish({'type': 'collector_location', 'user_id': 7, 'barangay_id': 2})
+
+    assert everything.pending_count() == 2
+    assert brgy_1.get(timeout=0)[1]['item_id'] == 'WM3'
+    assert brgy_1.pending_count() == 0
+    assert brgy_2.get(timeout=0)[1]['user_id'] == 7
+    assert brgy_2.pending_count() == 0
+    assert items_only.get(timeout=0)[1]['item_id'] == 'WM3'
+    assert items_only.pending_count() == 0
+
+    broker.unsubscribe(brgy_1)
+    broker.unsubscribe(brgy_2)
+    assert broker.subscriber_count() == 2
+
+
+def test_subscription_coalesces_superseded_events():
+    sub = Subscription(all_barangays=True)
+    sub.put(1, {'type': 'collector_location', 'user_id': 1, 'latitude': 13.1})
+    sub.put(2, {'item_id': 'WM4', 'status': 'collected'})
+    sub.put(3, {'type': 'collector_location', 'user_id': 1, 'latitude': 13.2})
+
+    assert sub.pending_count() == 2
+    # The superseded ping is replaced and moves behind the item event
+    assert sub.get(timeout=0)[1]['item_id'] == 'WM4'
+    assert sub.get(timeout=0)[1]['latitude'] == 13.2
+    assert sub.stats()['coalesced'] == 1
+
+
+def test_subscription_is_bounded_and_evicts_slow_consumers():
+    sub = Subscription(all_barangays=True, maxsize=3, evict_after_drops=5)
+    for i in range(5):
+        sub.put(i, {'item_id': f'WM{i}'})
+    # Oldest events were dropped to stay within the bound
+    assert sub.pending_count() == 3
+    assert sub.get(timeout=0)[1]['item_id'] == 'WM2'
+    assert sub.stats()['dropped'] == 2
+
+    for i in range(10):
+        sub.put(10 + i, {'item_id': f'WMX{i}'})
+    assert sub.evicted
+    with pytest.raises(SubscriberEvicted):
+        sub.get(timeout=0)
+
+
+def test_in_process_broker_replays_missed_events():
+    broker = InProcessBroker(replay_size=3)
+    sub = broker.subscribe(barangay_id=1)
+    first = broker.publish({'item_id': 'WM10', 'barangay_id': 1})
+    broker.publish({'item_id': 'WM11', 'barangay_id': 2})
+    third = broker.publish({'item_id': 'WM12', 'barangay_id': 1})
+    assert third > first
+
+    # Only events after the given id that the subscription follows are replayed
+    assert [p['item_id'] for _, p in broker.replay(first, sub)] == ['WM12']
+    assert broker.replay(third, sub) == []
+
+    # Once the missed events have left the ring buffer the client must resync
+    broker.publish({'item_id': 'WM13', 'barangay_id': 1})
+    broker.publish({'item_id': 'WM14', 'barangay_id': 1})
+    assert broker.replay(first, sub) is None
+    assert broker.replay(third + 100, sub) is None
+
+
+def test_sqlite_broker_replays_from_persisted_events(tmp_path):
+    path = str(tmp_path / 'events.db')
+    publisher = SQLiteBroker(path)
+    first = publisher.publish({'item_id': 'WM20', 'barangay_id': 1})
+    publisher.publish({'item_id': 'WM21', 'barangay_id': 1})
+
+    # A broker started later (e.g. a restarted worker) can still replay them
+    other = SQLiteBroker(path)
+    sub = InProcessBroker.subscribe(other, all_barangays=True)
+    assert [p['item_id'] for _, p in other.replay(first, sub)] == ['WM21']
+
+
+def test_stream_replays_events_after_last_event_id():
+    import uuid
+    from app import db, User, sse_broker
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        unique = uuid.uuid4().hex[:8]
+        admin = User(username=f'sse_admin_{unique}', email=f'sse_{unique}@example.com', role='admin', full_name='SSE Admin')
+        admin.set_password('pwdsse')
+        db.session.add(admin)
+        db.session.commit()
+
+    with app.test_client() as client:
+        client.post('/login', data={'username': f'sse_admin_{unique}', 'password': 'pwdsse'})
+        seen = sse_broker.publish({'item_id': 'WM30', 'barangay_id': 1})
+        missed = sse_broker.publish({'item_id': 'WM31', 'barangay_id': 1})
+
+        resp = client.get('/stream/waste_locations', headers={'Last-Event-ID': str(seen)}, buffered=False)
+        chunk = next(resp.response)
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        resp.close()
+        assert chunk.startswith(f'id: {missed}\n')
+        assert '"WM31"' in chunk
@@ -6,6 +6,7 @@ from werkzeug.security import generate_password_hash
 def client():
     app.config['TESTING'] = True
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['RAISE_ON_LAZY_LOAD'] = True
     import uuid
     with app.app_context():
         db.create_all()
@@ -443,7 +444,12 @@ def test_collector_location_endpoint_stores_coords(client):
         data = resp.get_json()
         assert data.get('success') is True
 
+        # pings are buffered; flush them as the background flusher would
+        from app import collector_locations
+        collector_locations.flush()
+
         # reload user from DB
+        db.session.expire_all()
         c = User.query.get(collector.id)
         assert round(c.last_latitude, 3) == 13.999
         assert round(c.last_longitude, 3) == 123.999
@@ -533,6 +539,28 @@ def test_barangay_tracking_uses_recency_icons(client):
         assert 'marker-icon-' in html
 
 
+def test_collection_team_queues_offline_work(client):
+    """The collection team dashboard loads the shared offline outbox for collections and pings."""
+    with app.app_context():
+        import uuid
+        unique = uuid.uuid4().hex[:8]
+        collector = User(username=f'outbox_collector_{unique}', email=f'outbox_{unique}@example.com', role='collector', full_name='Outbox Collector')
+        collector.set_password('pwdoutbox')
+        db.session.add(collector)
+        db.session.commit()
+
+        client.post('/login', data={'username': collector.username, 'password': 'pwdoutbox'})
+        html = client.get('/collection_team').get_data(as_text=True)
+        assert 'js/sync_outbox.js' in html
+        assert "type: 'collect'" in html
+        assert "type: 'location'" in html
+
+        script = client.get('/static/js/sync_outbox.js')
+        assert script.status_code == 200
+        assert '/api/sync' in script.get_data(as_text=True)
+        script.close()
+
+
 def test_barangay_tracking_sse_filters_collectors(client):
     """Ensure the barangay tracking SSE handler filters collector_location events by barangay."""
     with app.app_context():
@@ -557,3 +585,1070 @@ def test_barangay_tracking_sse_filters_collectors(client):
         # The SSE handler should include a check that ignores events for other barangays
         assert 'if (myBarangay !== null && obj.barangay_id !== myBarangay) return;' in html
         assert 'collector_location' in html
+
+
+def test_api_collectors_keeps_returning_idle_collectors(client):
+    """A collector who stopped pinging stays in the list so the map can age their marker."""
+    import uuid
+    from datetime import timedelta
+    from app import utcnow
+    with app.app_context():
+        unique = uuid.uuid4().hex[:8]
+        barangay = Barangay(name=f'BRGY_IDLE_{unique}', code=f'BID_{unique}', municipality='Nabua', province='Camarines Sur')
+        db.session.add(barangay)
+        db.session.commit()
+        idle = User(username=f'idle_collector_{unique}', email=f'idle_{unique}@example.com', role='collector', full_name='Idle Collector',
+                    barangay_id=barangay.id, last_latitude=13.40, last_longitude=123.30, last_seen=utcnow() - timedelta(hours=2))
+        idle.set_password('pwdidle')
+        brgy_user = User(username=f'brgy_idle_{unique}', email=f'brgy_idle_{unique}@example.com', role='barangay', full_name='BRGY Idle', barangay_id=barangay.id)
+        brgy_user.set_password('pwdbrgy')
+        db.session.add_all([idle, brgy_user])
+        db.session.commit()
+
+        client.post('/login', data={'username': brgy_user.username, 'password': 'pwdbrgy'})
+        first = client.get('/api_collectors')
+        assert [c['full_name'] for c in first.get_json()['collectors']] == ['Idle Collector']
+        # Older clients still send a since cursor; it no longer filters idle collectors out
+        later = client.get('/api_collectors', query_string={'since': utcnow().isoformat()})
+        assert [c['full_name'] for c in later.get_json()['collectors']] == ['Idle Collector']
+
+        # Nothing moved: the ETag matches and the client reuses its copy of the list
+        assert client.get('/api_collectors', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+
+def test_api_waste_locations_reads_position_projection(client):
+    """Status updates maintain waste_item_position, which the locations API serves from."""
+    import uuid
+    from app import WasteItemPosition
+    with app.app_context():
+        barangay = Barangay.query.filter_by(municipality='Nabua', province='Camarines Sur').first()
+        unique = uuid.uuid4().hex[:8]
+        collector = User(username=f'pos_collector_{unique}', email=f'pos_{unique}@example.com', role='collector', full_name='Position Collector')
+        collector.set_password('pwdpos')
+        item = WasteItem(item_id=f'WM{unique}', item_name='Position Item', waste_type='recyclable', is_sorted=True, barangay_id=barangay.id, address='Pos Addr')
+        db.session.add_all([collector, item])
+        db.session.commit()
+
+        rv = client.post('/login', data={'username': collector.username, 'password': 'pwdpos'}, follow_redirects=True)
+        assert rv.status_code == 200
+
+        client.post(f'/update_status/{item.item_id}', data={'status': 'collected', 'device_latitude': '13.31', 'device_longitude': '123.21'},
+                    headers={'X-Requested-With': 'XMLHttpRequest'})
+        # A later update without coordinates keeps the last known position
+        client.post(f'/update_status/{item.item_id}', data={'status': 'in_transit'},
+                    headers={'X-Requested-With': 'XMLHttpRequest'})
+
+        position = db.session.get(WasteItemPosition, item.id)
+        assert position is not None
+        assert position.status == 'in_transit'
+        assert round(position.latitude, 4) == 13.31
+        assert position.collector_name == 'Position Collector'
+
+        data = client.get('/api/waste/locations').get_json()
+        match = [it for it in data['items'] if it['item_id'] == item.item_id]
+        assert len(match) == 1
+        assert match[0]['status'] == 'in_transit'
+        assert round(match[0]['longitude'], 4) == 123.21
+        assert match[0]['collector_name'] == 'Position Collector'
+
+
+def test_every_tracking_writer_maintains_position_projection(client):
+    """Registering, sorting and confirming keep waste_item_position equal to a rebuild from the history."""
+    import uuid
+    from app import WasteItemPosition, rebuild_item_positions
+    with app.app_context():
+        barangay = Barangay.query.filter_by(municipality='Nabua', province='Camarines Sur').first()
+        unique = uuid.uuid4().hex[:8]
+        official = User(username=f'proj_brgy_{unique}', email=f'proj_b_{unique}@example.com', role='barangay',
+                        full_name='Projection Official', barangay_id=barangay.id)
+        collector = User(username=f'proj_collector_{unique}', email=f'proj_c_{unique}@example.com', role='collector', full_name='Projection Collector')
+        for user in (official, collector):
+            user.set_password('pwdproj')
+        db.session.add_all([official, collector])
+        db.session.commit()
+
+        def position_of(item):
+            db.session.expire_all()
+            position = db.session.get(WasteItemPosition, item.id)
+            return position and (position.status, position.timestamp)
+
+        client.post('/login', data={'username': official.username, 'password': 'pwdproj'})
+        client.post('/add_waste', data={'waste_type': 'organic', 'is_sorted': 'false'})
+        item = WasteItem.query.filter_by(created_by=official.id).one()
+        assert position_of(item)[0] == 'not_collected'
+        client.get('/logout')
+
+        client.post('/login', data={'username': collector.username, 'password': 'pwdproj'})
+        client.post(f'/mark_sorted/{item.item_id}')
+        assert position_of(item)[0] == 'pending_collection'
+        client.post(f'/mark_unsorted/{item.item_id}')
+        assert position_of(item)[0] == 'not_collected'
+
+        projected = position_of(item)
+        rebuild_item_positions()
+        assert position_of(item) == projected
+
+
+def test_db_index_audit_reports_no_full_scans(client):
+    """The hot view queries should all be served by indexes."""
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['db-index-audit'])
+    assert result.exit_code == 0, result.output
+    assert 'FULL SCAN' not in result.output
+
+
+def test_notifications_use_cached_coverage(client):
+    """Publishing SSE events should not query the database once the barangay cache is warm."""
+    import uuid
+    from sqlalchemy import event
+    from app import barangay_cache, notify_collector_location, sse_broker, is_barangay_in_coverage
+    with app.app_context():
+        unique = uuid.uuid4().hex[:8]
+        barangay = Barangay(name=f'Cache {unique}', code=f'CA_{unique}', municipality='Nabua', province='Camarines Sur')
+        admin = User(username=f'cache_admin_{unique}', email=f'cache_{unique}@example.com', role='admin', full_name='Cache Admin')
+        admin.set_password('pwdcache')
+        db.session.add_all([barangay, admin])
+        db.session.commit()
+        barangay_cache.invalidate()
+
+        barangay_id, admin_id = barangay.id, admin.id
+        sub = sse_broker.subscribe(barangay_id=barangay_id)
+        assert is_barangay_in_coverage(barangay_id=barangay_id)
+
+        statements = []
+        def count(*args):
+            statements.append(args)
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            notify_collector_location({'user_id': admin_id, 'barangay_id': barangay_id, 'latitude': 13.3, 'longitude': 123.3})
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+        assert statements == []
+        assert sub.get(timeout=0)[1]['type'] == 'collector_location'
+        sse_broker.unsubscribe(sub)
+
+        # Editing the barangay invalidates the cache
+        rv = client.post('/login', data={'username': admin.username, 'password': 'pwdcache'}, follow_redirects=True)
+        assert rv.status_code == 200
+        client.post(f'/edit_barangay/{barangay.id}', data={'name': barangay.name, 'code': barangay.code,
+                                                           'municipality': 'Elsewhere', 'province': 'Camarines Sur'})
+        assert not is_barangay_in_coverage(barangay_id=barangay.id)
+
+
+def test_collector_pings_are_coalesced_into_one_write(client):
+    """Repeated pings are served from memory and only the newest is written on flush."""
+    import uuid
+    from app import collector_locations
+    from sqlalchemy import event
+    with app.app_context():
+        unique = uuid.uuid4().hex[:8]
+        collector = User(username=f'test_collector_buf_{unique}', email=f'buf_{unique}@example.com', role='collector', full_name='Collector Buf')
+        collector.set_password('pwd123')
+        db.session.add(collector)
+        db.session.commit()
+        collector_id = collector.id
+
+        client.post('/login', data={'username': collector.username, 'password': 'pwd123'})
+        collector_locations.flush()
+
+        updates = []
+        def count_updates(conn, cursor, statement, params, context, executemany):
+            if statement.lstrip().upper().startswith('UPDATE'):
+                updates.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', count_updates)
+        try:
+            for lat in ('13.401', '13.402', '13.403'):
+                resp = client.post('/collector_location', json={'device_latitude': lat, 'device_longitude': '123.401'})
+                assert resp.status_code == 200
+            assert updates == []
+            assert collector_locations.latest(collector_id)[0] == 13.403
+
+            assert collector_locations.flush() >= 1
+            assert len(updates) == 1
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_updates)
+
+        db.session.expire_all()
+        assert round(User.query.get(collector_id).last_latitude, 3) == 13.403
+
+
+def test_collector_track_downsamples_and_simplifies(client):
+    """Pings are thinned on write and the track endpoint returns simplified segments."""
+    import uuid
+    from datetime import timedelta
+    from app import collector_locations, CollectorLocationPoint, simplify_polyline, utcnow
+    with app.app_context():
+        unique = uuid.uuid4().hex[:8]
+        collector = User(username=f'test_collector_trk_{unique}', email=f'trk_{unique}@example.com', role='collector', full_name='Collector Trk')
+        collector.set_password('pwd123')
+        db.session.add(collector)
+        db.session.commit()
+        collector_id = collector.id
+
+        # a straight line north in ~111 m steps, with a jittery ping that should be dropped
+        start = utcnow() - timedelta(minutes=30)
+        collector_locations.record(collector_id, 13.4000, 123.3000, start)
+        collector_locations.record(collector_id, 13.40001, 123.3000, start + timedelta(seconds=5))
+        for i in range(1, 5):
+            collector_locations.record(collector_id, 13.4000 + i * 0.001, 123.3000, start + timedelta(seconds=10 * i))
+        # after a long silence the collector reappears: a second segment
+        collector_locations.record(collector_id, 13.4100, 123.3100, start + timedelta(minutes=20))
+        collector_locations.flush()
+
+        assert CollectorLocationPoint.query.filter_by(user_id=collector_id).count() == 6
+
+        client.post('/login', data={'username': collector.username, 'password': 'pwd123'})
+        resp = client.get(f'/api/collectors/{collector_id}/track',
+                          query_string={'from': (start - timedelta(minutes=1)).isoformat()})
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data['success'] is True
+        assert len(data['segments']) == 2
+        first = data['segments'][0]
+        # collinear points collapse onto the endpoints
+        assert [p[0] for p in first['points']] == [13.4, 13.404]
+        assert 440 < first['distance_m'] < 450
+
+        assert client.get(f'/api/collectors/{collector_id}/track?from=yesterday').status_code == 400
+
+    assert simplify_polyline([(0, 0), (0.001, 0.0005), (0, 0.001)], 10) == [(0, 0), (0.001, 0.0005), (0, 0.001)]
+
+
+def test_collector_late_ping_track_point_is_flushed(client):
+    """A ping older than the newest position still adds its track point on flush."""
+    import uuid
+    from datetime import timedelta
+    from app import collector_locations, CollectorLocationPoint, utcnow
+    with app.app_context():
+        unique = uuid.uuid4().hex[:8]
+        collector = User(username=f'test_collector_late_{unique}', email=f'late_{unique}@example.com', role='collector', full_name='Collector Late')
+        collector.set_password('pwd123')
+        db.session.add(collector)
+        db.session.commit()
+        collector_id = collector.id
+
+        now = utcnow()
+        collector_locations.record(collector_id, 13.4200, 123.3200, now)
+        collector_locations.flush()
+        # uploaded late by /api/sync: it does not move the collector, but belongs on the track
+        collector_locations.record(collector_id, 13.4100, 123.3100, now - timedelta(minutes=10))
+        collector_locations.flush()
+
+        assert CollectorLocationPoint.query.filter_by(user_id=collector_id).count() == 2
+        db.session.expire_all()
+        assert round(db.session.get(User, collector_id).last_latitude, 3) == 13.42
+
+
+def test_api_waste_locations_since_cursor(client):
+    """Polling with ?since= returns only changed/removed items and 304s when idle."""
+    import uuid
+    with app.app_context():
+        barangay = Barangay.query.filter_by(municipality='Nabua', province='Camarines Sur').first()
+        unique = uuid.uuid4().hex[:8]
+        collector = User(username=f'delta_collector_{unique}', email=f'delta_{unique}@example.com', role='collector', full_name='Delta Collector')
+        collector.set_password('pwddelta')
+        item = WasteItem(item_id=f'WM{unique}', item_name='Delta Item', waste_type='recyclable', is_sorted=True, barangay_id=barangay.id, address='Delta Addr')
+        db.session.add_all([collector, item])
+        db.session.commit()
+
+        client.post('/login', data={'username': collector.username, 'password': 'pwddelta'})
+        client.post(f'/update_status/{item.item_id}', data={'status': 'collected', 'device_latitude': '13.32', 'device_longitude': '123.22'},
+                    headers={'X-Requested-With': 'XMLHttpRequest'})
+
+        full = client.get('/api/waste/locations')
+        data = full.get_json()
+        assert data['full'] is True
+        assert item.item_id in [it['item_id'] for it in data['items']]
+        cursor = data['cursor']
+
+        # Nothing changed: an empty delta, and a 304 for a matching ETag
+        idle = client.get(f'/api/waste/locations?since={cursor}')
+        assert idle.get_json() == {'items': [], 'removed': [], 'cursor': cursor, 'full': False}
+        assert client.get(f'/api/waste/locations?since={cursor}',
+                          headers={'If-None-Match': idle.headers['ETag']}).status_code == 304
+
+        client.post(f'/update_status/{item.item_id}', data={'status': 'in_transit'},
+                    headers={'X-Requested-With': 'XMLHttpRequest'})
+        delta = client.get(f'/api/waste/locations?since={cursor}').get_json()
+        assert [it['item_id'] for it in delta['items']] == [item.item_id]
+        assert delta['items'][0]['status'] == 'in_transit'
+        assert delta['cursor'] > cursor
+        cursor = delta['cursor']
+
+        # Leaving the mapped statuses takes the item off the map
+        client.post(f'/update_status/{item.item_id}', data={'status': 'processed'},
+                    headers={'X-Requested-With': 'XMLHttpRequest'})
+        delta = client.get(f'/api/waste/locations?since={cursor}').get_json()
+        assert delta['items'] == []
+        assert delta['removed'] == [item.item_id]
+
+        # A cursor the server cannot serve falls back to a full list
+        assert client.get(f"/api/waste/locations?since={delta['cursor'] + 1000}").get_json()['full'] is True
+
+
+def test_waste_item_stats_single_query(client):
+    """All dashboard counters come from one grouped query and match per-status counts."""
+    import uuid
+    from app import waste_item_stats, WASTE_STATUSES
+    from sqlalchemy import event
+    with app.app_context():
+        unique = uuid.uuid4().hex[:8]
+        barangay = Barangay(name=f'Stats Barangay {unique}', code=f'ST_{unique}', municipality='Nabua', province='Camarines Sur')
+        owner = User(username=f'stats_owner_{unique}', email=f'stats_{unique}@example.com', role='barangay', full_name='Stats Owner')
+        owner.set_password('pwdstats')
+        db.session.add_all([barangay, owner])
+        db.session.commit()
+        for i, (waste_type, status) in enumerate([('organic', 'pending_collection'), ('organic', 'collected'),
+                                                  ('hazardous', 'collected'), ('recyclable', 'processed')]):
+            db.session.add(WasteItem(item_id=f'WMS{unique}{i}', item_name='Stats Item', waste_type=waste_type, status=status,
+                                     barangay_id=barangay.id, created_by=owner.id))
+        db.session.commit()
+        owner_id, barangay_name = owner.id, barangay.name
+
+        statements = []
+        def count_selects(conn, cursor, statement, params, context, executemany):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', count_selects)
+        try:
+            mine = waste_item_stats(created_by=owner_id)
+            everything = waste_item_stats()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_selects)
+        assert len(statements) == 2
+
+        assert mine.total == 4
+        assert mine.by_status['collected'] == 2
+        assert mine.by_status['in_transit'] == 0
+        assert [(t.waste_type, t.count) for t in mine.by_waste_type] == [('hazardous', 1), ('organic', 2), ('recyclable', 1)]
+        assert [(b.name, b.total_items, b.pending_items, b.collected, b.processed) for b in mine.by_barangay] == \
+            [(barangay_name, 4, 1, 2, 1)]
+
+        assert everything.total == WasteItem.query.count()
+        for status in WASTE_STATUSES:
+            assert everything.by_status[status] == WasteItem.query.filter_by(status=status).count()
+        assert len(everything.by_barangay) == Barangay.query.count()
+
+
+def test_waste_stats_rollup_follows_status_transitions(client):
+    """waste_stats is updated with each transition and agrees with a full rebuild."""
+    import uuid
+    from app import WasteStatsRollup, rebuild_waste_stats, waste_item_stats
+    with app.app_context():
+        barangay = Barangay.query.filter_by(municipality='Nabua', province='Camarines Sur').first()
+        unique = uuid.uuid4().hex[:8]
+        collector = User(username=f'rollup_collector_{unique}', email=f'rollup_{unique}@example.com', role='collector', full_name='Rollup Collector')
+        collector.set_password('pwdrollup')
+        item = WasteItem(item_id=f'WMR{unique}', item_name='Rollup Item', waste_type='organic', is_sorted=True, barangay_id=barangay.id)
+        db.session.add_all([collector, item])
+        db.session.commit()
+        item_id, barangay_id = item.item_id, barangay.id
+
+        def rollup(status):
+            row = db.session.get(WasteStatsRollup, (barangay_id, 0, 'organic', status))
+            return row.count if row else 0
+
+        pending_before, collected_before = rollup('pending_collection'), rollup('collected')
+        client.post('/login', data={'username': collector.username, 'password': 'pwdrollup'})
+        client.post(f'/update_status/{item_id}', data={'status': 'collected'}, headers={'X-Requested-With': 'XMLHttpRequest'})
+        assert rollup('pending_collection') == pending_before - 1
+        assert rollup('collected') == collected_before + 1
+
+        snapshot = {(r.barangay_id, r.created_by, r.waste_type, r.status): r.count
+                    for r in WasteStatsRollup.query.all() if r.count}
+        total = waste_item_stats().total
+        assert rebuild_waste_stats() == WasteItem.query.count() == total
+        assert snapshot == {(r.barangay_id, r.created_by, r.waste_type, r.status): r.count
+                            for r in WasteStatsRollup.query.all()}
+
+
+def test_registered_items_keyset_pagination(client):
+    """Pages follow (created_at, id) without gaps or repeats, also within a shared timestamp."""
+    import uuid
+    from datetime import datetime
+    with app.app_context():
+        unique = uuid.uuid4().hex[:8]
+        barangay = Barangay(name=f'Page Barangay {unique}', code=f'PG_{unique}', municipality='Nabua', province='Camarines Sur')
+        admin = User(username=f'page_admin_{unique}', email=f'page_{unique}@example.com', role='admin', full_name='Page Admin')
+        admin.set_password('pwdpage')
+        db.session.add_all([barangay, admin])
+        db.session.commit()
+        same_time = datetime(2025, 3, 4, 8, 0, 0)
+        for i in range(5):
+            db.session.add(WasteItem(item_id=f'WMP{unique}{i}', item_name=f'Page Item {i}', waste_type='organic',
+                                     barangay_id=barangay.id, created_at=same_time))
+        db.session.commit()
+        barangay_id = barangay.id
+
+        client.post('/login', data={'username': admin.username, 'password': 'pwdpage'})
+        seen, cursor = [], None
+        while True:
+            params = {'barangay': barangay_id, 'limit': 2}
+            if cursor:
+                params['cursor'] = cursor
+            data = client.get('/api/registered_items', query_string=params).get_json()
+            assert data['success'] is True
+            seen.extend(it['item_id'] for it in data['items'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        assert seen == [f'WMP{unique}{i}' for i in reversed(range(5))]
+
+        # The date filter is a created_at range over the UTC day
+        data = client.get('/api/registered_items', query_string={'barangay': barangay_id, 'date': '2025-03-04'}).get_json()
+        assert len(data['items']) == 5
+        assert 'Page Item 4' in data['html']
+        assert client.get('/api/registered_items', query_string={'barangay': barangay_id, 'date': '2025-03-05'}).get_json()['items'] == []
+        assert client.get('/api/registered_items', query_string={'cursor': 'not-a-cursor'}).status_code == 400
+        for limit in (-5, -1, 0):
+            data = client.get('/api/registered_items', query_string={'barangay': barangay_id, 'limit': limit}).get_json()
+            assert data['success'] and 1 <= len(data['items']) <= 5
+
+        html = client.get('/registered_items', query_string={'barangay': barangay_id}).get_data(as_text=True)
+        assert 'Page Item 0' in html
+        html = client.get('/registered_items', query_string={'barangay': barangay_id, 'cursor': 'not-a-cursor'}).get_data(as_text=True)
+        assert 'Invalid page link' in html and 'Invalid date format' not in html and 'Page Item 4' in html
+
+
+def test_collection_team_panels_load_by_page(client):
+    """collection_team renders only counts; panel rows come page by page from the JSON endpoint."""
+    import uuid
+    from app import collection_team_counts
+    with app.app_context():
+        unique = uuid.uuid4().hex[:8]
+        barangay = Barangay(name=f'AAA Panel Barangay {unique}', code=f'PN_{unique}', municipality='Nabua', province='Camarines Sur')
+        collector = User(username=f'panel_collector_{unique}', email=f'panel_{unique}@example.com', role='collector', full_name='Panel Collector')
+        collector.set_password('pwdpanel')
+        db.session.add_all([barangay, collector])
+        db.session.commit()
+        for i in range(3):
+            db.session.add(WasteItem(item_id=f'WMT{unique}{i}', item_name=f'Panel Item {i}', waste_type='hazardous',
+                                     is_sorted=True, barangay_id=barangay.id))
+        db.session.add(WasteItem(item_id=f'WMT{unique}c', item_name='Panel Collected', waste_type='organic',
+                                 status='collected', barangay_id=barangay.id))
+        db.session.commit()
+        counts = collection_team_counts()
+        assert counts.pending == WasteItem.query.filter_by(status='pending_collection').count()
+        assert counts.awaiting == WasteItem.query.filter_by(status='collected', client_confirmed=False).count()
+        assert counts.confirmed + counts.awaiting == counts.collected
+
+        client.post('/login', data={'username': collector.username, 'password': 'pwdpanel'})
+        html = client.get('/collection_team').get_data(as_text=True)
+        assert 'data-panel-loader="pending"' in html
+        assert 'Panel Item 0' not in html
+
+        seen, cursor = [], None
+        while True:
+            data = client.get('/api/collection_team/pending', query_string={'limit': 2, **({'cursor': cursor} if cursor else {})}).get_json()
+            seen.extend(it['item_id'] for it in data['items'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        mine = [item_id for item_id in seen if unique in item_id]
+        assert mine == [f'WMT{unique}{i}' for i in range(3)]
+        assert len(seen) == len(set(seen)) == counts.pending
+
+        data = client.get('/api/collection_team/status_updates').get_json()
+        assert data['items'][0]['item_id'] == f'WMT{unique}c'
+        assert 'Panel Collected' in data['html']
+        assert client.get('/api/collection_team/bogus').status_code == 404
+        for limit in (-5, -1, 0):
+            assert client.get('/api/collection_team/pending', query_string={'limit': limit}).get_json()['items']
+        assert len(client.get('/api/collection_team/pending', query_string={'limit': -1}).get_json()['items']) == 1
+
+
+def test_list_views_do_not_lazy_load_in_templates(client):
+    """With RAISE_ON_LAZY_LOAD on, list views render from eagerly loaded relationships only."""
+    import uuid
+    from app import LazyLoadInTemplate
+    with app.app_context():
+        unique = uuid.uuid4().hex[:8]
+        barangay = Barangay(name=f'Eager Barangay {unique}', code=f'EG_{unique}', municipality='Nabua', province='Camarines Sur')
+        admin = User(username=f'eager_admin_{unique}', email=f'eager_{unique}@example.com', role='admin', full_name='Eager Admin')
+        admin.set_password('pwdeager')
+        db.session.add_all([barangay, admin])
+        db.session.commit()
+        item = WasteItem(item_id=f'WME{unique}', item_name='Eager Item', waste_type='recyclable', is_sorted=True,
+                         sorted_by=admin.id, barangay_id=barangay.id, created_by=admin.id)
+        db.session.add(item)
+        db.session.commit()
+        db.session.add(WasteTracking(waste_item_id=item.id, status='pending_collection', updated_by=admin.id))
+        db.session.commit()
+        client.post('/login', data={'username': admin.username, 'password': 'pwdeager'})
+
+        # Start from an empty identity map so every relationship a template touches
+        # would have to be loaded by a query of its own.
+        for url in ['/', '/dashboard', '/registered_items', f'/item/WME{unique}', '/api/collection_team/pending']:
+            db.session.expunge_all()
+            rv = client.get(url)
+            assert rv.status_code == 200, url
+        assert 'Eager Admin' in client.get(f'/item/WME{unique}').get_data(as_text=True)
+
+        # A template that lazy-loads a relationship fails the request
+        db.session.expunge_all()
+        lazy_item = WasteItem.query.filter_by(item_id=f'WME{unique}').one()
+        with app.test_request_context():
+            with pytest.raises(LazyLoadInTemplate):
+                from flask import render_template_string
+                render_template_string('{{ item.barangay.name }}', item=lazy_item)
+
+
+def test_api_items_streams_projected_pages(client):
+    """/api/items projects the requested fields and pages by cursor."""
+    import uuid
+    with app.app_context():
+        unique = uuid.uuid4().hex[:8]
+        barangay = Barangay(name=f'Stream Barangay {unique}', code=f'ST_{unique}', municipality='Nabua', province='Camarines Sur')
+        elsewhere = Barangay(name=f'Elsewhere {unique}', code=f'EW_{unique}', municipality='Iriga', province='Camarines Sur')
+        db.session.add_all([barangay, elsewhere])
+        db.session.commit()
+        for i in range(5):
+            db.session.add(WasteItem(item_id=f'WMS{unique}{i}', item_name=f'Stream Item {i}', waste_type='organic',
+                                     status='collected' if i % 2 else 'pending_collection', barangay_id=barangay.id))
+        db.session.add(WasteItem(item_id=f'WMS{unique}x', item_name='Out of coverage', waste_type='organic', barangay_id=elsewhere.id))
+        db.session.commit()
+        barangay_id = barangay.id
+
+        rv = client.get('/api/items', query_string={'barangay_id': barangay_id})
+        assert rv.is_streamed
+        items = rv.get_json()
+        assert [it['item_id'] for it in items] == [f'WMS{unique}{i}' for i in range(5)]
+        assert items[0]['barangay'] == f'Stream Barangay {unique}' and items[0]['created_at']
+        assert client.get('/api/items', query_string={'barangay_id': elsewhere.id}).get_json() == []
+
+        seen, cursor = [], None
+        while True:
+            params = {'barangay_id': barangay_id, 'fields': 'item_id,status', 'limit': 2}
+            data = client.get('/api/items', query_string={**params, **({'cursor': cursor} if cursor else {})}).get_json()
+            assert all(set(it) == {'item_id', 'status'} for it in data['items'])
+            seen.extend(it['item_id'] for it in data['items'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        assert seen == [f'WMS{unique}{i}' for i in range(5)]
+
+        collected = client.get('/api/items', query_string={'barangay_id': barangay_id, 'status': 'collected', 'fields': 'item_id'}).get_json()
+        assert collected == [{'item_id': f'WMS{unique}1'}, {'item_id': f'WMS{unique}3'}]
+        assert client.get('/api/items', query_string={'fields': 'password_hash'}).status_code == 400
+        assert client.get('/api/items', query_string={'cursor': 'bogus'}).status_code == 400
+
+
+def test_export_waste_items_and_tracking(client, tmp_path):
+    """/export streams filtered CSV/NDJSON (optionally gzipped); `flask export` writes the same rows."""
+    import csv as csv_module
+    import gzip
+    import io
+    import json as json_module
+    import uuid
+    from datetime import datetime
+    with app.app_context():
+        unique = uuid.uuid4().hex[:8]
+        barangay = Barangay(name=f'Export Barangay {unique}', code=f'EX_{unique}', municipality='Nabua', province='Camarines Sur')
+        admin = User(username=f'export_admin_{unique}', email=f'export_{unique}@example.com', role='admin', full_name='Export Admin')
+        admin.set_password('pwdexport')
+        db.session.add_all([barangay, admin])
+        db.session.commit()
+        items = [WasteItem(item_id=f'WMX{unique}{i}', item_name=f'Export Item {i}', waste_type='recyclable',
+                           status='collected' if i else 'pending_collection', barangay_id=barangay.id,
+                           created_by=admin.id, created_at=datetime(2025, 2, 10 + i)) for i in range(3)]
+        db.session.add_all(items)
+        db.session.commit()
+        db.session.add(WasteTracking(waste_item_id=items[1].id, status='collected', notes='picked, up',
+                                     updated_by=admin.id, timestamp=datetime(2025, 2, 11, 9)))
+        db.session.commit()
+        barangay_id = barangay.id
+
+        client.post('/login', data={'username': admin.username, 'password': 'pwdexport'})
+        rv = client.get('/export/waste_items', query_string={'barangay_id': barangay_id, 'from': '2025-02-10', 'to': '2025-02-11'})
+        assert rv.is_streamed and rv.mimetype == 'text/csv'
+        rows = list(csv_module.DictReader(io.StringIO(rv.get_data(as_text=True))))
+        assert [r['item_id'] for r in rows] == [f'WMX{unique}0', f'WMX{unique}1']
+        assert rows[0]['barangay'] == f'Export Barangay {unique}' and rows[0]['created_by'] == admin.username
+
+        rv = client.get('/export/tracking', query_string={'barangay_id': barangay_id, 'format': 'ndjson', 'gzip': '1'})
+        assert rv.mimetype == 'application/gzip'
+        records = [json_module.loads(line) for line in gzip.decompress(rv.get_data()).decode().splitlines()]
+        assert records == [{'item_id': f'WMX{unique}1', 'barangay': f'Export Barangay {unique}', 'status': 'collected',
+                            'location': None, 'latitude': None, 'longitude': None, 'notes': 'picked, up',
+                            'updated_by': admin.username, 'timestamp': '2025-02-11T09:00:00'}]
+
+        assert client.get('/export/waste_items', query_string={'from': '02/10/2025'}).status_code == 400
+        assert client.get('/export/waste_items', query_string={'format': 'xlsx'}).status_code == 400
+        assert client.get('/export/users').status_code == 404
+
+        out = tmp_path / 'items.csv'
+        result = app.test_cli_runner().invoke(args=['export', 'waste_items', '--barangay-id', str(barangay_id),
+                                                    '--status', 'collected', '-o', str(out)])
+        assert result.exit_code == 0, result.output
+        rows = list(csv_module.DictReader(out.open()))
+        assert [r['item_id'] for r in rows] == [f'WMX{unique}1', f'WMX{unique}2']
+
+
+def test_import_waste_items_from_csv(client, tmp_path):
+    """CSV imports validate every row, then insert items, tracking and stats in one transaction."""
+    import io
+    import uuid
+    from app import WasteStatsRollup, rebuild_waste_stats
+    with app.app_context():
+        unique = uuid.uuid4().hex[:8]
+        barangay = Barangay(name=f'Import Barangay {unique}', code=f'IM_{unique}', municipality='Nabua', province='Camarines Sur')
+        admin = User(username=f'import_admin_{unique}', email=f'import_{unique}@example.com', role='admin', full_name='Import Admin')
+        admin.set_password('pwdimport')
+        db.session.add_all([barangay, admin])
+        db.session.commit()
+        client.post('/login', data={'username': admin.username, 'password': 'pwdimport'})
+
+        bad = ('waste_type,barangay,weight,is_sorted\n'
+               f'organic,IM_{unique},1.5,yes\n'
+               'plastic,Nowhere,abc,maybe\n')
+        rv = client.post('/import_waste', data={'file': (io.BytesIO(bad.encode()), 'items.csv')})
+        html = rv.get_data(as_text=True)
+        assert 'Unknown waste_type' in html and 'Nothing was imported' in html
+        assert WasteItem.query.filter_by(barangay_id=barangay.id).count() == 0
+
+        good = ('waste_type,barangay,weight,address,is_sorted\n'
+                f'organic,IM_{unique},1.5,Purok 1,yes\n'
+                f'hazardous,import barangay {unique},,Purok 2,no\n'
+                '\n')
+        rv = client.post('/import_waste', data={'file': (io.BytesIO(good.encode()), 'items.csv')})
+        assert 'Imported 2 waste item(s)' in rv.get_data(as_text=True)
+        items = WasteItem.query.filter_by(barangay_id=barangay.id).order_by(WasteItem.id).all()
+        assert [(i.waste_type, i.status, i.weight, i.created_by) for i in items] == [
+            ('organic', 'pending_collection', 1.5, admin.id), ('hazardous', 'not_collected', None, admin.id)]
+        assert items[0].item_id != items[1].item_id
+        assert all(item.qr_code_data.startswith(item.item_id + ':') for item in items)
+        assert all(len(item.tracking_records) == 1 for item in items)
+        from app import WasteItemPosition
+        assert [db.session.get(WasteItemPosition, item.id).status for item in items] == [item.status for item in items]
+
+        def rollup():
+            return {(r.waste_type, r.status): r.count for r in WasteStatsRollup.query.filter_by(barangay_id=barangay.id)}
+        assert rollup() == {('organic', 'pending_collection'): 1, ('hazardous', 'not_collected'): 1}
+        rebuild_waste_stats()
+        assert rollup() == {('organic', 'pending_collection'): 1, ('hazardous', 'not_collected'): 1}
+
+        csv_file = tmp_path / 'more.csv'
+        csv_file.write_text(f'waste_type,barangay\nelectronic,IM_{unique}\n')
+        result = app.test_cli_runner().invoke(args=['import-waste', str(csv_file), '--user', admin.username])
+        assert result.exit_code == 0, result.output
+        assert WasteItem.query.filter_by(barangay_id=barangay.id).count() == 3
+
+
+def test_item_id_allocator_is_unique_across_workers(client):
+    """Allocators sharing the database (one per worker) never hand out the same id."""
+    from app import ItemIdAllocator, new_item_ids
+    with app.app_context():
+        workers = [ItemIdAllocator(), ItemIdAllocator()]
+        numbers = [n for _ in range(100) for worker in workers for n in worker.allocate(7)]
+        assert len(numbers) == len(set(numbers)) == 100 * 2 * 7
+
+        # Numbers come from blocks: one reservation serves ITEM_ID_BLOCK_SIZE single allocations
+        allocator = ItemIdAllocator()
+        reservations = []
+        reserve = allocator._reserve
+        allocator._reserve = lambda size: reservations.append(size) or reserve(size)
+        singles = [allocator.allocate()[0] for _ in range(2000)]
+        assert singles == sorted(singles) and len(set(singles)) == 2000
+        assert reservations == [app.config['ITEM_ID_BLOCK_SIZE']] * -(-2000 // app.config['ITEM_ID_BLOCK_SIZE'])
+        bulk = allocator.allocate(5000)
+        assert bulk == list(range(bulk[0], bulk[0] + 5000)) and bulk[0] > singles[-1]
+        assert len(reservations) == -(-2000 // app.config['ITEM_ID_BLOCK_SIZE']) + 1
+
+        ids = new_item_ids(5000) + [new_item_ids()[0] for _ in range(2000)]
+        assert len(set(ids)) == len(ids)
+        assert all(item_id.startswith('WM') and '-' in item_id for item_id in ids)
+
+
+def test_qr_image_is_cached_by_content(client, tmp_path):
+    """/qr/<item_id>.png renders each payload once and serves it with validators."""
+    import uuid
+    import app as app_module
+    cache_dir = app.config['QR_CACHE_DIR']
+    with app.app_context():
+        app.config['QR_CACHE_DIR'] = str(tmp_path)
+        app_module.qr_image_cache.clear()
+        unique = uuid.uuid4().hex[:8]
+        barangay = Barangay(name=f'QR Barangay {unique}', code=f'QR_{unique}', municipality='Nabua', province='Camarines Sur')
+        admin = User(username=f'qr_admin_{unique}', email=f'qr_{unique}@example.com', role='admin', full_name='QR Admin')
+        admin.set_password('pwdqr')
+        db.session.add_all([barangay, admin])
+        db.session.commit()
+        item = WasteItem(item_id=f'WMQ{unique}', item_name='QR Item', waste_type='organic', barangay_id=barangay.id,
+                         qr_code_data='{"item_id": "WMQ%s"}' % unique)
+        db.session.add(item)
+        db.session.commit()
+        client.post('/login', data={'username': admin.username, 'password': 'pwdqr'})
+
+        renders = []
+        original = app_module.render_qr_png
+        app_module.render_qr_png = lambda payload: renders.append(payload) or original(payload)
+        try:
+            html = client.get(f'/generate_qr/WMQ{unique}').get_data(as_text=True)
+            assert f'/qr/WMQ{unique}.png?v=' in html
+            first = client.get(f'/qr/WMQ{unique}.png')
+            assert first.mimetype == 'image/png' and first.data.startswith(b'\x89PNG')
+            assert first.headers['Cache-Control'] == 'private, no-cache'
+            etag = first.headers['ETag']
+            assert client.get(f'/qr/WMQ{unique}.png', headers={'If-None-Match': etag}).status_code == 304
+            versioned = client.get(f'/qr/WMQ{unique}.png', query_string={'v': etag.strip('"')[:16]})
+            assert 'immutable' in versioned.headers['Cache-Control'] and versioned.data == first.data
+            assert len(renders) == 1
+
+            # A new worker (empty memory tier) reads the file instead of rendering
+            app_module.qr_image_cache.clear()
+            assert client.get(f'/qr/WMQ{unique}.png').data == first.data
+            assert len(renders) == 1
+
+            item.qr_code_data = '{"item_id": "WMQ%s", "v": 2}' % unique
+            db.session.commit()
+            assert client.get(f'/qr/WMQ{unique}.png', headers={'If-None-Match': etag}).status_code == 200
+            assert len(renders) == 2
+        finally:
+            app_module.render_qr_png = original
+            app.config['QR_CACHE_DIR'] = cache_dir
+
+
+def test_qr_label_sheet_reuses_cached_images(client, tmp_path):
+    """/qr/sheet lays out many labels per page and only renders QR images it has not cached."""
+    import uuid
+    import app as app_module
+    cache_dir = app.config['QR_CACHE_DIR']
+    with app.app_context():
+        app.config['QR_CACHE_DIR'] = str(tmp_path)
+        app_module.qr_image_cache.clear()
+        unique = uuid.uuid4().hex[:8]
+        barangay = Barangay(name=f'Label Barangay {unique}', code=f'LB_{unique}', municipality='Nabua', province='Camarines Sur')
+        admin = User(username=f'label_admin_{unique}', email=f'label_{unique}@example.com', role='admin', full_name='Label Admin')
+        admin.set_password('pwdlabel')
+        db.session.add_all([barangay, admin])
+        db.session.commit()
+        db.session.add_all([WasteItem(item_id=f'WML{unique}{i:02d}', item_name='Label Item', waste_type='recyclable',
+                                      barangay_id=barangay.id, qr_code_data=f'WML{unique}{i:02d}') for i in range(14)])
+        db.session.commit()
+        client.post('/login', data={'username': admin.username, 'password': 'pwdlabel'})
+
+        rendered = []
+        original = app_module.render_qr_pngs
+        parallel = []
+        app_module.render_qr_pngs = lambda payloads, **kw: rendered.extend(payloads) or parallel.append(kw.get('parallel')) or original(payloads, **kw)
+        try:
+            client.get(f'/qr/WML{unique}00.png')
+            rv = client.get('/qr/sheet', query_string={'barangay_id': barangay.id})
+            assert rv.mimetype == 'application/pdf' and rv.data.startswith(b'%PDF')
+            assert rv.headers['X-Page-Count'] == '2'
+            assert len(rendered) == 13  # the first label was already cached by /qr/<item_id>.png
+            assert parallel == [False]  # web workers never fork a render pool
+
+            rv = client.get('/qr/sheet', query_string={'barangay_id': barangay.id, 'format': 'png', 'page': 2})
+            assert rv.mimetype == 'image/png' and len(rendered) == 13
+            rv = client.get('/qr/sheet', query_string=[('item_id', f'WML{unique}01'), ('item_id', f'WML{unique}02'), ('format', 'png')])
+            assert rv.headers['X-Page-Count'] == '1'
+            assert client.get('/qr/sheet', query_string={'item_id': 'WMnothing'}).status_code == 404
+            assert client.get('/qr/sheet', query_string={'from': 'yesterday'}).status_code == 400
+
+            out = tmp_path / 'labels.pdf'
+            result = app.test_cli_runner().invoke(args=['qr-sheet', '--barangay-id', str(barangay.id), '-o', str(out)])
+            assert result.exit_code == 0, result.output
+            assert out.read_bytes().startswith(b'%PDF')
+            assert parallel[-1] is True
+
+            # Barangay users only get QR codes of their own barangay's items
+            other = Barangay(name=f'Other Label Barangay {unique}', code=f'OLB_{unique}', municipality='Nabua', province='Camarines Sur')
+            db.session.add(other)
+            db.session.commit()
+            official = User(username=f'label_brgy_{unique}', email=f'label_brgy_{unique}@example.com', role='barangay',
+                            full_name='Label Official', barangay_id=other.id)
+            official.set_password('pwdbrgy')
+            db.session.add(official)
+            db.session.commit()
+            client.get('/logout')
+            client.post('/login', data={'username': official.username, 'password': 'pwdbrgy'})
+            assert client.get(f'/qr/WML{unique}00.png').status_code == 404
+            assert client.get(f'/generate_qr/WML{unique}00').status_code == 404
+            assert client.get('/qr/sheet', query_string={'barangay_id': barangay.id}).status_code == 403
+            assert client.get('/qr/sheet', query_string={'item_id': f'WML{unique}00'}).status_code == 404
+        finally:
+            app_module.render_qr_pngs = original
+            app.config['QR_CACHE_DIR'] = cache_dir
+
+
+def test_compact_qr_payloads_scan_alongside_legacy_json(client):
+    """New items get compact QR payloads; scan_qr resolves compact, legacy JSON and bare ids."""
+    import uuid
+    from app import waste_item_qr_data, regenerate_qr_payloads
+    with app.app_context():
+        unique = uuid.uuid4().hex[:8]
+        barangay = Barangay(name=f'Scan Barangay {unique}', code=f'SC_{unique}', municipality='Nabua', province='Camarines Sur')
+        user = User(username=f'scan_barangay_{unique}', email=f'scan_{unique}@example.com', role='barangay', full_name='Scan User')
+        user.set_password('pwdscan')
+        collector = User(username=f'scan_collector_{unique}', email=f'scanc_{unique}@example.com', role='collector', full_name='Scan Collector')
+        collector.set_password('pwdscan')
+        db.session.add_all([barangay, user, collector])
+        db.session.commit()
+        client.post('/login', data={'username': user.username, 'password': 'pwdscan'})
+        client.post('/add_waste', data={'waste_type': 'organic', 'barangay_id': barangay.id, 'is_sorted': 'true'})
+        item = WasteItem.query.filter_by(barangay_id=barangay.id).one()
+        assert item.qr_code_data == waste_item_qr_data(item.item_id)
+        assert len(item.qr_code_data) == 20 and item.qr_code_data.startswith(item.item_id + ':1')
+
+        legacy = WasteItem(item_id=f'WM{unique}', item_name='Old Label', waste_type='organic', barangay_id=barangay.id,
+                           qr_code_data='{"item_id": "WM%s", "item_name": "Old Label"}' % unique)
+        db.session.add(legacy)
+        db.session.commit()
+        client.get('/logout')
+        client.post('/login', data={'username': collector.username, 'password': 'pwdscan'})
+
+        def scan(text):
+            return client.post('/scan_qr', json={'qr_data': text}).get_json()
+        assert scan(item.qr_code_data)['item']['item_id'] == item.item_id
+        assert scan(legacy.qr_code_data)['item']['item_id'] == legacy.item_id
+        assert scan(item.item_id)['item']['item_id'] == item.item_id
+        tampered = item.qr_code_data[:-1] + ('0' if item.qr_code_data[-1] != '0' else '1')
+        assert scan(tampered)['success'] is False
+
+        from datetime import datetime
+        legacy.updated_at = datetime(2020, 1, 1)
+        db.session.commit()
+        assert regenerate_qr_payloads(batch_size=2) >= 1
+        db.session.refresh(legacy)
+        assert legacy.qr_code_data == waste_item_qr_data(legacy.item_id)
+        assert legacy.updated_at == datetime(2020, 1, 1)
+        assert scan(legacy.qr_code_data)['item']['item_id'] == legacy.item_id
+
+
+def test_scan_qr_cache_and_batch_resolution(client):
+    """Scans are served from the item cache until a write commits; /scan_qr/batch resolves codes in one query."""
+    import uuid
+    from sqlalchemy import event
+    from app import scan_item_cache, waste_item_qr_data
+    with app.app_context():
+        scan_item_cache.clear()
+        unique = uuid.uuid4().hex[:8]
+        barangay = Barangay(name=f'Batch Barangay {unique}', code=f'BB_{unique}', municipality='Nabua', province='Camarines Sur')
+        collector = User(username=f'batch_collector_{unique}', email=f'batch_{unique}@example.com', role='collector', full_name='Batch Collector')
+        collector.set_password('pwdbatch')
+        db.session.add_all([barangay, collector])
+        db.session.commit()
+        items = [WasteItem(item_id=f'WMB{unique}{i}', item_name=f'Batch Item {i}', waste_type='organic', is_sorted=True,
+                           barangay_id=barangay.id, qr_code_data=waste_item_qr_data(f'WMB{unique}{i}')) for i in range(3)]
+        db.session.add_all(items)
+        db.session.commit()
+        codes = [item.qr_code_data for item in items]
+        client.post('/login', data={'username': collector.username, 'password': 'pwdbatch'})
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement) if 'waste_item' in statement else None
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            data = client.post('/scan_qr/batch', json={'codes': codes + ['{"item_id": "missing"}', codes[0][:-1] + '#']}).get_json()
+            assert len(statements) == 1
+            assert [r['success'] for r in data['results']] == [True, True, True, False, False]
+            assert data['results'][1]['item']['barangay'] == f'Batch Barangay {unique}'
+
+            assert client.post('/scan_qr', json={'qr_data': codes[0]}).get_json()['item']['status'] == 'pending_collection'
+            assert len(statements) == 1  # served from the cache
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+        item = WasteItem.query.filter_by(item_id=f'WMB{unique}0').one()
+        item.status = 'collected'
+        db.session.commit()
+        assert client.post('/scan_qr', json={'qr_data': codes[0]}).get_json()['item']['status'] == 'collected'
+        assert client.post('/scan_qr/batch', json={'codes': 'WMB'}).status_code == 400
+
+
+def test_api_sync_applies_offline_operations_once(client):
+    """/api/sync applies a queued batch in order, rejects bad ops individually and ignores replays."""
+    import uuid
+    from app import SyncOperation, collector_locations
+    with app.app_context():
+        unique = uuid.uuid4().hex[:8]
+        barangay = Barangay.query.first()
+        collector = User(username=f'sync_collector_{unique}', email=f'sync_{unique}@example.com', role='collector', full_name='Sync Collector')
+        collector.set_password('pwdsync')
+        item = WasteItem(item_id=f'WMS{unique}', item_name='Sync Item', waste_type='organic', is_sorted=False,
+                         barangay_id=barangay.id, address='Zone 1')
+        db.session.add_all([collector, item])
+        db.session.commit()
+        client.post('/login', data={'username': collector.username, 'password': 'pwdsync'})
+
+        operations = [
+            {'op_id': f'{unique}-1', 'type': 'sort', 'item_id': item.item_id, 'recorded_at': '2026-01-05T08:00:00Z'},
+            {'op_id': f'{unique}-2', 'type': 'collect', 'item_id': item.item_id, 'latitude': 13.41, 'longitude': 123.37,
+             'recorded_at': '2026-01-05T08:05:00Z'},
+            {'op_id': f'{unique}-3', 'type': 'collect', 'item_id': item.item_id},
+            {'op_id': f'{unique}-4', 'type': 'location', 'latitude': 13.42, 'longitude': 123.38, 'recorded_at': '2026-01-05T08:06:00Z'},
+            {'op_id': f'{unique}-5', 'type': 'status', 'item_id': 'missing', 'status': 'in_transit'},
+        ]
+        data = client.post('/api/sync', json={'operations': operations}).get_json()
+        assert [r['success'] for r in data['results']] == [True, True, False, True, False]
+        assert data['results'][1]['item'] == {'item_id': item.item_id, 'status': 'collected'}
+        assert 'current status' in data['results'][2]['error']
+
+        records = WasteTracking.query.filter_by(waste_item_id=item.id).order_by(WasteTracking.timestamp).all()
+        assert [t.status for t in records] == ['pending_collection', 'collected']
+        assert records[1].timestamp.strftime('%Y-%m-%d %H:%M') == '2026-01-05 08:05'
+        assert round(records[1].latitude, 2) == 13.41
+        assert collector_locations.latest(collector.id)[:2] == (13.42, 123.38)
+
+        # Uploading the same batch again (the first response was lost) writes nothing new
+        replay = client.post('/api/sync', json={'operations': operations}).get_json()
+        assert all(r['replayed'] for r in replay['results'])
+        assert [r['success'] for r in replay['results']] == [True, True, False, True, False]
+        assert WasteTracking.query.filter_by(waste_item_id=item.id).count() == 2
+        assert SyncOperation.query.filter_by(user_id=collector.id).count() == 5
+
+        assert client.post('/api/sync', json={'operations': [{'type': 'location'}]}).status_code == 400
+
+        # An update recorded before the item's latest state only joins the history
+        late = {'op_id': f'{unique}-6', 'type': 'status', 'item_id': item.item_id, 'status': 'in_transit',
+                'recorded_at': '2026-01-05T08:01:00Z'}
+        result = client.post('/api/sync', json={'operations': [late]}).get_json()['results'][0]
+        assert result['success'] and result['superseded']
+        assert result['item']['status'] == 'collected'
+        db.session.expire_all()
+        assert db.session.get(WasteItem, item.id).status == 'collected'
+        assert WasteTracking.query.filter_by(waste_item_id=item.id).count() == 3
+        from app import WasteItemPosition, rebuild_item_positions
+        position = db.session.get(WasteItemPosition, item.id)
+        assert position.status == 'collected'
+        projected = (position.status, position.timestamp)
+        rebuild_item_positions()
+        db.session.expire_all()
+        position = db.session.get(WasteItemPosition, item.id)
+        assert (position.status, position.timestamp) == projected
+
+
+def test_api_sync_failing_batch_commits_nothing(client):
+    """An unexpected error part way through a batch rolls back the operations before it too."""
+    import uuid
+    import app as app_module
+    from app import SyncOperation
+    with app.app_context():
+        unique = uuid.uuid4().hex[:8]
+        barangay = Barangay.query.first()
+        collector = User(username=f'atomic_collector_{unique}', email=f'atomic_{unique}@example.com', role='collector', full_name='Atomic Collector')
+        collector.set_password('pwdatomic')
+        items = [WasteItem(item_id=f'WMA{unique}{i}', item_name='Atomic Item', waste_type='organic', is_sorted=True,
+                           barangay_id=barangay.id) for i in range(2)]
+        db.session.add_all([collector] + items)
+        db.session.commit()
+        client.post('/login', data={'username': collector.username, 'password': 'pwdatomic'})
+
+        collect = app_module.SYNC_ITEM_HANDLERS['collect']
+        calls = []
+
+        def failing_collect(op, user, recorded_at):
+            calls.append(op['op_id'])
+            if len(calls) == 2:
+                raise RuntimeError('disk full')
+            return collect(op, user, recorded_at)
+        app_module.SYNC_ITEM_HANDLERS['collect'] = failing_collect
+        try:
+            operations = [{'op_id': f'{unique}-{i}', 'type': 'collect', 'item_id': item.item_id} for i, item in enumerate(items)]
+            with pytest.raises(RuntimeError):
+                client.post('/api/sync', json={'operations': operations})
+        finally:
+            app_module.SYNC_ITEM_HANDLERS['collect'] = collect
+
+        # Drop the request's uncommitted work, as the app context teardown would
+        db.session.rollback()
+        assert [db.session.get(WasteItem, item.id).status for item in items] == ['pending_collection'] * 2
+        assert WasteTracking.query.filter(WasteTracking.waste_item_id.in_([item.id for item in items])).count() == 0
+        assert SyncOperation.query.filter_by(user_id=collector.id).count() == 0
+
+        # The retry applies the whole batch
+        data = client.post('/api/sync', json={'operations': operations}).get_json()
+        assert [r['success'] for r in data['results']] == [True, True]
+
+
+def test_idempotency_key_replays_status_updates(client):
+    """Retries carrying the same Idempotency-Key get the original response and write no new tracking rows."""
+    import uuid
+    from datetime import timedelta
+    from app import IdempotencyKey
+    with app.app_context():
+        unique = uuid.uuid4().hex[:8]
+        barangay = Barangay.query.first()
+        collector = User(username=f'idem_collector_{unique}', email=f'idem_{unique}@example.com', role='collector', full_name='Idem Collector')
+        collector.set_password('pwdidem')
+        item = WasteItem(item_id=f'WMI{unique}', item_name='Idem Item', waste_type='organic', is_sorted=True,
+                         barangay_id=barangay.id, address='Zone 2')
+        db.session.add_all([collector, item])
+        db.session.commit()
+        client.post('/login', data={'username': collector.username, 'password': 'pwdidem'})
+
+        headers = {'Idempotency-Key': f'collect-{unique}'}
+        first = client.post(f'/mark_collected/{item.item_id}', data={'latitude': '13.4', 'longitude': '123.3'}, headers=headers)
+        retry = client.post(f'/mark_collected/{item.item_id}', data={'latitude': '13.5', 'longitude': '123.3'}, headers=headers)
+        assert first.status_code == retry.status_code == 302
+        assert retry.headers['Location'] == first.headers['Location']
+        assert retry.headers['Idempotent-Replayed'] == 'true'
+        assert WasteTracking.query.filter_by(waste_item_id=item.id).count() == 1
+
+        # HTML forms send the key as a field
+        body = {'status': 'in_transit', 'idempotency_key': f'status-{unique}'}
+        ajax = {'X-Requested-With': 'XMLHttpRequest'}
+        first = client.post(f'/update_status/{item.item_id}', data=body, headers=ajax).get_json()
+        assert client.post(f'/update_status/{item.item_id}', data=body, headers=ajax).get_json() == first
+        assert WasteTracking.query.filter_by(waste_item_id=item.id).count() == 2
+
+        track = {'item_id': item.item_id, 'status': 'processed'}
+        key = {'Idempotency-Key': f'track-{unique}'}
+        assert client.post('/api/waste/track', json=track, headers=key).get_json() == {'status': 'ok'}
+        assert client.post('/api/waste/track', json=track, headers=key).get_json() == {'status': 'ok'}
+        assert client.post('/api/waste/track', json=dict(track, status='disposed'), headers=key).status_code == 422
+        assert WasteTracking.query.filter_by(waste_item_id=item.id).count() == 3
+
+        # Expired keys are forgotten
+        stored = db.session.get(IdempotencyKey, (collector.id, f'track-{unique}'))
+        stored.created_at -= timedelta(seconds=app.config['IDEMPOTENCY_KEY_TTL'] + 1)
+        db.session.commit()
+        assert client.post('/api/waste/track', json=dict(track, status='disposed'), headers=key).get_json() == {'status': 'ok'}
+        assert WasteTracking.query.filter_by(waste_item_id=item.id).count() == 4
+
+        # The writes committed but the response was never stored (the worker died in between)
+        stored = db.session.get(IdempotencyKey, (collector.id, f'track-{unique}'))
+        stored.status_code, stored.body = None, None
+        db.session.commit()
+        replay = client.post('/api/waste/track', json=dict(track, status='disposed'), headers=key)
+        assert replay.status_code == 200 and replay.get_json()['success'] is True
+        assert WasteTracking.query.filter_by(waste_item_id=item.id).count() == 4
+
+        # Plain form posts get key errors as a flash message and a redirect
+        other = WasteItem(item_id=f'WMJ{unique}', item_name='Other Item', waste_type='organic', is_sorted=True,
+                          barangay_id=barangay.id)
+        db.session.add(other)
+        db.session.commit()
+        rv = client.post(f'/mark_collected/{other.item_id}', headers=headers)
+        assert rv.status_code == 302
+        assert WasteTracking.query.filter_by(waste_item_id=other.id).count() == 0
+
+        # An update queued offline under the key of a request that did go through is not applied again
+        op = {'op_id': f'status-{unique}', 'type': 'status', 'item_id': item.item_id, 'status': 'in_transit'}
+        result = client.post('/api/sync', json={'operations': [op]}).get_json()['results'][0]
+        assert result['success'] and result['replayed']
+        assert WasteTracking.query.filter_by(waste_item_id=item.id).count() == 4
+
+
+def test_idempotency_key_reraises_unrelated_integrity_errors(client):
+    """Only an IntegrityError from a concurrent use of the same key is answered as a replay."""
+    import uuid
+    from flask import session
+    from sqlalchemy.exc import IntegrityError
+    from app import idempotent, IdempotencyKey
+    with app.app_context():
+        unique = uuid.uuid4().hex[:8]
+        collector = User(username=f'integrity_collector_{unique}', email=f'integrity_{unique}@example.com', role='collector', full_name='Integrity Collector')
+        collector.set_password('pwdintegrity')
+        db.session.add(collector)
+        db.session.commit()
+
+        @idempotent
+        def duplicate_item():
+            raise IntegrityError('INSERT INTO waste_item', {}, Exception('UNIQUE constraint failed: waste_item.item_id'))
+
+        with app.test_request_context('/mark_collected/WM1', method='POST', headers={'Idempotency-Key': f'key-{unique}'}):
+            session['user_id'] = collector.id
+            with pytest.raises(IntegrityError):
+                duplicate_item()
+        assert db.session.get(IdempotencyKey, (collector.id, f'key-{unique}')) is None